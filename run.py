@@ -18,12 +18,52 @@ from src.core.exceptions import ElementNotFoundError
 from src.session.session_manager import SessionManager
 from src.commands.edit.insert_command import InsertCommand
 from src.commands.edit.edit_id_command import EditIdCommand
-from src.commands.display import PrintTreeCommand, SpellCheckCommand, DirTreeCommand
+from src.commands.display import PrintTreeCommand, DirTreeCommand
+from src.commands.registry import COMMANDS
 from src.session.state.session_state import SessionState
+from src.application.script_runner import run_from_args
 
 class Application(CommandObserver):
     """HTML编辑器应用主类，实现CommandObserver接口"""
     
+    # 命令名 -> (处理方法名, 最少参数个数, 最多参数个数或None)
+    _HANDLERS = {
+        "exit": ("_cmd_exit", 0, None),
+        "help": ("_cmd_help", 0, None),
+        "load": ("_cmd_load", 1, None),
+        "save": ("_cmd_save", 0, None),
+        "export-snapshot": ("_cmd_export_snapshot", 1, None),
+        "import-snapshot": ("_cmd_import_snapshot", 1, None),
+        "close": ("_cmd_close", 0, None),
+        "editor-list": ("_cmd_editor_list", 0, None),
+        "edit": ("_cmd_edit", 1, None),
+        "showid": ("_cmd_showid", 1, None),
+        "atomic-save": ("_cmd_atomic_save", 1, None),
+        "journal": ("_cmd_journal", 1, 1),
+        "checkpoints": ("_cmd_checkpoints", 1, 1),
+        "coalesce": ("_cmd_coalesce", 1, 1),
+        "dispatch": ("_cmd_dispatch", 1, 1),
+        "record": ("_cmd_record", 1, 1),
+        "autosave": ("_cmd_autosave", 0, None),
+        "history-stats": ("_cmd_history_stats", 0, None),
+        "append": ("_cmd_append", 3, None),
+        "insert": ("_cmd_insert", 3, None),
+        "delete": ("_cmd_delete", 1, None),
+        "edit-text": ("_cmd_edit_text", 2, None),
+        "edit-id": ("_cmd_edit_id", 2, None),
+        "tree": ("_cmd_tree", 0, None),
+        "spell-check": ("_cmd_spell_check", 0, None),
+        "dir-tree": ("_cmd_dir_tree", 0, None),
+        "undo": ("_cmd_undo", 0, None),
+        "redo": ("_cmd_redo", 0, None),
+        "begin": ("_cmd_begin", 0, None),
+        "commit": ("_cmd_commit", 0, None),
+        "rollback": ("_cmd_rollback", 0, None),
+    }
+    
+    # 作用于活动文档的命令，没有打开的文件时交给旧的命令解析器
+    _EDITOR_COMMANDS = frozenset({"append", "insert", "delete", "edit-text", "edit-id", "tree", "spell-check"})
+    
     def __init__(self):
         # Initialize session manager instead of direct model/processor
         self.session_manager = SessionManager()
@@ -44,6 +84,9 @@ HTML编辑器命令说明:
 会话命令:
   load <filename.html>     - 加载HTML文件
   save [filename.html]     - 保存当前文件或另存为新文件
+  save --minify <file>     - 导出压缩的HTML（<file>以.gz结尾时同时gzip压缩）
+  export-snapshot <file>   - 将当前文档导出为二进制快照
+  import-snapshot <file>   - 从二进制快照快速加载当前文档
   close                    - 关闭当前文件
   editor-list              - 显示打开的文件列表
   edit <filename.html>     - 切换到指定文件
@@ -63,16 +106,43 @@ I/O命令:
 显示命令:
   tree                     - 树形显示HTML结构
   dir-tree                 - 显示当前目录结构
-  spell-check              - 检查文本拼写错误
+  spell-check [--workers N] [--engine edits|symspell] - 检查文本拼写错误，大文档可在N个进程中
+                          并行判断单词；symspell 使用预计算的对称删除索引生成建议
   showid true|false        - 控制树形显示时是否显示ID
 
+保存选项:
+  atomic-save on|off [fsync] [backup] - 原子保存（临时文件+重命名），可选刷盘和保留上一版本
+  autosave on|off|<seconds> - 后台自动保存，<seconds>为最后一次修改后的静默秒数；无参数显示统计
+  journal on|off           - 日志模式：编辑追加到 <file>.journal，保存或日志过大时才重写HTML
+  record <file>|off        - 录制编辑操作及其耗时，用于 replay 性能测试
+
 历史命令:
   undo                     - 撤销上一个命令
   redo                     - 重做已撤销的命令
+  history-stats            - 显示撤销历史的命令数和估算内存
+  checkpoints on|off       - 检查点历史：内存中只保留最近100条命令，更早的历史换出到磁盘，
+                             深度撤销时从检查点恢复并重放
+  coalesce on|off          - 合并1秒内对同一元素的连续修改，一次撤销整体撤回
+  dispatch sync|batch|async - 观察者事件分发：立即通知、成批通知或由后台线程通知
+                             （--script 批处理默认使用 batch）
+  begin                    - 开始事务，之后的编辑在提交时合并为一条历史记录
+  commit                   - 提交事务
+  rollback                 - 回滚事务，撤销事务中的所有编辑
 
 其他命令:
   help                     - 显示此帮助信息
   exit                     - 退出程序
+
+批处理模式:
+  python run.py --script <file|-> [--on-error stop|continue] [--verbose]
+                           - 一次解析并执行脚本文件（- 或省略文件名时读取标准输入），
+                             不显示提示符和逐条信息，结束时输出命令数和每秒命令数
+  python run.py batch-apply <script> <glob> [--workers N] [--output-dir DIR]
+                           - 用多个进程将编辑脚本应用到所有匹配的文件（默认原地保存），
+                             报告每个文件的错误和总吞吐量
+  python run.py replay <recording> [document] [--repeat N]
+                           - 在起始文档（默认为录制时的文档）上重放录制的操作，
+                             按命令类型报告延迟的平均值和 p50/p90/p99
 """
         print(help_text)
         
@@ -105,121 +175,8 @@ I/O命令:
                 cmd = parts[0].lower()
                 args = parts[1:]
                 
-                # 处理退出命令
-                if cmd == "exit":
-                    # 保存会话状态
-                    self.session_manager.save_session()
-                    
-                    # 检查是否有未保存的文件
-                    unsaved = [f for f, e in self.session_manager.editors.items() if e.modified]
-                    if unsaved:
-                        print("以下文件未保存:")
-                        for f in unsaved:
-                            print(f"  {f}")
-                        response = input("确定要退出吗？未保存的更改将丢失。(y/n): ")
-                        if response.lower() != 'y':
-                            continue
-                    
-                    self.running = False
-                    print("感谢使用HTML编辑器")
-                    continue
-                
-                # 处理帮助命令
-                if cmd == "help":
-                    self.print_help()
-                    continue
-                
-                # 会话管理命令
-                if cmd == "load" and len(args) >= 1:
-                    self.session_manager.load(args[0])
-                    continue
-                
-                elif cmd == "save":
-                    if len(args) >= 1:
-                        self.session_manager.save(args[0])
-                    else:
-                        self.session_manager.save()
-                    continue
-                
-                elif cmd == "close":
-                    self.session_manager.close()
-                    continue
-                
-                elif cmd == "editor-list":
-                    self.session_manager.editor_list()
-                    continue
-                
-                elif cmd == "edit" and len(args) >= 1:
-                    self.session_manager.edit(args[0])
-                    continue
-                
-                # 处理showid命令
-                elif cmd == "showid" and len(args) >= 1:
-                    if args[0].lower() == "true":
-                        self.session_manager.set_show_id(True)
-                    elif args[0].lower() == "false":
-                        self.session_manager.set_show_id(False)
-                    else:
-                        print("无效参数。使用 'showid true' 或 'showid false'")
-                    continue
-                
-                # 编辑命令
-                if self.session_manager.active_editor:
-                    active_model = self.session_manager.get_active_model()
-                    
-                    if cmd == "append" and len(args) >= 3:
-                        tag, id_val, parent = args[0], args[1], args[2]
-                        text = " ".join(args[3:]) if len(args) > 3 else None
-                        command = AppendCommand(active_model, tag, id_val, parent, text)
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    elif cmd == "insert" and len(args) >= 3:
-                        tag, id_val, before = args[0], args[1], args[2]
-                        text = " ".join(args[3:]) if len(args) > 3 else None
-                        command = InsertCommand(active_model, tag, id_val, before, text)
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    elif cmd == "delete" and len(args) >= 1:
-                        command = DeleteCommand(active_model, args[0])
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    elif cmd == "edit-text" and len(args) >= 2:
-                        command = EditTextCommand(active_model, args[0], " ".join(args[1:]))
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    elif cmd == "edit-id" and len(args) >= 2:
-                        command = EditIdCommand(active_model, args[0], args[1])
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    # 显示命令
-                    elif cmd == "tree":
-                        command = PrintTreeCommand(active_model)
-                        self.session_manager.execute_command(command)
-                        continue
-                    
-                    elif cmd == "spell-check":
-                        command = SpellCheckCommand(active_model)
-                        self.session_manager.execute_command(command)
-                        continue
-                
-                # 目录树命令，不需要活动编辑器
-                if cmd == "dir-tree":
-                    command = DirTreeCommand(self.session_manager)
-                    self.session_manager.execute_command(command)
-                    continue
-                
-                # 历史命令
-                if cmd == "undo":
-                    self.session_manager.undo()
-                    continue
-                
-                elif cmd == "redo":
-                    self.session_manager.redo()
+                # 会话、设置、编辑和历史命令通过命令表分派
+                if self.dispatch(cmd, args):
                     continue
                     
                 # 如果以上命令都不匹配，尝试使用旧的命令解析器
@@ -254,6 +211,201 @@ I/O命令:
             except Exception as e:
                 print(f"错误: {str(e)}")
     
+    def dispatch(self, cmd, args):
+        """按命令表执行会话命令
+        
+        参数个数不符或需要活动编辑器却没有时返回False，由旧的命令解析器继续处理
+        """
+        entry = self._HANDLERS.get(cmd)
+        if entry is None:
+            return False
+        handler, min_args, max_args = entry
+        if len(args) < min_args or (max_args is not None and len(args) > max_args):
+            return False
+        if cmd in self._EDITOR_COMMANDS and not self.session_manager.active_editor:
+            return False
+        getattr(self, handler)(args)
+        return True
+    
+    # 各命令的处理方法
+    
+    def _cmd_exit(self, args):
+        # 停止自动保存并写入尚未保存的修改
+        self.session_manager.disable_autosave()
+        
+        # 保存会话状态
+        self.session_manager.save_session()
+        
+        # 检查是否有未保存的文件
+        unsaved = [f for f, e in self.session_manager.editors.items() if e.modified]
+        if unsaved:
+            print("以下文件未保存:")
+            for f in unsaved:
+                print(f"  {f}")
+            response = input("确定要退出吗？未保存的更改将丢失。(y/n): ")
+            if response.lower() != 'y':
+                return
+        
+        self.running = False
+        print("感谢使用HTML编辑器")
+    
+    def _cmd_help(self, args):
+        self.print_help()
+    
+    def _cmd_load(self, args):
+        self.session_manager.load(args[0])
+    
+    def _cmd_save(self, args):
+        minify = "--minify" in args
+        args = [a for a in args if a != "--minify"]
+        if minify or (args and args[0].endswith(".gz")):
+            if args:
+                self.session_manager.export(args[0], minify)
+            else:
+                print("压缩输出需要指定文件名，例如 'save --minify out.html'")
+        elif len(args) >= 1:
+            self.session_manager.save(args[0])
+        else:
+            self.session_manager.save()
+    
+    def _cmd_export_snapshot(self, args):
+        self.session_manager.export_snapshot(args[0])
+    
+    def _cmd_import_snapshot(self, args):
+        self.session_manager.import_snapshot(args[0])
+    
+    def _cmd_close(self, args):
+        self.session_manager.close()
+    
+    def _cmd_editor_list(self, args):
+        self.session_manager.editor_list()
+    
+    def _cmd_edit(self, args):
+        self.session_manager.edit(args[0])
+    
+    def _cmd_showid(self, args):
+        if args[0].lower() == "true":
+            self.session_manager.set_show_id(True)
+        elif args[0].lower() == "false":
+            self.session_manager.set_show_id(False)
+        else:
+            print("无效参数。使用 'showid true' 或 'showid false'")
+    
+    def _cmd_atomic_save(self, args):
+        options = [a.lower() for a in args[1:]]
+        if args[0].lower() == "on":
+            self.session_manager.set_atomic_save(True, "fsync" in options, "backup" in options)
+        elif args[0].lower() == "off":
+            self.session_manager.set_atomic_save(False)
+        else:
+            print("无效参数。使用 'atomic-save on [fsync] [backup]' 或 'atomic-save off'")
+    
+    def _cmd_journal(self, args):
+        if args[0].lower() in ("on", "off"):
+            self.session_manager.set_journal_mode(args[0].lower() == "on")
+        else:
+            print("无效参数。使用 'journal on' 或 'journal off'")
+    
+    def _cmd_checkpoints(self, args):
+        if args[0].lower() in ("on", "off"):
+            self.session_manager.set_checkpoints(args[0].lower() == "on")
+        else:
+            print("无效参数。使用 'checkpoints on' 或 'checkpoints off'")
+    
+    def _cmd_coalesce(self, args):
+        if args[0].lower() in ("on", "off"):
+            self.session_manager.set_coalesce(args[0].lower() == "on")
+        else:
+            print("无效参数。使用 'coalesce on' 或 'coalesce off'")
+    
+    def _cmd_dispatch(self, args):
+        # 当前文件和本程序的命令处理器使用相同的观察者事件分发方式
+        mode = args[0].lower()
+        if self.session_manager.set_dispatch_mode(mode):
+            self.processor.set_dispatch_mode(mode)
+    
+    def _cmd_record(self, args):
+        self.session_manager.set_recording(None if args[0].lower() == "off" else args[0])
+    
+    def _cmd_autosave(self, args):
+        """处理 autosave on|off|<seconds> 命令，无参数时显示保存延迟统计"""
+        if not args:
+            self.session_manager.show_autosave_stats()
+            return
+        
+        option = args[0].lower()
+        if option == "on":
+            self.session_manager.enable_autosave()
+        elif option == "off":
+            self.session_manager.disable_autosave()
+        else:
+            try:
+                self.session_manager.enable_autosave(float(option))
+            except ValueError:
+                print("无效参数。使用 'autosave on', 'autosave off' 或 'autosave <秒数>'")
+    
+    def _cmd_history_stats(self, args):
+        self.session_manager.show_history_stats()
+    
+    def _cmd_append(self, args):
+        text = " ".join(args[3:]) if len(args) > 3 else None
+        command = AppendCommand(self.session_manager.get_active_model(), args[0], args[1], args[2], text)
+        self.session_manager.execute_command(command)
+    
+    def _cmd_insert(self, args):
+        text = " ".join(args[3:]) if len(args) > 3 else None
+        command = InsertCommand(self.session_manager.get_active_model(), args[0], args[1], args[2], text)
+        self.session_manager.execute_command(command)
+    
+    def _cmd_delete(self, args):
+        command = DeleteCommand(self.session_manager.get_active_model(), args[0])
+        self.session_manager.execute_command(command)
+    
+    def _cmd_edit_text(self, args):
+        command = EditTextCommand(self.session_manager.get_active_model(), args[0], " ".join(args[1:]))
+        self.session_manager.execute_command(command)
+    
+    def _cmd_edit_id(self, args):
+        command = EditIdCommand(self.session_manager.get_active_model(), args[0], args[1])
+        self.session_manager.execute_command(command)
+    
+    def _cmd_tree(self, args):
+        command = PrintTreeCommand(self.session_manager.get_active_model())
+        self.session_manager.execute_command(command)
+    
+    def _cmd_spell_check(self, args):
+        # spell-check [--workers N] [--engine edits|symspell]
+        options = dict(zip(args[::2], args[1::2]))
+        workers = options.get("--workers")
+        workers = int(workers) if workers and workers.isdigit() else None
+        engine = options.get("--engine")
+        from src.commands.spellcheck.checker import SpellChecker
+        if engine is not None and engine not in SpellChecker.ENGINES:
+            print(f"未知的拼写建议引擎: {engine}，可选: {', '.join(SpellChecker.ENGINES)}")
+            return
+        command = COMMANDS.create("spell-check", self.session_manager.get_active_model(), workers=workers, engine=engine)
+        self.session_manager.execute_command(command)
+    
+    def _cmd_dir_tree(self, args):
+        # 目录树命令，不需要活动编辑器
+        command = DirTreeCommand(self.session_manager)
+        self.session_manager.execute_command(command)
+    
+    def _cmd_undo(self, args):
+        self.session_manager.undo()
+    
+    def _cmd_redo(self, args):
+        self.session_manager.redo()
+    
+    def _cmd_begin(self, args):
+        self.session_manager.begin_transaction()
+    
+    def _cmd_commit(self, args):
+        self.session_manager.commit_transaction()
+    
+    def _cmd_rollback(self, args):
+        self.session_manager.rollback_transaction()
+    
     def on_command_event(self, event_type: str, **kwargs):
         """实现CommandObserver接口
         
@@ -265,7 +417,8 @@ I/O命令:
         """
         # 处理命令事件
         if event_type == 'execute':
-            command = kwargs.get('command')
+            # 排队分发的事件以data参数传入
+            command = kwargs.get('command', kwargs.get('data'))
             if command and not command.recordable:
                 # 如果是不可记录的命令（如IO命令），清空历史
                 if isinstance(command, (ReadCommand, SaveCommand, InitCommand)):
@@ -277,6 +430,18 @@ I/O命令:
 
 def main():
     """主程序入口"""
+    # 批处理模式: run.py --script <file|-> [--on-error stop|continue] [--verbose]
+    if "--script" in sys.argv:
+        sys.exit(run_from_args(sys.argv[1:]))
+    # 多文件批量编辑: run.py batch-apply <script> <glob> [--workers N] [--output-dir DIR]
+    if len(sys.argv) > 1 and sys.argv[1] == "batch-apply":
+        from src.application.batch_apply import run_batch_from_args
+        sys.exit(run_batch_from_args(sys.argv[2:]))
+    # 重放会话录制: run.py replay <recording> [document] [--repeat N]
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        from src.application.replay import run_replay_from_args
+        sys.exit(run_replay_from_args(sys.argv[2:]))
+    
     app = Application()
     app.run()
             
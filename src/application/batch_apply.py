@@ -0,0 +1,233 @@
+"""
+多文件批量编辑: batch-apply <script> <glob>
+
+同一个编辑脚本应用到匹配的每个HTML文件。文件分发到进程池中，每个工作
+进程只创建一次 HtmlParser、HtmlModel 和 CommandProcessor，之后对每个
+文件重复 解析 -> 执行脚本 -> 保存。文件之间互不影响：某个文件的脚本
+执行失败时该文件不被写入，错误按文件报告，其余文件照常处理。
+
+脚本只能包含编辑命令（append、insert、delete、edit-text、edit-id）以及
+undo、redo、begin、commit、rollback；文件的读取和保存由批处理完成。
+"""
+import contextlib
+import glob
+import os
+import sys
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from src.application.script_runner import EDIT_COMMANDS, ScriptError, ScriptStep, parse_script
+
+# 处理器级命令: 命令名 -> 最少参数数
+PROCESSOR_COMMANDS = {'undo': 0, 'redo': 0, 'begin': 0, 'commit': 0, 'rollback': 0}
+
+class FileResult(NamedTuple):
+    """单个文件的处理结果"""
+    path: str
+    ok: bool
+    commands: int
+    elapsed: float
+    error: Optional[str] = None
+
+class BatchResult(NamedTuple):
+    """整个批处理的汇总"""
+    files: int
+    failed: int
+    commands: int
+    elapsed: float
+    workers: int
+    errors: List[Tuple[str, str]]
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else float('inf')
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.elapsed if self.elapsed > 0 else float('inf')
+
+def parse_batch_script(lines) -> List[ScriptStep]:
+    """解析批处理脚本，只允许编辑命令和处理器级命令"""
+    commands = {name: min_args for name, (min_args, _) in EDIT_COMMANDS.items()}
+    commands.update(PROCESSOR_COMMANDS)
+    return parse_script(lines, commands)
+
+class FileApplier:
+    """在一个进程内重复使用的解析器、模型和命令处理器"""
+
+    def __init__(self, steps: List[ScriptStep], output_dir: Optional[str] = None,
+                 base_dir: Optional[str] = None):
+        """
+        Args:
+            steps: 解析后的脚本
+            output_dir: 输出目录，None表示原地覆盖（原子写入）
+            base_dir: 计算输出路径时的相对基准目录（绝对路径）
+        """
+        from src.commands.base import CommandProcessor
+        from src.core.html_model import HtmlModel
+        from src.core.output import NULL_OUTPUT
+        from src.io.parser import HtmlParser
+
+        self.steps = steps
+        self.output_dir = output_dir
+        self.base_dir = base_dir
+        self.parser = HtmlParser()
+        self.model = HtmlModel()
+        self.processor = CommandProcessor()
+        self.processor.output = NULL_OUTPUT
+
+    def apply(self, path: str) -> FileResult:
+        """解析、编辑并保存一个文件"""
+        start = time.perf_counter()
+        executed = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.parser.parse(f.read(), self.model)
+            self.processor.clear_history()
+            for step in self.steps:
+                executed += 1
+                if not self._run_step(step):
+                    raise ScriptError(f"第{step.line_no}行 '{step.cmd}' 执行失败")
+            if self.processor.in_transaction:
+                raise ScriptError("脚本结束时仍有未提交的事务")
+            self._save(path)
+        except Exception as e:
+            # 丢弃未完成的事务，模型会在处理下一个文件时重新解析
+            while self.processor.in_transaction:
+                with contextlib.suppress(Exception):
+                    self.processor.rollback()
+            message = str(e) or type(e).__name__
+            return FileResult(path, False, executed, time.perf_counter() - start, message)
+        return FileResult(path, True, executed, time.perf_counter() - start)
+
+    def _run_step(self, step: ScriptStep) -> bool:
+        processor = self.processor
+        if step.cmd in EDIT_COMMANDS:
+            _, factory = EDIT_COMMANDS[step.cmd]
+            try:
+                return processor.execute(factory(self.model, step.args))
+            except Exception as e:
+                raise ScriptError(f"第{step.line_no}行 '{step.cmd}' 失败: {e}") from e
+        if step.cmd == 'begin':
+            processor.begin()
+            return True
+        if step.cmd == 'commit':
+            processor.commit()
+            return True
+        return getattr(processor, step.cmd)()
+
+    def _save(self, path: str) -> None:
+        from src.commands.io.save import SaveCommand
+        target = path
+        if self.output_dir is not None:
+            relative = os.path.relpath(os.path.abspath(path), self.base_dir)
+            target = os.path.join(self.output_dir, relative)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        command = SaveCommand(self.model, target, atomic=self.output_dir is None)
+        if not command.execute():
+            raise ScriptError(f"无法写入文件: {target}")
+
+# 工作进程内的 FileApplier，由进程池的 initializer 创建
+_applier: Optional[FileApplier] = None
+
+def _init_worker(steps, output_dir, base_dir):
+    global _applier
+    _applier = FileApplier(steps, output_dir, base_dir)
+
+def _apply_in_worker(path):
+    return _applier.apply(path)
+
+def batch_apply(steps: List[ScriptStep], paths: List[str], workers: Optional[int] = None,
+                output_dir: Optional[str] = None, base_dir: Optional[str] = None,
+                on_result=None) -> BatchResult:
+    """
+    将脚本应用到多个文件
+
+    Args:
+        steps: parse_batch_script() 的结果
+        paths: 要处理的文件
+        workers: 工作进程数，None表示CPU核数，1表示在当前进程内处理
+        output_dir: 输出目录，None表示原地覆盖
+        base_dir: 输出路径的相对基准目录，None表示所有文件的公共目录
+        on_result: 每个文件处理完后以 FileResult 调用的回调
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    if output_dir is not None and base_dir is None and paths:
+        base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    base_dir = os.path.abspath(base_dir) if base_dir else os.getcwd()
+    start = time.perf_counter()
+    if workers == 1:
+        applier = FileApplier(steps, output_dir, base_dir)
+        results = map(applier.apply, paths)
+        return _collect(results, start, workers, on_result)
+
+    from concurrent.futures import ProcessPoolExecutor
+    # 每个任务只处理一个小文件，按块分发以减少进程间通信
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(steps, output_dir, base_dir)) as executor:
+        results = executor.map(_apply_in_worker, paths, chunksize=chunksize)
+        return _collect(results, start, workers, on_result)
+
+def _collect(results, start, workers, on_result) -> BatchResult:
+    files = failed = commands = 0
+    errors = []
+    for result in results:
+        files += 1
+        commands += result.commands
+        if not result.ok:
+            failed += 1
+            errors.append((result.path, result.error))
+        if on_result is not None:
+            on_result(result)
+    return BatchResult(files, failed, commands, time.perf_counter() - start, workers, errors)
+
+def format_batch_summary(result: BatchResult) -> str:
+    """生成批处理摘要"""
+    return (f"处理 {result.files} 个文件, 失败 {result.failed} 个, "
+            f"执行 {result.commands} 条命令, 用时 {result.elapsed:.3f} 秒, "
+            f"{result.workers} 个进程 ({result.files_per_second:.1f} 文件/秒, "
+            f"{result.commands_per_second:.0f} 条/秒)")
+
+def run_batch_from_args(argv) -> int:
+    """
+    命令行入口: batch-apply <script> <glob> [--workers N] [--output-dir DIR]
+
+    Returns:
+        int: 退出码，0表示全部成功，1表示有文件失败，2表示参数或脚本错误
+    """
+    args = list(argv)
+    if args and args[0] == 'batch-apply':
+        args = args[1:]
+    options = {}
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in ('--workers', '--output-dir') and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+    if len(positional) != 2:
+        print("用法: batch-apply <script> <glob> [--workers N] [--output-dir DIR]", file=sys.stderr)
+        return 2
+    script_path, pattern = positional
+    try:
+        workers = int(options['--workers']) if '--workers' in options else None
+        with open(script_path, 'r', encoding='utf-8') as f:
+            steps = parse_batch_script(f.read().splitlines())
+    except (OSError, ValueError, ScriptError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    if not paths:
+        print(f"没有匹配的文件: {pattern}", file=sys.stderr)
+        return 2
+
+    result = batch_apply(steps, paths, workers, options.get('--output-dir'))
+    for path, error in result.errors:
+        print(f"{path}: {error}", file=sys.stderr)
+    print(format_batch_summary(result))
+    return 1 if result.failed else 0
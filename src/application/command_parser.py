@@ -3,19 +3,36 @@ from typing import Optional
 
 # 使用绝对导入路径 - 修复循环导入
 from src.commands.base import Command
-from src.commands.io import ReadCommand, SaveCommand, InitCommand
-from src.commands.edit.delete_command import DeleteCommand
-from src.commands.edit.edit_text_command import EditTextCommand
-from src.commands.edit.append_command import AppendCommand
-from src.commands.edit.edit_id_command import EditIdCommand
-from src.commands.display import PrintTreeCommand
-from src.commands.display import SpellCheckCommand
-from src.commands.edit.insert_command import InsertCommand
+from src.commands.registry import COMMANDS
 from src.core.exceptions import InvalidCommandError
 
+def _strip_quotes(value: str) -> str:
+    """移除路径两端成对的引号"""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
 class CommandParser:
     """命令解析器，用于将字符串命令解析为Command对象"""
     
+    # 命令名 -> 参数解析方法名
+    _HANDLERS = {
+        'read': '_parse_read',
+        'save': '_parse_save',
+        'export-snapshot': '_parse_snapshot',
+        'import-snapshot': '_parse_snapshot',
+        'init': '_parse_init',
+        'append': '_parse_append',
+        'insert': '_parse_insert',
+        'delete': '_parse_delete',
+        'edit-text': '_parse_edit_text',
+        'edit-id': '_parse_edit_id',
+        'print': '_parse_print',
+        'spellcheck': '_parse_spellcheck',
+        'undo': '_parse_undo',
+        'redo': '_parse_redo',
+    }
+    
     def __init__(self, processor, model):
         self.processor = processor
         self.model = model
@@ -33,83 +50,10 @@ class CommandParser:
         command_name = parts[0].lower()
         
         try:
-            if command_name == 'read':
-                if len(parts) != 2:
-                    raise InvalidCommandError("Read 命令需要一个文件路径参数")
-                file_path = parts[1]
-                # 移除引号，如果存在
-                if (file_path.startswith('"') and file_path.endswith('"')) or \
-                   (file_path.startswith("'") and file_path.endswith("'")):
-                    file_path = file_path[1:-1]
-                return ReadCommand(self.processor, self.model, file_path)
-                
-            elif command_name == 'save':
-                if len(parts) != 2:
-                    raise InvalidCommandError("Save 命令需要一个文件路径参数")
-                file_path = parts[1]
-                # 移除引号，如果存在
-                if (file_path.startswith('"') and file_path.endswith('"')) or \
-                   (file_path.startswith("'") and file_path.endswith("'")):
-                    file_path = file_path[1:-1]
-                return SaveCommand(self.model, file_path)
-                
-            elif command_name == 'init':
-                return InitCommand(self.model)
-                
-            elif command_name == 'append':
-                if len(parts) < 4:
-                    raise InvalidCommandError("Append 命令需要 tag, id, parent_id 和可选的 text 参数")
-                tag = parts[1]
-                id_value = parts[2]
-                parent_id = parts[3]
-                text = ' '.join(parts[4:]) if len(parts) > 4 else None
-                return AppendCommand(self.model, tag, id_value, parent_id, text)
-                
-            elif command_name == 'insert':
-                if len(parts) < 4:
-                    raise InvalidCommandError("Insert 命令需要 tag, id, location 和可选的 text 参数")
-                tag = parts[1]
-                id_value = parts[2]
-                location = parts[3]
-                text = ' '.join(parts[4:]) if len(parts) > 4 else None
-                return InsertCommand(self.model, tag, id_value, location, text)
-                
-            elif command_name == 'delete':
-                if len(parts) != 2:
-                    raise InvalidCommandError("Delete 命令需要一个元素ID参数")
-                element_id = parts[1]
-                return DeleteCommand(self.model, element_id)
-                
-            elif command_name == 'edit-text':
-                if len(parts) < 2:
-                    raise InvalidCommandError("Edit-text 命令需要 element_id 和可选的 text 参数")
-                element_id = parts[1]
-                text = ' '.join(parts[2:]) if len(parts) > 2 else ''
-                return EditTextCommand(self.model, element_id, text)
-                
-            elif command_name == 'edit-id':
-                if len(parts) != 3:
-                    raise InvalidCommandError("Edit-id 命令需要 oldId 和 newId 参数")
-                old_id = parts[1]
-                new_id = parts[2]
-                return EditIdCommand(self.model, old_id, new_id)
-                
-            elif command_name == 'print':
-                return PrintTreeCommand(self.model)
-                
-            elif command_name == 'spellcheck':
-                return SpellCheckCommand(self.model)
-                
-            elif command_name == 'undo':
-                # 特殊处理，返回一个空字符表示应该调用处理器的undo方法
-                return "UNDO"
-                
-            elif command_name == 'redo':
-                # 特殊处理，返回一个空字符表示应该调用处理器的redo方法
-                return "REDO"
-                
-            else:
+            handler = self._HANDLERS.get(command_name)
+            if handler is None:
                 raise InvalidCommandError(f"未知命令: {command_name}")
+            return getattr(self, handler)(parts)
         
         except InvalidCommandError as e:
             print(f"命令解析错误: {str(e)}")
@@ -117,3 +61,71 @@ class CommandParser:
         except Exception as e:
             print(f"发生错误: {str(e)}")
             return None
+    
+    # 各命令的参数解析，命令类通过注册表(COMMANDS)在第一次使用时才导入
+    
+    def _parse_read(self, parts):
+        if len(parts) != 2:
+            raise InvalidCommandError("Read 命令需要一个文件路径参数")
+        return COMMANDS.create('read', self.processor, self.model, _strip_quotes(parts[1]))
+    
+    def _parse_save(self, parts):
+        minify = '--minify' in parts[1:]
+        parts = [p for p in parts if p != '--minify']
+        if len(parts) != 2:
+            raise InvalidCommandError("Save 命令需要一个文件路径参数")
+        return COMMANDS.create('save', self.model, _strip_quotes(parts[1]), minify=minify)
+    
+    def _parse_snapshot(self, parts):
+        command_name = parts[0].lower()
+        if len(parts) != 2:
+            raise InvalidCommandError(f"{command_name} 命令需要一个文件路径参数")
+        file_path = parts[1].strip('"\'')
+        if command_name == 'export-snapshot':
+            return COMMANDS.create('export-snapshot', self.model, file_path)
+        return COMMANDS.create('import-snapshot', self.processor, self.model, file_path)
+    
+    def _parse_init(self, parts):
+        return COMMANDS.create('init', self.model)
+    
+    def _parse_append(self, parts):
+        if len(parts) < 4:
+            raise InvalidCommandError("Append 命令需要 tag, id, parent_id 和可选的 text 参数")
+        text = ' '.join(parts[4:]) if len(parts) > 4 else None
+        return COMMANDS.create('append', self.model, parts[1], parts[2], parts[3], text)
+    
+    def _parse_insert(self, parts):
+        if len(parts) < 4:
+            raise InvalidCommandError("Insert 命令需要 tag, id, location 和可选的 text 参数")
+        text = ' '.join(parts[4:]) if len(parts) > 4 else None
+        return COMMANDS.create('insert', self.model, parts[1], parts[2], parts[3], text)
+    
+    def _parse_delete(self, parts):
+        if len(parts) != 2:
+            raise InvalidCommandError("Delete 命令需要一个元素ID参数")
+        return COMMANDS.create('delete', self.model, parts[1])
+    
+    def _parse_edit_text(self, parts):
+        if len(parts) < 2:
+            raise InvalidCommandError("Edit-text 命令需要 element_id 和可选的 text 参数")
+        text = ' '.join(parts[2:]) if len(parts) > 2 else ''
+        return COMMANDS.create('edit-text', self.model, parts[1], text)
+    
+    def _parse_edit_id(self, parts):
+        if len(parts) != 3:
+            raise InvalidCommandError("Edit-id 命令需要 oldId 和 newId 参数")
+        return COMMANDS.create('edit-id', self.model, parts[1], parts[2])
+    
+    def _parse_print(self, parts):
+        return COMMANDS.create('tree', self.model)
+    
+    def _parse_spellcheck(self, parts):
+        return COMMANDS.create('spell-check', self.model)
+    
+    def _parse_undo(self, parts):
+        # 特殊处理，返回一个空字符表示应该调用处理器的undo方法
+        return "UNDO"
+    
+    def _parse_redo(self, parts):
+        # 特殊处理，返回一个空字符表示应该调用处理器的redo方法
+        return "REDO"
@@ -4,7 +4,8 @@ from src.commands.edit.insert_command import InsertCommand
 from src.commands.edit.delete_command import DeleteCommand
 from src.commands.edit.edit_text_command import EditTextCommand
 from src.commands.edit.edit_id_command import EditIdCommand
-from src.commands.display import PrintTreeCommand, SpellCheckCommand, DirTreeCommand
+from src.commands.display import PrintTreeCommand, DirTreeCommand
+from src.commands.registry import COMMANDS
 from src.session.state.session_state import SessionState
 import sys
 
@@ -14,6 +15,9 @@ def print_help():
     print("  会话命令:")
     print("    load <filename.html>   - 加载HTML文件")
     print("    save [filename.html]   - 保存当前文件或另存为")
+    print("    save --minify <file>   - 导出压缩的HTML（.gz后缀时gzip压缩）")
+    print("    export-snapshot <file> - 将当前文档导出为二进制快照")
+    print("    import-snapshot <file> - 从二进制快照快速加载当前文档")
     print("    close                  - 关闭当前文件")
     print("    editor-list            - 显示打开的文件列表")
     print("    edit <filename.html>   - 切换到指定文件")
@@ -28,14 +32,225 @@ def print_help():
     print("\n  其他命令:")
     print("    tree                   - 显示HTML树结构")
     print("    dir-tree               - 显示当前目录结构")
-    print("    spell-check            - 检查拼写错误")
+    print("    spell-check [--workers N] - 检查拼写错误，可在N个进程中并行判断单词")
     print("    undo                   - 撤销上一个操作")
     print("    redo                   - 重做上一个操作")
+    print("    history-stats          - 显示撤销历史的命令数和估算内存")
+    print("    checkpoints on|off     - 检查点历史：更早的历史换出到磁盘，深度撤销时重放")
+    print("    coalesce on|off        - 合并1秒内对同一元素的连续修改")
+    print("    dispatch sync|batch|async - 观察者事件立即、成批或由后台线程通知")
+    print("    begin / commit / rollback - 事务：提交时合并为一条历史记录，回滚时全部撤销")
     print("    exit                   - 退出程序")
     print("    help                   - 显示本帮助信息")
     
     print("\n  显示选项:")
     print("    showid true|false      - 控制树形显示时是否显示ID")
+    print("    atomic-save on|off [fsync] [backup] - 原子保存，可选刷盘和保留上一版本")
+    print("    autosave on|off|<seconds> - 后台自动保存；无参数显示统计")
+    print("    journal on|off         - 日志模式，编辑追加到 <file>.journal")
+    print("    record <file>|off      - 录制编辑操作和耗时，用 'run.py replay <file>' 重放")
+
+# 各命令的处理函数，参数为会话管理器和命令参数；返回True时退出程序
+
+def _cmd_load(session, args):
+    session.load(args[0])
+
+def _cmd_save(session, args):
+    minify = "--minify" in args
+    args = [a for a in args if a != "--minify"]
+    if minify or (args and args[0].endswith(".gz")):
+        if args:
+            session.export(args[0], minify)
+        else:
+            print("压缩输出需要指定文件名，例如 'save --minify out.html'")
+    elif len(args) >= 1:
+        session.save(args[0])
+    else:
+        session.save()
+
+def _cmd_export_snapshot(session, args):
+    session.export_snapshot(args[0])
+
+def _cmd_import_snapshot(session, args):
+    session.import_snapshot(args[0])
+
+def _cmd_close(session, args):
+    session.close()
+
+def _cmd_editor_list(session, args):
+    session.editor_list()
+
+def _cmd_edit(session, args):
+    session.edit(args[0])
+
+def _cmd_append(session, args):
+    text = " ".join(args[3:]) if len(args) > 3 else None
+    command = AppendCommand(session.get_active_model(), args[0], args[1], args[2], text)
+    session.execute_command(command)
+
+def _cmd_insert(session, args):
+    text = " ".join(args[3:]) if len(args) > 3 else None
+    command = InsertCommand(session.get_active_model(), args[0], args[1], args[2], text)
+    session.execute_command(command)
+
+def _cmd_delete(session, args):
+    command = DeleteCommand(session.get_active_model(), args[0])
+    session.execute_command(command)
+
+def _cmd_edit_text(session, args):
+    command = EditTextCommand(session.get_active_model(), args[0], " ".join(args[1:]))
+    session.execute_command(command)
+
+def _cmd_edit_id(session, args):
+    command = EditIdCommand(session.get_active_model(), args[0], args[1])
+    session.execute_command(command)
+
+def _cmd_showid(session, args):
+    if args[0].lower() == "true":
+        session.set_show_id(True)
+    elif args[0].lower() == "false":
+        session.set_show_id(False)
+    else:
+        print("无效参数。使用 'showid true' 或 'showid false'")
+
+def _cmd_atomic_save(session, args):
+    options = [a.lower() for a in args[1:]]
+    if args[0].lower() == "on":
+        session.set_atomic_save(True, "fsync" in options, "backup" in options)
+    elif args[0].lower() == "off":
+        session.set_atomic_save(False)
+    else:
+        print("无效参数。使用 'atomic-save on [fsync] [backup]' 或 'atomic-save off'")
+
+def _cmd_journal(session, args):
+    if args[0].lower() in ("on", "off"):
+        session.set_journal_mode(args[0].lower() == "on")
+    else:
+        print("无效参数。使用 'journal on' 或 'journal off'")
+
+def _cmd_checkpoints(session, args):
+    if args[0].lower() in ("on", "off"):
+        session.set_checkpoints(args[0].lower() == "on")
+    else:
+        print("无效参数。使用 'checkpoints on' 或 'checkpoints off'")
+
+def _cmd_coalesce(session, args):
+    if args[0].lower() in ("on", "off"):
+        session.set_coalesce(args[0].lower() == "on")
+    else:
+        print("无效参数。使用 'coalesce on' 或 'coalesce off'")
+
+def _cmd_dispatch(session, args):
+    session.set_dispatch_mode(args[0].lower())
+
+def _cmd_record(session, args):
+    session.set_recording(None if args[0].lower() == "off" else args[0])
+
+def _cmd_autosave(session, args):
+    if not args:
+        session.show_autosave_stats()
+    elif args[0].lower() == "on":
+        session.enable_autosave()
+    elif args[0].lower() == "off":
+        session.disable_autosave()
+    else:
+        try:
+            session.enable_autosave(float(args[0]))
+        except ValueError:
+            print("无效参数。使用 'autosave on', 'autosave off' 或 'autosave <秒数>'")
+
+def _cmd_tree(session, args):
+    command = PrintTreeCommand(session.get_active_model())
+    session.execute_command(command)
+
+def _cmd_dir_tree(session, args):
+    command = DirTreeCommand(session)
+    session.execute_command(command)
+
+def _cmd_spell_check(session, args):
+    # spell-check --workers N: 在N个进程中并行判断单词
+    workers = int(args[1]) if len(args) == 2 and args[0] == "--workers" and args[1].isdigit() else None
+    command = COMMANDS.create("spell-check", session.get_active_model(), workers=workers)
+    session.execute_command(command)
+
+def _cmd_undo(session, args):
+    session.undo()
+
+def _cmd_redo(session, args):
+    session.redo()
+
+def _cmd_history_stats(session, args):
+    session.show_history_stats()
+
+def _cmd_begin(session, args):
+    session.begin_transaction()
+
+def _cmd_commit(session, args):
+    session.commit_transaction()
+
+def _cmd_rollback(session, args):
+    session.rollback_transaction()
+
+def _cmd_help(session, args):
+    print_help()
+
+def _cmd_exit(session, args):
+    # 停止自动保存并写入尚未保存的修改
+    session.disable_autosave()
+    
+    # 保存会话状态
+    session.save_session()
+    
+    # 检查是否有未保存的文件
+    unsaved = [f for f, e in session.editors.items() if e.modified]
+    if unsaved:
+        print("以下文件未保存:")
+        for f in unsaved:
+            print(f"  {f}")
+        response = input("确定要退出吗？未保存的更改将丢失。(y/n): ")
+        if response.lower() != 'y':
+            return False
+    
+    print("感谢使用HTML编辑器。再见!")
+    return True
+
+# 命令名 -> (处理函数, 最少参数个数, 最多参数个数或None)
+_HANDLERS = {
+    "load": (_cmd_load, 1, None),
+    "save": (_cmd_save, 0, None),
+    "export-snapshot": (_cmd_export_snapshot, 1, None),
+    "import-snapshot": (_cmd_import_snapshot, 1, None),
+    "close": (_cmd_close, 0, None),
+    "editor-list": (_cmd_editor_list, 0, None),
+    "edit": (_cmd_edit, 1, None),
+    "append": (_cmd_append, 3, None),
+    "insert": (_cmd_insert, 3, None),
+    "delete": (_cmd_delete, 1, None),
+    "edit-text": (_cmd_edit_text, 2, None),
+    "edit-id": (_cmd_edit_id, 2, None),
+    "showid": (_cmd_showid, 1, None),
+    "atomic-save": (_cmd_atomic_save, 1, None),
+    "journal": (_cmd_journal, 1, 1),
+    "checkpoints": (_cmd_checkpoints, 1, 1),
+    "coalesce": (_cmd_coalesce, 1, 1),
+    "dispatch": (_cmd_dispatch, 1, 1),
+    "record": (_cmd_record, 1, 1),
+    "autosave": (_cmd_autosave, 0, None),
+    "tree": (_cmd_tree, 0, None),
+    "dir-tree": (_cmd_dir_tree, 0, None),
+    "spell-check": (_cmd_spell_check, 0, None),
+    "undo": (_cmd_undo, 0, None),
+    "redo": (_cmd_redo, 0, None),
+    "history-stats": (_cmd_history_stats, 0, None),
+    "begin": (_cmd_begin, 0, None),
+    "commit": (_cmd_commit, 0, None),
+    "rollback": (_cmd_rollback, 0, None),
+    "help": (_cmd_help, 0, None),
+    "exit": (_cmd_exit, 0, None),
+}
+
+# 作用于活动文档的命令，没有打开的文件时忽略
+_EDITOR_COMMANDS = frozenset({"append", "insert", "delete", "edit-text", "edit-id", "tree", "spell-check"})
 
 def main():
     """主函数"""
@@ -66,109 +281,14 @@ def main():
             cmd = command[0].lower()
             args = command[1:]
             
-            # 会话管理命令
-            if cmd == "load" and len(args) >= 1:
-                session.load(args[0])
-            
-            elif cmd == "save":
-                if len(args) >= 1:
-                    session.save(args[0])
-                else:
-                    session.save()
-            
-            elif cmd == "close":
-                session.close()
-            
-            elif cmd == "editor-list":
-                session.editor_list()
-            
-            elif cmd == "edit" and len(args) >= 1:
-                session.edit(args[0])
-            
-            # 编辑命令
-            elif cmd == "append" and len(args) >= 3:
-                tag, id_val, parent = args[0], args[1], args[2]
-                text = " ".join(args[3:]) if len(args) > 3 else None
-                
-                if session.active_editor:
-                    command = AppendCommand(session.get_active_model(), tag, id_val, parent, text)
-                    session.execute_command(command)
-            
-            elif cmd == "insert" and len(args) >= 3:
-                tag, id_val, before = args[0], args[1], args[2]
-                text = " ".join(args[3:]) if len(args) > 3 else None
-                
-                if session.active_editor:
-                    command = InsertCommand(session.get_active_model(), tag, id_val, before, text)
-                    session.execute_command(command)
-            
-            elif cmd == "delete" and len(args) >= 1:
-                if session.active_editor:
-                    command = DeleteCommand(session.get_active_model(), args[0])
-                    session.execute_command(command)
-            
-            elif cmd == "edit-text" and len(args) >= 2:
-                if session.active_editor:
-                    command = EditTextCommand(session.get_active_model(), args[0], " ".join(args[1:]))
-                    session.execute_command(command)
-            
-            elif cmd == "edit-id" and len(args) >= 2:
-                if session.active_editor:
-                    command = EditIdCommand(session.get_active_model(), args[0], args[1])
-                    session.execute_command(command)
-            
-            # 处理showid命令
-            elif cmd == "showid" and len(args) >= 1:
-                if args[0].lower() == "true":
-                    session.set_show_id(True)
-                elif args[0].lower() == "false":
-                    session.set_show_id(False)
-                else:
-                    print("无效参数。使用 'showid true' 或 'showid false'")
-            
-            # 其他命令
-            elif cmd == "tree":
-                if session.active_editor:
-                    command = PrintTreeCommand(session.get_active_model())
-                    session.execute_command(command)
-            
-            elif cmd == "dir-tree":
-                command = DirTreeCommand(session)
-                session.execute_command(command)
-            
-            elif cmd == "spell-check":
-                if session.active_editor:
-                    command = SpellCheckCommand(session.get_active_model())
-                    session.execute_command(command)
-            
-            elif cmd == "undo":
-                session.undo()
-            
-            elif cmd == "redo":
-                session.redo()
-            
-            elif cmd == "help":
-                print_help()
-            
-            elif cmd == "exit":
-                # 保存会话状态
-                session.save_session()
-                
-                # 检查是否有未保存的文件
-                unsaved = [f for f, e in session.editors.items() if e.modified]
-                if unsaved:
-                    print("以下文件未保存:")
-                    for f in unsaved:
-                        print(f"  {f}")
-                    response = input("确定要退出吗？未保存的更改将丢失。(y/n): ")
-                    if response.lower() != 'y':
-                        continue
-                
-                print("感谢使用HTML编辑器。再见!")
-                break
-            
-            else:
+            entry = _HANDLERS.get(cmd)
+            if entry is None or len(args) < entry[1] or (entry[2] is not None and len(args) > entry[2]):
                 print("未知命令。输入'help'查看可用命令。")
+                continue
+            if cmd in _EDITOR_COMMANDS and not session.active_editor:
+                continue
+            if entry[0](session, args):
+                break
         
         except Exception as e:
             print(f"错误: {str(e)}")
@@ -0,0 +1,154 @@
+"""
+重放会话录制: replay <recording> [document] [--repeat N]
+
+把录制的操作在起始文档上重新执行，按操作类型报告延迟分布
+（次数、平均值、p50/p90/p99、最大值）。起始文档优先使用命令行给出的
+HTML文件，其次是录制头部保存的快照，都没有时使用空文档。
+"""
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from src.io.recording import read_recording, recording_snapshot, operation_name
+
+class OperationStats(NamedTuple):
+    """一种操作的延迟统计（秒）"""
+    op: str
+    count: int
+    failed: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+class ReplayResult(NamedTuple):
+    """重放结果"""
+    replayed: int
+    skipped: int
+    failed: int
+    elapsed: float
+    stats: List[OperationStats]
+    model: object = None  # 最后一次重放得到的文档
+
+    @property
+    def rate(self) -> float:
+        """每秒重放的操作数"""
+        return self.replayed / self.elapsed if self.elapsed > 0 else float('inf')
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩法百分位数，sorted_values 必须已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies: Dict[str, List[float]], failures: Dict[str, int]) -> List[OperationStats]:
+    """按操作类型汇总延迟，按总耗时从大到小排列"""
+    stats = []
+    for op, values in latencies.items():
+        values = sorted(values)
+        stats.append(OperationStats(op, len(values), failures.get(op, 0),
+                                    sum(values) / len(values), percentile(values, 50),
+                                    percentile(values, 90), percentile(values, 99), values[-1]))
+    stats.sort(key=lambda s: s.mean * s.count, reverse=True)
+    return stats
+
+def _load_model(header, document: Optional[str]):
+    from src.core.html_model import HtmlModel
+    model = HtmlModel()
+    if document is not None:
+        from src.io.parser import HtmlParser
+        HtmlParser().parse_file(document, model)
+    else:
+        snapshot = recording_snapshot(header)
+        if snapshot is not None:
+            from src.io.snapshot import restore_snapshot
+            restore_snapshot(snapshot, model)
+    return model
+
+def replay(path: str, document: Optional[str] = None, repeat: int = 1) -> ReplayResult:
+    """
+    重放录制文件
+
+    Args:
+        path: 录制文件
+        document: 起始HTML文件，None表示使用录制中的快照
+        repeat: 重放次数，每次都从起始文档开始
+
+    Raises:
+        ValueError: 录制文件无效
+    """
+    from src.commands.base import CommandProcessor
+    from src.commands.records import replay_record
+    from src.core.output import NULL_OUTPUT
+
+    header, entries = read_recording(path)
+    latencies: Dict[str, List[float]] = {}
+    failures: Dict[str, int] = {}
+    replayed = skipped = failed = 0
+    total = 0.0
+    for _ in range(max(1, repeat)):
+        model = _load_model(header, document)
+        processor = CommandProcessor()
+        processor.output = NULL_OUTPUT
+        for entry in entries:
+            record = entry.get("record")
+            if not record:
+                skipped += 1
+                continue
+            op = entry.get("op") or operation_name(record)
+            start = time.perf_counter()
+            try:
+                ok = replay_record(processor, model, record)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            total += elapsed
+            replayed += 1
+            latencies.setdefault(op, []).append(elapsed)
+            # 录制时就失败的操作重放失败是预期的
+            if not ok and entry.get("ok", True):
+                failed += 1
+                failures[op] = failures.get(op, 0) + 1
+    return ReplayResult(replayed, skipped, failed, total, summarize(latencies, failures), model)
+
+def format_report(result: ReplayResult) -> str:
+    """生成延迟报告表格（毫秒）"""
+    lines = [f"{'操作':<12}{'次数':>8}{'失败':>6}{'平均':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'最大':>10}"]
+    for s in result.stats:
+        lines.append(f"{s.op:<14}{s.count:>8}{s.failed:>8}{s.mean * 1000:>12.3f}"
+                     f"{s.p50 * 1000:>10.3f}{s.p90 * 1000:>10.3f}{s.p99 * 1000:>10.3f}{s.max * 1000:>12.3f}")
+    lines.append(f"重放 {result.replayed} 个操作, 跳过 {result.skipped} 个, 失败 {result.failed} 个, "
+                 f"用时 {result.elapsed:.3f} 秒 ({result.rate:.0f} 个/秒), 延迟单位: 毫秒")
+    return "\n".join(lines)
+
+def run_replay_from_args(argv) -> int:
+    """
+    命令行入口: replay <recording> [document] [--repeat N]
+
+    Returns:
+        int: 退出码，0表示全部重放成功，1表示有操作失败，2表示参数或文件错误
+    """
+    args = list(argv)
+    if args and args[0] == 'replay':
+        args = args[1:]
+    repeat = 1
+    if '--repeat' in args:
+        position = args.index('--repeat')
+        try:
+            repeat = int(args[position + 1])
+        except (IndexError, ValueError):
+            print("--repeat 需要一个整数参数", file=sys.stderr)
+            return 2
+        del args[position:position + 2]
+    if len(args) not in (1, 2):
+        print("用法: replay <recording> [document] [--repeat N]", file=sys.stderr)
+        return 2
+    try:
+        result = replay(args[0], args[1] if len(args) == 2 else None, repeat)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    print(format_report(result))
+    return 1 if result.failed else 0
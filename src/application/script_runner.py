@@ -0,0 +1,281 @@
+"""
+非交互式批处理模式
+
+脚本每行一条命令，语法与交互式命令相同，空行和以 # 开头的行被忽略。
+整个脚本先解析一遍（未知命令和参数不足在执行前报告），然后在会话锁内
+逐条执行。编辑命令直接交给活动编辑器的命令处理器，执行信息写入丢弃
+一切的输出目标(NullSink)，不打印提示符和逐条的执行信息；tree、
+spell-check 等显示命令的输出照常保留。命令行运行的脚本打开的编辑器使用
+批量事件分发('batch')，观察者事件在事务提交、积压到批大小或脚本结束时成批投递。
+"""
+import contextlib
+import io
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, TextIO, Tuple
+
+from src.commands.registry import COMMANDS
+from src.commands.dispatch import BATCH
+from src.core.output import NULL_OUTPUT, get_output, use_output
+from src.session.session_manager import SessionManager
+
+# 错误处理策略
+STOP = 'stop'
+CONTINUE = 'continue'
+ERROR_POLICIES = (STOP, CONTINUE)
+
+# 编辑命令: 命令名 -> (最少参数数, 由模型和参数创建命令的函数)
+EDIT_COMMANDS = {
+    'append': (3, lambda model, a: COMMANDS.create('append', model, a[0], a[1], a[2], ' '.join(a[3:]) or None)),
+    'insert': (3, lambda model, a: COMMANDS.create('insert', model, a[0], a[1], a[2], ' '.join(a[3:]) or None)),
+    'delete': (1, lambda model, a: COMMANDS.create('delete', model, a[0])),
+    'edit-text': (2, lambda model, a: COMMANDS.create('edit-text', model, a[0], ' '.join(a[1:]))),
+    'edit-id': (2, lambda model, a: COMMANDS.create('edit-id', model, a[0], a[1])),
+}
+
+# 命令的输出方式
+EDIT = 'edit'  # 通过输出目标报告，批处理时丢弃
+SESSION = 'session'  # 会话级命令直接打印，批处理时重定向丢弃
+DISPLAY = 'display'  # 显示命令的输出总是保留
+
+class ScriptError(Exception):
+    """脚本解析或执行失败"""
+    pass
+
+class ScriptStep(NamedTuple):
+    """解析后的一条脚本命令"""
+    line_no: int
+    cmd: str
+    args: List[str]
+
+class ScriptResult(NamedTuple):
+    """脚本执行结果"""
+    executed: int
+    failed: int
+    elapsed: float
+    errors: List[Tuple[int, str]]
+
+    @property
+    def rate(self) -> float:
+        """每秒执行的命令数"""
+        return self.executed / self.elapsed if self.elapsed > 0 else float('inf')
+
+def parse_script(lines, commands: Dict[str, int]) -> List[ScriptStep]:
+    """
+    解析脚本，空行和以 # 开头的行被忽略
+
+    Args:
+        lines: 脚本的各行
+        commands: 允许的命令名 -> 最少参数数
+
+    Raises:
+        ScriptError: 当存在未知命令或参数不足时，列出所有出错的行
+    """
+    steps = []
+    problems = []
+    for line_no, line in enumerate(lines, 1):
+        parts = line.strip().split()
+        if not parts or parts[0].startswith('#'):
+            continue
+        cmd, args = parts[0].lower(), parts[1:]
+        min_args = commands.get(cmd)
+        if min_args is None:
+            problems.append(f"第{line_no}行: 未知命令 '{cmd}'")
+        elif len(args) < min_args:
+            problems.append(f"第{line_no}行: '{cmd}' 至少需要 {min_args} 个参数")
+        else:
+            steps.append(ScriptStep(line_no, cmd, args))
+    if problems:
+        raise ScriptError("脚本解析失败:\n" + "\n".join(problems))
+    return steps
+
+class ScriptRunner:
+    """批量执行命令脚本"""
+
+    def __init__(self, session_manager, on_error: str = STOP, verbose: bool = False):
+        """
+        初始化脚本执行器
+
+        Args:
+            session_manager: 会话管理器
+            on_error: 某行失败时的策略，'stop'停止执行，'continue'记录后继续
+            verbose: 是否保留编辑命令和会话命令的逐条输出
+        """
+        if on_error not in ERROR_POLICIES:
+            raise ValueError(f"无效的错误处理策略: {on_error}")
+        self.session_manager = session_manager
+        self.on_error = on_error
+        self.verbose = verbose
+        # 命令名 -> (最少参数数, 处理函数, 输出方式)
+        self._handlers: Dict[str, Tuple[int, Callable, str]] = self._build_handlers()
+
+    def _build_handlers(self):
+        session = self.session_manager
+        handlers = {name: (min_args, self._edit(factory), EDIT)
+                    for name, (min_args, factory) in EDIT_COMMANDS.items()}
+        handlers.update({
+            'load': (1, lambda args: session.load(args[0]), SESSION),
+            'save': (0, self._save, SESSION),
+            'edit': (1, lambda args: session.edit(args[0]), SESSION),
+            'close': (0, self._close, SESSION),
+            'export-snapshot': (1, lambda args: session.export_snapshot(args[0]), SESSION),
+            'import-snapshot': (1, lambda args: session.import_snapshot(args[0]), SESSION),
+            'undo': (0, lambda args: session.undo(), EDIT),
+            'redo': (0, lambda args: session.redo(), EDIT),
+            'begin': (0, lambda args: session.begin_transaction(), SESSION),
+            'commit': (0, lambda args: session.commit_transaction(), SESSION),
+            'rollback': (0, lambda args: session.rollback_transaction(), SESSION),
+            'showid': (1, self._show_id, SESSION),
+            'journal': (1, self._journal, SESSION),
+            'dispatch': (1, lambda args: session.set_dispatch_mode(args[0].lower()), SESSION),
+            'tree': (0, self._tree, DISPLAY),
+            'spell-check': (0, lambda args: session.execute_command(COMMANDS.create('spell-check', self._model())), DISPLAY),
+            'dir-tree': (0, lambda args: session.execute_command(COMMANDS.create('dir-tree', session)), DISPLAY),
+            'editor-list': (0, lambda args: session.editor_list(), DISPLAY),
+            'history-stats': (0, lambda args: session.show_history_stats(), DISPLAY),
+        })
+        return handlers
+
+    def parse(self, lines) -> List[ScriptStep]:
+        """
+        解析整个脚本
+
+        Raises:
+            ScriptError: 当存在未知命令或参数不足时，列出所有出错的行
+        """
+        return parse_script(lines, {name: handler[0] for name, handler in self._handlers.items()})
+
+    def run(self, steps: List[ScriptStep], errors: TextIO = None) -> ScriptResult:
+        """
+        执行解析后的脚本
+
+        Args:
+            steps: parse() 的结果
+            errors: 错误信息的输出流，默认为标准错误
+        """
+        errors = errors or sys.stderr
+        quiet = io.StringIO()
+        failures = []
+        executed = 0
+        start = time.perf_counter()
+        sink = get_output() if self.verbose else NULL_OUTPUT
+        with self.session_manager.lock, use_output(sink):
+            for step in steps:
+                _, handler, mode = self._handlers[step.cmd]
+                executed += 1
+                try:
+                    if mode != SESSION or self.verbose:
+                        ok = handler(step.args)
+                    else:
+                        with contextlib.redirect_stdout(quiet):
+                            ok = handler(step.args)
+                        # 丢弃被抑制的输出，避免长脚本占用内存
+                        quiet.seek(0)
+                        quiet.truncate()
+                    message = None if ok is not False else "命令执行失败"
+                except Exception as e:
+                    message = str(e) or type(e).__name__
+                if message is None:
+                    continue
+                failures.append((step.line_no, message))
+                print(f"第{step.line_no}行 '{step.cmd}' 失败: {message}", file=errors)
+                if self.on_error == STOP:
+                    break
+            # 批量分发模式下投递尚未达到批大小的事件
+            for editor in self.session_manager.editors.values():
+                editor.processor.flush_events()
+        elapsed = time.perf_counter() - start
+        return ScriptResult(executed, len(failures), elapsed, failures)
+
+    def run_lines(self, lines, errors: TextIO = None) -> ScriptResult:
+        """解析并执行脚本"""
+        return self.run(self.parse(lines), errors)
+
+    def _model(self):
+        if not self.session_manager.active_editor:
+            raise ScriptError("没有活动编辑器，请先使用 load 加载文件")
+        return self.session_manager.get_active_model()
+
+    def _tree(self, args):
+        command = COMMANDS.create('tree', self._model())
+        # 直接指定会话，避免命令在调用栈中查找会话设置
+        command.session = self.session_manager
+        return self.session_manager.execute_command(command)
+
+    def _edit(self, factory):
+        """编辑命令直接交给活动编辑器执行，异常由run按行处理"""
+        def handler(args):
+            editor = self.session_manager.active_editor
+            if editor is None:
+                raise ScriptError("没有活动编辑器，请先使用 load 加载文件")
+            return editor.execute_command(factory(editor.model, args), raise_errors=True)
+        return handler
+
+    def _save(self, args):
+        minify = '--minify' in args
+        args = [a for a in args if a != '--minify']
+        if minify or (args and args[0].endswith('.gz')):
+            if not args:
+                raise ScriptError("压缩输出需要指定文件名")
+            return self.session_manager.export(args[0], minify)
+        return self.session_manager.save(args[0] if args else None)
+
+    def _close(self, args):
+        editor = self.session_manager.active_editor
+        if editor is not None and editor.modified:
+            raise ScriptError(f"文件 {editor.filename} 有未保存的修改，请先保存")
+        return self.session_manager.close()
+
+    def _show_id(self, args):
+        value = args[0].lower()
+        if value not in ('true', 'false'):
+            raise ScriptError("showid 的参数必须是 true 或 false")
+        return self.session_manager.set_show_id(value == 'true')
+
+    def _journal(self, args):
+        value = args[0].lower()
+        if value not in ('on', 'off'):
+            raise ScriptError("journal 的参数必须是 on 或 off")
+        return self.session_manager.set_journal_mode(value == 'on')
+
+def format_summary(result: ScriptResult) -> str:
+    """生成执行摘要"""
+    return (f"执行 {result.executed} 条命令, 失败 {result.failed} 条, "
+            f"用时 {result.elapsed:.3f} 秒 ({result.rate:.0f} 条/秒)")
+
+def run_from_args(argv, stdin: TextIO = None) -> int:
+    """
+    命令行入口: --script <文件|-> [--on-error stop|continue] [--verbose]
+
+    省略文件名或使用 - 时从标准输入读取脚本。
+
+    Returns:
+        int: 退出码，0表示全部成功，1表示有命令失败，2表示脚本无法读取或解析
+    """
+    index = argv.index('--script')
+    path = argv[index + 1] if index + 1 < len(argv) and not argv[index + 1].startswith('--') else '-'
+    on_error = STOP
+    if '--on-error' in argv:
+        position = argv.index('--on-error')
+        on_error = argv[position + 1] if position + 1 < len(argv) else ''
+    try:
+        # 脚本没有交互，观察者事件成批投递，不增加每条命令的延迟
+        runner = ScriptRunner(SessionManager(dispatch_mode=BATCH), on_error, verbose='--verbose' in argv)
+        if path == '-':
+            lines = (stdin or sys.stdin).read().splitlines()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        steps = runner.parse(lines)
+    except (OSError, ValueError, ScriptError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    result = runner.run(steps)
+    session = runner.session_manager
+    session.disable_autosave()
+    unsaved = [name for name, editor in session.editors.items() if editor.modified]
+    if unsaved:
+        print("警告: 以下文件有未保存的修改: " + ", ".join(unsaved), file=sys.stderr)
+    print(format_summary(result))
+    return 1 if result.failed else 0
@@ -1,12 +1,28 @@
+import functools
+import sys
+import time
+from contextlib import contextmanager
 from typing import List, Optional, TYPE_CHECKING, Any
 from abc import ABC, abstractmethod
 from .observer import CommandObserver
+from src.core.output import OutputSink, get_output
 
 class Command(ABC):
     """Command base class, defines common interface for all commands"""
+    _output: Optional[OutputSink] = None  # Injected output sink, None means the global one
+    
     def __init__(self):
         self.recordable = True  # Whether to record in history for undo/redo
     
+    @property
+    def output(self) -> OutputSink:
+        """Where the command reports progress; falls back to get_output()"""
+        return self._output if self._output is not None else get_output()
+    
+    @output.setter
+    def output(self, sink: Optional[OutputSink]) -> None:
+        self._output = sink
+    
     @abstractmethod
     def execute(self) -> bool:
         """Execute the command
@@ -24,6 +40,57 @@ class Command(ABC):
             True if undo successful, False otherwise
         """
         pass
+    
+    def to_record(self) -> Optional[list]:
+        """Serialize the command as [name, *args] for the edit journal
+        
+        Returns:
+            The record, or None if the command cannot be replayed from a record
+        """
+        return None
+    
+    def merge(self, other: 'Command') -> bool:
+        """Absorb a later command so both become one history entry
+        
+        Called by CommandHistory when ``other`` was executed right after this
+        command. On success this command must undo/redo the combined effect.
+        
+        Returns:
+            True if ``other`` was merged into this command
+        """
+        return False
+    
+    def size_hint(self) -> int:
+        """Estimate the bytes this command keeps alive while it sits in history
+        
+        The default counts the command object and its string state. Commands
+        that hold on to element subtrees add the size of those subtrees.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        for value in self.__dict__.values():
+            if isinstance(value, str):
+                size += sys.getsizeof(value)
+        return size
+
+# 编辑日志中表示"合并进上一条历史记录"的记录前缀
+COALESCE = 'coalesce'
+
+def _recorded(method):
+    """录制会话时，把处理器操作(undo/redo/begin/commit/rollback)及其耗时写入录制文件"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.recorder is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            self.recorder.record([method.__name__], time.perf_counter() - started, False)
+            raise
+        # begin/commit 没有返回值，没有抛出异常即为成功
+        self.recorder.record([method.__name__], time.perf_counter() - started, result is not False)
+        return result
+    return wrapper
 
 class CommandProcessor:
     """命令处理器，负责命令的执行、撤销和重做"""
@@ -33,28 +100,203 @@ class CommandProcessor:
         from src.commands.do.history import CommandHistory
         self.history = CommandHistory()
         self.observers = []
+        self.journal = None  # 可选的编辑日志，记录每个可记录命令
+        self._transactions = []  # 进行中的事务(CompositeCommand)栈，支持嵌套
+        self.checkpoints = None  # 可选的检查点历史，活动历史用尽后继续撤销
+        self.output = None  # 注入给所执行命令的输出目标，None表示使用全局输出
+        self.dispatcher = None  # 可选的观察者事件分发器，None表示同步直接通知
+        self.recorder = None  # 可选的会话录制(SessionRecorder)，记录每个操作及其耗时
     
     # Add alias for backward compatibility with tests
     @property
     def command_history(self):
         return self.history
     
-    def execute(self, command):
-        """执行命令"""
+    def execute(self, command, coalesce=None):
+        """
+        执行命令
+        
+        Args:
+            command: 要执行的命令
+            coalesce: 是否与上一条历史记录合并，None表示由历史记录按时间窗口决定
+        """
+        if self.recorder is None:
+            return self._execute(command, coalesce)[0]
+        started = time.perf_counter()
+        try:
+            result, record = self._execute(command, coalesce)
+        except Exception:
+            self.recorder.record(self._command_record(command), time.perf_counter() - started,
+                                 False, command)
+            raise
+        self.recorder.record(record, time.perf_counter() - started, result, command)
+        return result
+    
+    @staticmethod
+    def _command_record(command):
+        return command.to_record() if hasattr(command, 'to_record') else None
+    
+    def _execute(self, command, coalesce):
+        """执行命令，返回 (执行结果, 命令的日志记录)"""
+        if self.output is not None and getattr(command, '_output', None) is None:
+            command.output = self.output
+        if self.checkpoints is not None and getattr(command, 'recordable', False):
+            self.checkpoints.prepare()
         result = command.execute()
         
-        # 如果命令可记录且执行成功，添加到历史记录
         if result and hasattr(command, 'recordable') and command.recordable:
-            self.history.add_command(command)
+            # 事务中的命令先收集起来，提交时作为一条历史记录
+            if self._transactions:
+                self._transactions[-1].add(command)
+                return result, self._command_record(command)
+            
+            # 如果命令可记录且执行成功，添加到历史记录
+            merged = self.history.add_command(command, coalesce=coalesce)
             # 清空重做列表，因为执行了新命令
             self.history.redos.clear()
+            record = command.to_record() if hasattr(command, 'to_record') else None
+            if self.checkpoints is not None:
+                if merged:
+                    self.checkpoints.replace_last(record)
+                else:
+                    self.checkpoints.push(record)
+            if merged and record is not None:
+                # 重放时也要合并进上一条记录，保证撤销的粒度一致
+                record = [COALESCE, *record]
+            self._journal_record(record)
+            return result, record
             
-        return result
+        return result, self._command_record(command)
+    
+    @property
+    def in_transaction(self):
+        """是否有进行中的事务"""
+        return bool(self._transactions)
+    
+    @property
+    def current_transaction(self):
+        """最内层进行中的事务，没有时返回None"""
+        return self._transactions[-1] if self._transactions else None
+    
+    @_recorded
+    def begin(self, description="批量操作"):
+        """
+        开始事务，之后执行的可记录命令在提交前不进入历史记录、
+        不通知观察者、不写入编辑日志
+        
+        事务可以嵌套，内层事务提交后并入外层事务。
+        """
+        from src.commands.composite import CompositeCommand
+        self._transactions.append(CompositeCommand(description=description))
+    
+    @_recorded
+    def commit(self):
+        """
+        提交最内层事务，将其中的命令作为一条历史记录
         
+        Returns:
+            True 如果事务中有命令被记录
+            
+        Raises:
+            InvalidOperationError: 当没有进行中的事务时
+        """
+        composite = self._pop_transaction()
+        if not composite.commands:
+            return False
+        if self._transactions:
+            self._transactions[-1].add(composite)
+        else:
+            self.history.add_command(composite)
+            self.history.redos.clear()
+            record = composite.to_record()
+            if self.checkpoints is not None:
+                self.checkpoints.push(record)
+            self._journal_record(record)
+            if self.dispatcher is not None and self.dispatcher.mode == 'batch':
+                # 批量分发模式在顶层事务提交时投递整个事务的事件
+                self.dispatcher.flush()
+        return True
+    
+    @_recorded
+    def rollback(self):
+        """
+        回滚最内层事务，按相反顺序撤销其中已执行的命令
+        
+        Returns:
+            True 如果所有命令都撤销成功
+            
+        Raises:
+            InvalidOperationError: 当没有进行中的事务时
+        """
+        return self._pop_transaction().undo()
+    
+    def _pop_transaction(self):
+        if not self._transactions:
+            from src.core.exceptions import InvalidOperationError
+            raise InvalidOperationError("没有进行中的事务")
+        return self._transactions.pop()
+    
+    @contextmanager
+    def transaction(self, description="批量操作"):
+        """
+        事务上下文管理器，正常退出时提交，出现异常时回滚并重新抛出
+        
+        Example:
+            with processor.transaction():
+                processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+                processor.execute(EditTextCommand(model, 'p1', 'text'))
+        """
+        self.begin(description)
+        try:
+            yield self.current_transaction
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+    
+    def attach_checkpoints(self, checkpoints):
+        """设置检查点历史(CheckpointHistory)，活动历史用尽后从检查点恢复并重放来撤销"""
+        self.checkpoints = checkpoints
+    
+    def detach_checkpoints(self):
+        """移除检查点历史并返回它，之后只能撤销活动历史中的命令"""
+        checkpoints, self.checkpoints = self.checkpoints, None
+        return checkpoints
+    
+    def attach_recorder(self, recorder):
+        """设置会话录制(SessionRecorder)，之后的每个操作连同耗时写入录制文件"""
+        self.recorder = recorder
+    
+    def detach_recorder(self):
+        """停止录制并返回录制对象"""
+        recorder, self.recorder = self.recorder, None
+        return recorder
+    
+    def attach_journal(self, journal):
+        """设置编辑日志，之后执行的可记录命令以及撤销/重做都会追加到日志"""
+        self.journal = journal
+    
+    def detach_journal(self):
+        """移除编辑日志并返回它"""
+        journal, self.journal = self.journal, None
+        return journal
+    
+    def _journal_record(self, record):
+        """向编辑日志追加记录，无法记录的命令要求日志尽快合并"""
+        if self.journal is None:
+            return
+        if record is None:
+            self.journal.needs_compaction = True
+        else:
+            self.journal.append(record)
+        
+    @_recorded
     def undo(self):
         """撤销上一个命令"""
-        if not self.history.can_undo():
+        if self._transactions:
             return False
+        if not self.history.can_undo():
+            return self._undo_from_checkpoint()
             
         command = self.history.pop_last_command()
         if not command:
@@ -63,11 +305,34 @@ class CommandProcessor:
         result = command.undo()
         if result:
             self.history.add_to_redos(command)
+            if self.checkpoints is not None:
+                self.checkpoints.moved(-1)
+            self._journal_record(['undo'])
             
         return result
+    
+    def _undo_from_checkpoint(self):
+        """活动历史已用尽（或被淘汰），恢复检查点并重放到上一个状态"""
+        if self.checkpoints is None or not self.checkpoints.can_undo():
+            return False
+        result = self.checkpoints.undo()
+        if result:
+            self._journal_record(['undo'])
+        return result
         
+    @_recorded
     def redo(self):
         """重做上一个被撤销的命令"""
+        if self._transactions:
+            return False
+        # 通过检查点撤销的命令位于活动重做列表之前，先重做它们
+        if self.checkpoints is not None and self.checkpoints.can_redo(len(self.history.redos)):
+            command = self.checkpoints.redo()
+            if not command:
+                return False
+            self.history.add_command(command, coalesce=False, clear_redos=False)
+            self._journal_record(['redo'])
+            return True
         if not self.history.can_redo():
             return False
             
@@ -84,16 +349,22 @@ class CommandProcessor:
                 
             if result:
                 # Make sure to append to history AFTER successful execution
-                self.history.add_command(command)
+                # 保留其余的重做命令，支持连续重做
+                self.history.add_command(command, coalesce=False, clear_redos=False)
+                if self.checkpoints is not None:
+                    self.checkpoints.moved(1)
+                self._journal_record(['redo'])
                 
             return result
         except Exception as e:
-            print(f"Error redoing command: {e}")
+            (self.output or get_output()).error("Error redoing command: %s", e)
             return False
         
     def clear_history(self):
         """清空命令历史"""
         self.history.clear()
+        if self.checkpoints is not None:
+            self.checkpoints.reset()
     
     # Add observer pattern support
     def add_observer(self, observer):
@@ -112,8 +383,37 @@ class CommandProcessor:
             if hasattr(self.history, 'remove_observer'):
                 self.history.remove_observer(observer)
                 
+    def set_dispatch_mode(self, mode, **options):
+        """
+        设置观察者事件的分发方式
+        
+        Args:
+            mode: 'sync' 在命令路径上立即通知；'batch' 排队，在顶层事务提交、
+                  flush_events() 或积压到批大小时成批通知；'async' 由后台线程成批通知
+            options: 传给 EventDispatcher 的参数，如 max_pending、overflow、batch_size
+            
+        Returns:
+            EventDispatcher: 新的分发器，'sync' 模式下为 None
+        """
+        from src.commands.dispatch import EventDispatcher, SYNC
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+        self.dispatcher = None if mode == SYNC else EventDispatcher(mode, **options)
+        self.history.dispatcher = self.dispatcher
+        return self.dispatcher
+    
+    def flush_events(self):
+        """投递排队中的观察者事件，返回投递的事件数"""
+        if self.dispatcher is None:
+            return 0
+        return self.dispatcher.flush()
+    
     def notify_observers(self, event_type, data=None):
         """通知所有观察者"""
+        if self.dispatcher is not None:
+            self.dispatcher.dispatch([observer for observer in self.observers
+                                      if hasattr(observer, 'update')], event_type, data)
+            return
         for observer in self.observers:
             if hasattr(observer, 'update'):
                 observer.update(event_type, data)
\ No newline at end of file
@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from .base import Command
+
+class CompositeCommand(Command):
+    """由多个命令组成的宏命令，作为一条历史记录整体撤销和重做"""
+
+    def __init__(self, commands: Optional[List[Command]] = None, description: str = "批量操作"):
+        super().__init__()
+        self.commands = list(commands or [])
+        self.description = description
+
+    def __len__(self):
+        return len(self.commands)
+
+    def add(self, command: Command) -> None:
+        """追加一个已执行的子命令"""
+        self.commands.append(command)
+
+    def execute(self) -> bool:
+        """依次执行所有子命令，任一失败时撤销已执行的部分"""
+        done = []
+        try:
+            for command in self.commands:
+                if self._output is not None and command._output is None:
+                    command.output = self._output
+                if not command.execute():
+                    self._undo_all(done)
+                    return False
+                done.append(command)
+        except Exception:
+            self._undo_all(done)
+            raise
+        return True
+
+    def undo(self) -> bool:
+        """按相反顺序撤销所有子命令"""
+        return self._undo_all(self.commands)
+
+    @staticmethod
+    def _undo_all(commands) -> bool:
+        for command in reversed(commands):
+            if not command.undo():
+                return False
+        return True
+
+    def to_record(self):
+        """序列化为 ['batch', 子命令记录...]，任一子命令无法记录时返回None"""
+        records = [command.to_record() for command in self.commands]
+        if any(record is None for record in records):
+            return None
+        return ['batch', *records]
+
+    def size_hint(self) -> int:
+        """子命令的估算大小之和"""
+        return super().size_hint() + sum(command.size_hint() for command in self.commands)
+
+    def __str__(self):
+        return f"CompositeCommand({self.description}, {len(self.commands)} commands)"
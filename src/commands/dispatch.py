@@ -0,0 +1,227 @@
+import threading
+from collections import deque
+from typing import Any, Iterable, List, Optional, Tuple
+
+from src.core.output import get_output
+
+# 分发模式
+SYNC = 'sync'  # 在命令路径上立即逐个通知（默认）
+BATCH = 'batch'  # 排队，在事务提交、flush() 或队列达到批大小时成批通知
+ASYNC = 'async'  # 排队，由后台线程成批通知
+MODES = (SYNC, BATCH, ASYNC)
+
+# 队列满时的背压策略
+BLOCK = 'block'  # 等待队列腾出空间（批量模式下在当前线程立即投递）
+DROP_OLDEST = 'drop-oldest'  # 丢弃最早的事件
+DROP_NEWEST = 'drop-newest'  # 丢弃新事件
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+Event = Tuple[str, Any]
+
+def deliver(observer, events: List[Event]) -> None:
+    """
+    向一个观察者投递一批事件
+
+    实现了 update_batch(events) 的观察者一次收到整批（已合并的）事件，
+    否则按顺序逐个调用 update(event_type, data)；只实现
+    CommandObserver.on_command_event 的观察者以 data 关键字参数接收。
+    """
+    if hasattr(observer, 'update_batch'):
+        observer.update_batch(events)
+    elif hasattr(observer, 'update'):
+        for event_type, data in events:
+            observer.update(event_type, data)
+    elif hasattr(observer, 'on_command_event'):
+        for event_type, data in events:
+            observer.on_command_event(event_type, data=data)
+
+class EventDispatcher:
+    """观察者事件分发器
+
+    命令处理器和命令历史把事件交给分发器，由它决定何时通知观察者。
+    SYNC 模式与直接调用观察者相同；BATCH 和 ASYNC 模式只在命令路径上
+    把 (观察者, 事件) 放入队列，投递时按观察者合并成批，慢观察者不再
+    增加每次编辑的延迟。
+
+    队列长度超过 max_pending 时按 overflow 策略处理，被丢弃的事件数
+    记录在 dropped 中。排队模式下观察者抛出的异常只报告不传播。
+    """
+
+    DEFAULT_MAX_PENDING = 10000
+    DEFAULT_BATCH_SIZE = 256
+
+    def __init__(self, mode: str = SYNC, max_pending: int = DEFAULT_MAX_PENDING,
+                 overflow: str = BLOCK, batch_size: int = DEFAULT_BATCH_SIZE,
+                 interval: float = 0.05):
+        """
+        初始化分发器
+
+        Args:
+            mode: 分发模式，'sync'、'batch' 或 'async'
+            max_pending: 队列中最多积压的事件数
+            overflow: 队列满时的策略，'block'、'drop-oldest' 或 'drop-newest'
+            batch_size: 批量模式下队列达到此长度时自动投递
+            interval: 异步模式下后台线程等待更多事件合并成批的时间（秒）
+        """
+        if mode not in MODES:
+            raise ValueError(f"无效的分发模式: {mode}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"无效的背压策略: {overflow}")
+        self.mode = mode
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._queue = deque()  # (观察者, 事件类型, 数据)
+        self._condition = threading.Condition()
+        self._delivering = threading.Lock()  # 保证同一时间只有一个线程投递，维持事件顺序
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._busy = False  # 后台线程正在投递
+        self._deliverer = None  # 正在投递事件的线程
+        self.dispatched = 0  # 进入分发器的事件数（按观察者计）
+        self.delivered = 0  # 已投递的事件数
+        self.batches = 0  # 投递的批次数
+        self.dropped = 0  # 因背压被丢弃的事件数
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def dispatch(self, observers: Iterable, event_type: str, data: Any = None) -> None:
+        """把事件分发给一组观察者"""
+        if self.mode == SYNC or self._closed:
+            for observer in observers:
+                deliver(observer, [(event_type, data)])
+            return
+        observers = tuple(observers)
+        if not observers:
+            return
+        with self._condition:
+            for observer in observers:
+                self.dispatched += 1
+                if len(self._queue) >= self.max_pending and not self._make_room():
+                    continue
+                self._queue.append((observer, event_type, data))
+            if self.mode == ASYNC:
+                self._ensure_worker()
+                self._condition.notify_all()
+                return
+            # 批量模式没有后台线程，积压到批大小时在当前线程投递；
+            # block 策略下队列满也立即投递，而不是丢弃事件
+            flush_now = (len(self._queue) >= self.batch_size
+                         or (self.overflow == BLOCK and len(self._queue) >= self.max_pending))
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        在当前线程投递队列中的全部事件
+
+        Returns:
+            int: 投递的事件数
+        """
+        with self._delivering:
+            with self._condition:
+                items = list(self._queue)
+                self._queue.clear()
+                self._condition.notify_all()
+            return self._deliver(items)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待后台线程投递完已排队的事件，批量模式下等同于 flush()
+
+        Returns:
+            bool: 队列是否已清空
+        """
+        if self.mode != ASYNC or self._thread is None:
+            self.flush()
+            return True
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self) -> None:
+        """投递剩余事件并停止后台线程，之后的事件同步投递"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "pending": self.pending,
+            "dispatched": self.dispatched,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+    def _make_room(self) -> bool:
+        """队列已满时按背压策略处理（已持有 _condition）；返回False表示丢弃新事件"""
+        if self.overflow == DROP_NEWEST:
+            self.dropped += 1
+            return False
+        if self.overflow == DROP_OLDEST:
+            self._queue.popleft()
+            self.dropped += 1
+            return True
+        if self.mode == ASYNC and self._deliverer != threading.get_ident():
+            # 等待后台线程消费；观察者在投递过程中产生的事件不能等待自己
+            self._ensure_worker()
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: len(self._queue) < self.max_pending or self._closed)
+        return True
+
+    def _deliver(self, items) -> int:
+        """按观察者合并事件并投递（调用者持有 _delivering）"""
+        if not items:
+            return 0
+        self._deliverer = threading.get_ident()
+        try:
+            grouped = {}
+            for observer, event_type, data in items:
+                grouped.setdefault(id(observer), (observer, []))[1].append((event_type, data))
+            for observer, events in grouped.values():
+                try:
+                    deliver(observer, events)
+                except Exception as e:
+                    get_output().error("观察者处理事件失败: %s", e)
+        finally:
+            self._deliverer = None
+        self.delivered += len(items)
+        self.batches += 1
+        return len(items)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name='observer-dispatch', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """后台线程：等待事件，短暂积攒后成批投递"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue and self._closed:
+                    return
+                if len(self._queue) < self.batch_size and not self._closed:
+                    self._condition.wait_for(
+                        lambda: len(self._queue) >= self.batch_size or self._closed, self.interval)
+            with self._delivering:
+                with self._condition:
+                    items = list(self._queue)
+                    self._queue.clear()
+                    self._busy = True
+                    self._condition.notify_all()
+                try:
+                    self._deliver(items)
+                finally:
+                    with self._condition:
+                        self._busy = False
+                        self._condition.notify_all()
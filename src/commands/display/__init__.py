@@ -1,9 +1,25 @@
 """
 显示命令模块，包含各种显示相关的命令
+
+命令类在第一次访问时才导入，避免 import 本包就加载拼写检查依赖。
 """
-from .base import DisplayCommand
-from .print_tree import PrintTreeCommand
-from .spell_check import SpellCheckCommand
-from .dir_tree import DirTreeCommand
+import importlib
+
+_EXPORTS = {
+    'DisplayCommand': '.base',
+    'PrintTreeCommand': '.print_tree',
+    'SpellCheckCommand': '.spell_check',
+    'DirTreeCommand': '.dir_tree',
+}
 
 __all__ = ['DisplayCommand', 'PrintTreeCommand', 'SpellCheckCommand', 'DirTreeCommand']
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,5 @@
 from src.commands.base import Command
 from src.core.html_model import HtmlModel
-from src.commands.spellcheck.checker import SpellChecker
 
 class PrintTreeCommand(Command):
     """HTML树结构显示命令"""
@@ -23,7 +22,7 @@ class PrintTreeCommand(Command):
         self.session = None
         
         if self.check_spelling:
-            self.spell_checker = SpellChecker()
+            self.spell_checker = self._create_spell_checker()
         else:
             self.spell_checker = None
     
@@ -35,8 +34,12 @@ class PrintTreeCommand(Command):
             from src.session.session_manager import SessionManager
             import inspect
             
-            # 查找当前调用栈中的SessionManager实例
-            frame = inspect.currentframe()
+            # 已指定会话时直接读取设置，否则查找当前调用栈中的SessionManager实例
+            frame = None if self.session is not None else inspect.currentframe()
+            if self.session is not None:
+                self.show_id = self.session.get_show_id()
+                if hasattr(self.session, 'check_spelling'):
+                    self.check_spelling = self.session.check_spelling
             while frame:
                 # 遍历局部变量查找SessionManager实例
                 for var_name, var_obj in frame.f_locals.items():
@@ -87,12 +90,18 @@ class PrintTreeCommand(Command):
         
         # 为拼写检查准备SpellChecker实例
         if self.check_spelling and not self.spell_checker:
-            self.spell_checker = SpellChecker()
+            self.spell_checker = self._create_spell_checker()
         
         # 递归打印树
         self._print_node(root, "", True)
         return True
     
+    @staticmethod
+    def _create_spell_checker():
+        # 拼写检查依赖较重，只在需要标记拼写错误时导入
+        from src.commands.spellcheck.checker import SpellChecker
+        return SpellChecker()
+    
     def _print_node(self, node, prefix, is_last):
         """递归打印节点及其子节点"""
         branch = "└── " if is_last else "├── "
@@ -1,13 +1,38 @@
+from itertools import chain, compress, repeat
+from operator import itemgetter, ne
+
 from ...core.html_model import HtmlModel
 from ...core.element import HtmlElement
-from ...commands.spellcheck.checker import SpellChecker, SpellErrorReporter, ConsoleReporter
+from ...commands.spellcheck.checker import SpellChecker, SpellErrorReporter, ConsoleReporter, WORD_PATTERN
 from .base import DisplayCommand
 from ..base import Command
 
+# 元素片段缓存中拼写检查结果的键，值为 (词典标识, 错误元组)：
+# 元素自身的缓存（own=True）保存自身文本的错误，普通片段缓存保存整个子树按文档顺序的错误
+SPELL_CACHE_KEY = ('spell',)
+
+# 没有缓存结果的子元素，词典标识与任何检查器都不同
+_MISSING = (object(), ())
+
 class SpellCheckCommand(Command):
-    """拼写检查命令，支持依赖注入以便于测试"""
+    """拼写检查命令，支持依赖注入以便于测试
+    
+    每个元素自身文本的检查结果连同检查器的词典标识缓存在元素自身的缓存中
+    （只在元素自身被修改时失效），整个子树的结果缓存在片段缓存中（与保存时的
+    HTML片段一起，沿修改点到根节点的路径失效）。再次检查时只进入子树结果失效的
+    元素，其余子元素直接合并缓存的子树结果，只重新检查修改过的元素的文本。
+    词典变化后标识不同，自动重新检查并覆盖旧结果；没有词典标识的检查器
+    （如测试替身）不使用缓存。
     
-    def __init__(self, model, spell_checker=None, reporter=None):
+    需要重新检查的元素先全部收集起来，由检查器的 check_texts() 一次切分
+    和判断所有文本，每个不同的单词只判断一次；检查器没有 check_texts()
+    时逐个元素调用 check_element()。
+    
+    指定 workers 时，先收集需要检查的文本中的不同单词，交给检查器的
+    prefetch() 在进程池中并行判断，再按文档顺序生成报告，结果与串行一致。
+    """
+    
+    def __init__(self, model, spell_checker=None, reporter=None, workers=None, engine=None):
         """
         初始化拼写检查命令
         
@@ -15,13 +40,19 @@ class SpellCheckCommand(Command):
             model: HTML模型
             spell_checker: 拼写检查器，如果为None则使用默认的SpellChecker
             reporter: 错误报告器，如果为None则使用默认的ConsoleReporter
+            workers: 并行判断单词的进程数，None表示串行检查
+            engine: 默认SpellChecker使用的建议引擎（"edits" 或 "symspell"），
+                None表示使用 SpellChecker.SUGGESTION_ENGINE
         """
         self.model = model
         self.description = "Spell check HTML content"
         self.recordable = False
         # 依赖注入 - 允许传入测试用的模拟对象
-        self._spell_checker = spell_checker or SpellChecker()
+        self._spell_checker = spell_checker or SpellChecker(engine=engine)
         self._reporter = reporter or ConsoleReporter()
+        self.workers = workers
+        self.checked = 0  # 本次重新检查的元素数
+        self.reused = 0   # 本次直接合并的缓存子树结果数
         
     def execute(self):
         """执行拼写检查命令"""
@@ -59,7 +90,7 @@ class SpellCheckCommand(Command):
         
     def _check_element(self, element):
         """
-        递归检查元素及其子元素中的拼写错误
+        检查元素及其子元素中的拼写错误
         
         Args:
             element: HTML元素
@@ -67,17 +98,66 @@ class SpellCheckCommand(Command):
         Returns:
             list: 拼写错误列表
         """
-        errors = []
+        token = getattr(self._spell_checker, 'dictionary_token', None)
+        if not isinstance(token, int):
+            token = None
+        cached = self._cached_errors(element, token)
+        if cached is not None:
+            self.reused += 1
+            return list(cached)
         
-        # 检查当前元素的文本
-        if element.text:
-            element_errors = self._spell_checker.check_element(element)
-            if element_errors:
-                errors.extend(element_errors)
-                
-        # 递归检查所有子元素
-        for child in element.children:
-            child_errors = self._check_element(child)
-            errors.extend(child_errors)
-            
-        return errors
\ No newline at end of file
+        stale, pending = [], []
+        self._collect_stale(element, token, stale, pending)
+        self.checked = len(pending)
+        if self.workers and hasattr(self._spell_checker, 'prefetch'):
+            self._spell_checker.prefetch(
+                (word for item in pending for word in WORD_PATTERN.findall(item.text)), self.workers)
+        if hasattr(self._spell_checker, 'check_texts'):
+            results = self._spell_checker.check_texts([item.text for item in pending])
+            found = {id(item): tuple(item_errors) for item, item_errors in zip(pending, results)}
+        else:
+            found = {id(item): tuple(self._spell_checker.check_element(item) or ()) for item in pending}
+        
+        # 后序合并：失效的子元素总是先于父元素合并，其余子元素直接使用缓存的子树结果
+        subtree = {}
+        for node, fragments, missing in stale:
+            own = found.get(id(node))
+            if own is None:
+                own = self._cached_errors(node, token, own=True) or ()
+            elif token is not None:
+                node.set_fragment(SPELL_CACHE_KEY, (token, own), own=True)
+            for index in missing:
+                fragments[index] = subtree.pop(id(node.children[index]))
+            self.reused += len(fragments) - len(missing)
+            errors = subtree[id(node)] = (token, own + tuple(chain.from_iterable(map(itemgetter(1), fragments))))
+            if token is not None:
+                node.set_fragment(SPELL_CACHE_KEY, errors)
+        return list(subtree[id(element)][1])
+    
+    @staticmethod
+    def _cached_errors(element, token, own=False):
+        """元素（own=True时为自身文本，否则为整个子树）在当前词典下的缓存结果，没有时返回None"""
+        if token is None:
+            return None
+        cached = element.get_fragment(SPELL_CACHE_KEY, own)
+        if cached is not None and cached[0] == token:
+            return cached[1]
+        return None
+    
+    def _collect_stale(self, element, token, stale, pending):
+        """
+        按后序收集子树结果失效的元素，子树结果仍有效的子元素不再进入
+        
+        Args:
+            stale: 收集 (元素, 子元素的缓存结果列表, 失效子元素的下标)
+            pending: 收集自身文本需要重新检查的元素
+        """
+        fragments = element.child_fragments(SPELL_CACHE_KEY, _MISSING)
+        # 缓存结果的词典标识与当前不同（或没有缓存）的子元素
+        missing = list(compress(range(len(fragments)), map(ne, map(itemgetter(0), fragments), repeat(token))))
+        children = element.children
+        for index in missing:
+            self._collect_stale(children[index], token, stale, pending)
+        stale.append((element, fragments, missing))
+        if element.text and self._cached_errors(element, token, own=True) is None:
+            pending.append(element)
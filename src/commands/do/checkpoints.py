@@ -0,0 +1,258 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from src.commands.base import Command
+from src.commands.records import command_from_record
+from src.core.output import NULL_OUTPUT
+from src.io.snapshot import encode_snapshot, restore_snapshot
+from src.io.spill import SpillFile
+
+class CheckpointHistory:
+    """检查点+重放的深度撤销
+
+    按执行顺序保存整个编辑时间线的命令记录(Command.to_record)，并每隔
+    interval 条命令或 interval_bytes 字节的记录为模型拍一次二进制快照。
+    CommandHistory 中的活动命令用各自的逆操作撤销；活动历史被淘汰、
+    撤销到更早的状态时，恢复最近的检查点再重放其后的记录。
+
+    快照的开销与文档大小成正比，拍检查点的间隔按最近一次快照的大小放大；
+    基准快照推迟到第一条命令修改模型之前(prepare)，加载文档、清空历史
+    不需要为整个模型拍快照。
+
+    内存占用由快照数量决定：超过 max_checkpoints 时每隔一个丢弃较旧的
+    检查点（保留基准和最新的检查点），越早的状态重放越长，但撤销深度不受限制。
+
+    提供换出文件(SpillFile)时，只有最近的 memory_records 条记录和
+    memory_checkpoints 个检查点留在内存中，更早的写入换出文件，
+    深度撤销时再按需读回。已换出的条目是换出文件的引用编号(int)，
+    条目被截断或稀疏化丢弃时同时从换出文件中丢弃，以便回收文件空间。
+    """
+
+    DEFAULT_INTERVAL = 50
+    DEFAULT_INTERVAL_BYTES = 64 * 1024
+    DEFAULT_MAX_CHECKPOINTS = 32
+    DEFAULT_MEMORY_RECORDS = 1000
+    DEFAULT_MEMORY_CHECKPOINTS = 4
+    # 快照每增大这么多字节，检查点间隔放大一倍
+    SCALE_BYTES = 256 * 1024
+
+    def __init__(self, model, interval: int = DEFAULT_INTERVAL,
+                 interval_bytes: int = DEFAULT_INTERVAL_BYTES,
+                 max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS,
+                 spill: Optional[SpillFile] = None,
+                 memory_records: int = DEFAULT_MEMORY_RECORDS,
+                 memory_checkpoints: int = DEFAULT_MEMORY_CHECKPOINTS):
+        """
+        初始化检查点历史，以模型的当前状态为基准
+
+        Args:
+            model: 命令作用的HTML模型
+            interval: 每多少条命令拍一次检查点（按快照大小放大）
+            interval_bytes: 记录累计多少字节后拍一次检查点（按快照大小放大）
+            max_checkpoints: 最多保留的检查点数
+            spill: 换出文件，None表示全部保存在内存中
+            memory_records: 使用换出文件时内存中保留的最近记录数
+            memory_checkpoints: 使用换出文件时内存中保留的最近检查点数
+        """
+        self.model = model
+        self.interval = interval
+        self.interval_bytes = interval_bytes
+        self.max_checkpoints = max(2, max_checkpoints)
+        self.spill = spill
+        self.memory_records = memory_records
+        self.memory_checkpoints = max(1, memory_checkpoints)
+        self.records: List[Any] = []  # 时间线上的全部命令记录（或换出引用）
+        self.position = 0  # 当前状态 = 基准 + records[:position]
+        self.checkpoints: Dict[int, Any] = {}  # 时间线位置 -> 模型快照（或换出引用）
+        self.restores = 0  # 从检查点恢复的次数
+        self.replayed = 0  # 恢复后重放的记录总数
+        self._snapshot_size = 0  # 最近一次快照的字节数
+        self.reset()
+
+    def reset(self) -> None:
+        """丢弃所有记录，下一条命令修改模型之前的状态作为新的基准"""
+        self.records.clear()
+        self.position = 0
+        if self.spill is not None:
+            self.spill.reset()
+        self._spilled_records = 0  # records[:_spilled_records] 已经换出
+        self.checkpoints = {}
+        self._pending_bytes = 0
+
+    def prepare(self) -> None:
+        """命令修改模型之前调用，尚未拍基准快照时为当前状态拍快照"""
+        if not self.checkpoints:
+            self.checkpoints[0] = self._snapshot()
+
+    def close(self) -> None:
+        """释放换出文件"""
+        if self.spill is not None:
+            self.spill.close()
+
+    def push(self, record: Optional[list]) -> None:
+        """
+        记录一条新执行的命令，丢弃当前位置之后的时间线
+
+        无法序列化的命令(record为None)无法重放，时间线从当前状态重新开始。
+        """
+        if record is None or not self.checkpoints:
+            # 没有在命令执行前拍基准快照(见prepare)时同样无法重放
+            self.reset()
+            return
+        self._truncate()
+        self.records.append(record)
+        self.position += 1
+        self._pending_bytes += len(json.dumps(record, ensure_ascii=False))
+        scale = 1 + self._snapshot_size // self.SCALE_BYTES
+        if (self.position - self._last_checkpoint() >= self.interval * scale
+                or self._pending_bytes >= self.interval_bytes * scale):
+            self._checkpoint()
+        self._spill_records()
+
+    def replace_last(self, record: Optional[list]) -> None:
+        """最后一条命令合并了后续修改(见Command.merge)，更新其记录"""
+        if record is None or not self.position:
+            self.reset()
+            return
+        self._truncate()
+        self._discard(self.records[self.position - 1])
+        self.records[self.position - 1] = record
+        # 该位置的检查点保存的是合并前的状态
+        if self.position in self.checkpoints and self.position != 0:
+            self._discard(self.checkpoints.pop(self.position))
+
+    def moved(self, steps: int) -> None:
+        """活动历史撤销(-1)或重做(+1)后同步当前位置"""
+        self.position = min(max(self.position + steps, 0), len(self.records))
+
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    def can_redo(self, live_redos: int = 0) -> bool:
+        """
+        是否可以从时间线重做
+
+        Args:
+            live_redos: CommandHistory中可重做的活动命令数，它们位于时间线末尾
+        """
+        return self.position < len(self.records) - live_redos
+
+    def undo(self) -> bool:
+        """恢复最近的检查点并重放到上一个状态"""
+        if not self.can_undo():
+            return False
+        self._restore(self.position - 1)
+        self.position -= 1
+        return True
+
+    def redo(self) -> Optional[Command]:
+        """
+        重新执行当前位置的记录
+
+        Returns:
+            新执行的命令（可以加入活动历史，用逆操作撤销），失败时返回None
+        """
+        if not self.can_redo():
+            return None
+        command = command_from_record(self.model, self._record(self.position))
+        command.output = NULL_OUTPUT
+        if not command.execute():
+            return None
+        command.output = None
+        self.position += 1
+        return command
+
+    def stats(self) -> Dict[str, Any]:
+        """返回时间线和检查点的统计"""
+        in_memory = [data for data in self.checkpoints.values() if not isinstance(data, int)]
+        return {
+            "records": len(self.records),
+            "position": self.position,
+            "checkpoints": len(self.checkpoints),
+            "checkpoint_bytes": sum(len(data) for data in in_memory),
+            "spilled_records": sum(1 for record in self.records if isinstance(record, int)),
+            "spilled_checkpoints": len(self.checkpoints) - len(in_memory),
+            "spill_bytes": self.spill.size if self.spill is not None else 0,
+            "restores": self.restores,
+            "replayed": self.replayed,
+        }
+
+    def _last_checkpoint(self) -> int:
+        return max(index for index in self.checkpoints if index <= self.position)
+
+    def _truncate(self) -> None:
+        """丢弃当前位置之后的记录和检查点"""
+        if self.position < len(self.records):
+            for record in self.records[self.position:]:
+                self._discard(record)
+            del self.records[self.position:]
+            self._spilled_records = min(self._spilled_records, self.position)
+            for index in [i for i in self.checkpoints if i > self.position]:
+                self._discard(self.checkpoints.pop(index))
+
+    def _checkpoint(self) -> None:
+        """为当前状态拍快照，必要时稀疏化较旧的检查点"""
+        self.checkpoints[self.position] = self._snapshot()
+        self._pending_bytes = 0
+        if len(self.checkpoints) > self.max_checkpoints:
+            indexes = sorted(self.checkpoints)
+            # 保留基准和最新的检查点，其余每隔一个丢弃
+            for index in indexes[1:-1:2]:
+                self._discard(self.checkpoints.pop(index))
+        self._spill_checkpoints()
+
+    def _snapshot(self) -> bytes:
+        data = encode_snapshot(self.model.root)
+        self._snapshot_size = len(data)
+        return data
+
+    def _record(self, index: int) -> list:
+        """读取一条记录，必要时从换出文件读回"""
+        record = self.records[index]
+        if isinstance(record, int):
+            return json.loads(self.spill.get(record).decode('utf-8'))
+        return record
+
+    def _checkpoint_data(self, index: int) -> bytes:
+        """读取一个检查点，必要时从换出文件读回"""
+        data = self.checkpoints[index]
+        if isinstance(data, int):
+            return self.spill.get(data)
+        return data
+
+    def _discard(self, entry) -> None:
+        """丢弃一条记录或一个检查点，已换出的同时释放换出文件中的数据"""
+        if isinstance(entry, int):
+            self.spill.discard(entry)
+
+    def _spill_records(self) -> None:
+        """将超出内存窗口的旧记录写入换出文件"""
+        if self.spill is None:
+            return
+        while len(self.records) - self._spilled_records > self.memory_records:
+            index = self._spilled_records
+            record = self.records[index]
+            if not isinstance(record, int):
+                data = json.dumps(record, ensure_ascii=False).encode('utf-8')
+                self.records[index] = self.spill.put(data)
+            self._spilled_records += 1
+
+    def _spill_checkpoints(self) -> None:
+        """只在内存中保留最近的几个检查点，其余写入换出文件"""
+        if self.spill is None:
+            return
+        in_memory = sorted(index for index, data in self.checkpoints.items()
+                           if not isinstance(data, int))
+        for index in in_memory[:-self.memory_checkpoints]:
+            self.checkpoints[index] = self.spill.put(self.checkpoints[index])
+
+    def _restore(self, target: int) -> None:
+        """将模型恢复到时间线上的target位置"""
+        start = max(index for index in self.checkpoints if index <= target)
+        restore_snapshot(self._checkpoint_data(start), self.model)
+        for index in range(start, target):
+            command = command_from_record(self.model, self._record(index))
+            command.output = NULL_OUTPUT
+            command.execute()
+        self.restores += 1
+        self.replayed += target - start
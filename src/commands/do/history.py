@@ -1,50 +1,146 @@
-from typing import List, Optional, Any
+import time
+from collections import deque
+from typing import List, Optional, Any, Dict
 from src.commands.base import Command
 from src.commands.observer import Observer
 from src.core.exceptions import InvalidOperationError
 
 class CommandHistory:
-    """命令历史记录管理器"""
-    def __init__(self, max_history=None):
-        """初始化命令历史"""
-        self.history = []  # 历史命令列表
+    """命令历史记录管理器
+    
+    历史保存在deque中，两端的增删都是O(1)。除了按数量限制(max_history)，
+    还按命令的估算内存(Command.size_hint)限制：总量超过max_memory时
+    从最旧的命令开始淘汰，但始终保留最近的一条命令。
+    
+    设置coalesce_window后，在该时间窗口内连续执行、可以合并的命令
+    （见Command.merge，如对同一元素的连续文本编辑）合并为一条记录，
+    撤销时直接回到合并前的状态。默认不合并，交互式编辑器使用
+    DEFAULT_COALESCE_WINDOW。
+    """
+    
+    # 默认历史内存上限: 64MB
+    DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+    # 交互式编辑的合并时间窗口（秒）
+    DEFAULT_COALESCE_WINDOW = 1.0
+    
+    def __init__(self, max_history=None, max_memory=DEFAULT_MAX_MEMORY,
+                 coalesce_window=None):
+        """
+        初始化命令历史
+        
+        Args:
+            max_history: 最大历史记录数量，None表示不限制
+            max_memory: 历史命令估算内存的上限（字节），None表示不限制
+            coalesce_window: 连续命令合并的时间窗口（秒），None或0表示不合并
+        """
+        self.history = deque()  # 历史命令队列
         self.redos = []    # 可重做的命令列表
         self.position = 0  # 当前位置
         self.max_history = max_history  # 最大历史记录数量
+        self.max_memory = max_memory  # 历史内存上限
+        self.memory_usage = 0  # 历史命令的估算内存总量
+        self.evicted = 0  # 因数量或内存限制被淘汰的命令数
+        self._sizes = {}  # id(命令) -> 加入历史时的估算大小
+        self.coalesce_window = coalesce_window
+        self.coalesced = 0  # 被合并进上一条记录的命令数
+        self._last_added_at = None  # 最后一条记录最近一次被添加或合并的时间
         self.observers = []  # 观察者列表
+        self.dispatcher = None  # 可选的事件分发器(EventDispatcher)，None表示直接通知
     
     # Add __len__ method for tests
     def __len__(self):
         return len(self.history)
     
-    def add_command(self, command: Command) -> None:
+    def add_command(self, command: Command, coalesce: Optional[bool] = None,
+                    clear_redos: bool = True) -> bool:
         """
         添加命令到历史记录
         
         Args:
             command: 要添加的命令
+            coalesce: True强制尝试与上一条记录合并，False不合并，
+                      None在时间窗口内尝试合并
+            clear_redos: 是否清空重做列表（重做的命令重新入栈时为False）
+            
+        Returns:
+            bool: 命令是否被合并进了上一条记录
         """
         if not command.recordable:
-            return
+            return False
             
         # 清除可能的重做队列
-        self.redos.clear()
+        if clear_redos:
+            self.redos.clear()
+        
+        now = time.monotonic()
+        if self._should_coalesce(coalesce, now) and self.history[-1].merge(command):
+            last = self.history[-1]
+            self._untrack(last)
+            self._track(last)
+            self._last_added_at = now
+            self.coalesced += 1
+            self._notify_observers("merge_command", last)
+            return True
         
         # 添加新命令
         self.history.append(command)
+        self._track(command)
+        self._last_added_at = now
         self._notify_observers("add_command", command)
         
-        # 如果设置了最大历史长度，管理队列大小
-        if self.max_history and len(self.history) > self.max_history:
-            self.history.pop(0)
+        # 按数量和内存上限淘汰最旧的命令
+        while self.max_history and len(self.history) > self.max_history:
+            self._evict_oldest()
+        while (self.max_memory is not None and self.memory_usage > self.max_memory
+               and len(self.history) > 1):
+            self._evict_oldest()
+        return False
+    
+    def _should_coalesce(self, coalesce: Optional[bool], now: float) -> bool:
+        """判断新命令是否应尝试与最后一条记录合并"""
+        if coalesce is False or not self.history or self._last_added_at is None:
+            return False
+        if coalesce:
+            return True
+        return bool(self.coalesce_window) and now - self._last_added_at <= self.coalesce_window
     
     # Alias for backward compatibility
     add = add_command
     
+    def _track(self, command: Command) -> None:
+        """记录命令加入历史时的估算大小"""
+        size = command.size_hint() if hasattr(command, 'size_hint') else 0
+        self._sizes[id(command)] = size
+        self.memory_usage += size
+    
+    def _untrack(self, command: Command) -> None:
+        """命令离开历史时扣除其估算大小"""
+        self.memory_usage -= self._sizes.pop(id(command), 0)
+    
+    def _evict_oldest(self) -> None:
+        """淘汰最旧的命令"""
+        self._untrack(self.history.popleft())
+        self.evicted += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """返回历史记录的数量和内存统计"""
+        return {
+            "commands": len(self.history),
+            "redos": len(self.redos),
+            "memory": self.memory_usage,
+            "max_memory": self.max_memory,
+            "max_history": self.max_history,
+            "evicted": self.evicted,
+            "coalesced": self.coalesced,
+        }
+    
     def clear(self) -> None:
         """清空历史记录"""
         self.history.clear()
         self.redos.clear()
+        self._sizes.clear()
+        self.memory_usage = 0
+        self._last_added_at = None
         self._notify_observers("clear", None)
     
     def can_undo(self) -> bool:
@@ -66,6 +162,9 @@ class CommandHistory:
         if not self.history:
             return None
         command = self.history.pop()
+        self._untrack(command)
+        # 撤销后新命令不能再合并进更早的记录
+        self._last_added_at = None
         self._notify_observers("pop_command", command)
         return command
     
@@ -101,6 +200,9 @@ class CommandHistory:
             
     def _notify_observers(self, event_type: str, data: Any = None, **kwargs) -> None:
         """通知所有观察者"""
+        if self.dispatcher is not None and not kwargs:
+            self.dispatcher.dispatch(self.observers, event_type, data)
+            return
         for observer in self.observers:
             # 支持多种调用约定
             if kwargs:
@@ -178,7 +280,7 @@ class UndoRedoManager:
             result = command.execute()
             
         if result:
-            self.command_history.add_command(command)
+            self.command_history.add_command(command, coalesce=False, clear_redos=False)
         return result
     
     def clear(self) -> None:
@@ -21,17 +21,17 @@ class RedoCommand(Command):
         try:
             result = self.processor.redo()
             if result:
-                print(f"已重做: 上一个操作")
+                self.output.info("已重做: 上一个操作")
             return result
         except InvalidOperationError as e:
             # Re-raise the exception for specific tests
-            print(f"无法重做: {str(e)}")
+            self.output.error("无法重做: %s", e)
             raise
         except RecursionError:
-            print("重做时发生错误: 递归深度超出限制")
+            self.output.error("重做时发生错误: 递归深度超出限制")
             return False
         except Exception as e:
-            print(f"重做时发生错误: {str(e)}")
+            self.output.error("重做时发生错误: %s", e)
             return False
             
     def undo(self):
@@ -39,10 +39,10 @@ class RedoCommand(Command):
         try:
             result = self.processor.undo()
             if result:
-                print("已撤销上一个重做的操作")
+                self.output.info("已撤销上一个重做的操作")
             return result
         except Exception:
-            print("无法撤销重做命令")
+            self.output.error("无法撤销重做命令")
             return False
         
     def __str__(self):
@@ -21,14 +21,14 @@ class UndoCommand(Command):
         try:
             result = self.processor.undo()
             if result:
-                print(f"已撤销: 上一个操作")
+                self.output.info("已撤销: 上一个操作")
             return result
         except InvalidOperationError as e:
             # Re-raise the exception for specific tests
-            print(f"无法撤销: {str(e)}")
+            self.output.error("无法撤销: %s", e)
             raise
         except Exception as e:
-            print(f"撤销时发生错误: {str(e)}")
+            self.output.error("撤销时发生错误: %s", e)
             return False
             
     def undo(self):
@@ -36,10 +36,10 @@ class UndoCommand(Command):
         try:
             result = self.processor.redo()
             if result:
-                print("已重做上一个撤销的操作")
+                self.output.info("已重做上一个撤销的操作")
             return result
         except Exception:
-            print("无法撤销撤销命令")
+            self.output.error("无法撤销撤销命令")
             return False
 
     def redo(self):
@@ -38,7 +38,7 @@ class AppendCommand(Command):
             self.model._register_id(new_element)
             self.appended_element = new_element
             
-            print(f"Appended '{self.id_value}' as child of '{self.parent_id}'")
+            self.output.info("Appended '%s' as child of '%s'", self.id_value, self.parent_id)
             return True
         except (DuplicateIdError, ElementNotFoundError):
             # 直接抛出原始异常
@@ -58,13 +58,17 @@ class AppendCommand(Command):
             raise ValueError("父元素ID不能为空且必须是字符串")
             
         # 检查ID是否已存在
-        if self.id_value in self.model._id_map:
+        if self.model.has_id(self.id_value):
             raise DuplicateIdError(f"ID '{self.id_value}' 已存在")
             
         # 检查父元素是否存在
-        if self.parent_id not in self.model._id_map:
+        if not self.model.has_id(self.parent_id):
             raise ElementNotFoundError(f"未找到ID为 '{self.parent_id}' 的父元素")
     
+    def to_record(self):
+        """序列化为日志记录"""
+        return ['append', self.tag_name, self.id_value, self.parent_id, self.text]
+    
     def undo(self) -> bool:
         """撤销追加命令"""
         try:
@@ -79,5 +83,5 @@ class AppendCommand(Command):
             
             return True
         except Exception as e:
-            print(f"撤销追加失败: {e}")
+            self.output.error("撤销追加失败: %s", e)
             return False
\ No newline at end of file
@@ -13,6 +13,7 @@ class DeleteCommand(Command):
         self.element_id = element_id
         self.deleted_element = None
         self.parent = None
+        self.tombstone = None
         self.description = f"删除元素(id={element_id})"
         
     def execute(self) -> bool:
@@ -27,22 +28,10 @@ class DeleteCommand(Command):
             self.parent = element.parent
             self.deleted_element = element
             
-            # 递归删除所有子元素
-            def remove_children(el):
-                for child in el.children[:]:
-                    remove_children(child)
-                    self.model._unregister_id(child)
-                el.children.clear()
+            # 整个子树原样摘下，其中的ID由模型延迟注销，撤销时直接插回原位置
+            self.tombstone = self.model.tombstone(element)
             
-            remove_children(element)
-            
-            # 从父元素中移除
-            self.parent.remove_child(element)
-            
-            # 从ID映射中移除
-            self.model._unregister_id(element)
-            
-            print(f"Deleted element with id '{self.element_id}'")
+            self.output.info("Deleted element with id '%s'", self.element_id)
             return True
         except Exception as e:
             raise CommandExecutionError(f"删除元素失败: {e}") from e
@@ -61,17 +50,25 @@ class DeleteCommand(Command):
         if self.element_id in ['html', 'head', 'body']:
             raise ValueError(f"无法删除特殊元素: '{self.element_id}'")
     
+    def to_record(self):
+        """序列化为日志记录"""
+        return ['delete', self.element_id]
+    
+    def size_hint(self) -> int:
+        """删除的子树保留在命令中以便撤销，计入历史占用"""
+        size = super().size_hint()
+        if self.deleted_element is not None:
+            size += self.deleted_element.size_hint()
+        return size
+    
     def undo(self) -> bool:
         """撤销删除命令"""
         try:
-            # 恢复元素到父元素
-            self.parent.add_child(self.deleted_element)
-            self.deleted_element.parent = self.parent
-            
-            # 恢复ID到映射
-            self.model._register_id(self.deleted_element)
+            # 恢复元素到原位置
+            self.model.revive(self.tombstone)
+            self.tombstone = None
             
             return True
         except Exception as e:
-            print(f"撤销删除失败: {e}")
+            self.output.error("撤销删除失败: %s", e)
             return False
\ No newline at end of file
@@ -21,7 +21,7 @@ class EditIdCommand(Command):
         if self.element_id == self.new_id:
             return
             
-        if self.new_id in self.model._id_map:
+        if self.model.has_id(self.new_id):
             raise DuplicateIdError(f"ID '{self.new_id}' 已存在")
 
     def can_execute(self):
@@ -39,31 +39,43 @@ class EditIdCommand(Command):
     def execute(self):
         """执行编辑ID命令"""
         try:
-            print(f"开始执行ID修改：{self.element_id} -> {self.new_id}")
+            output = self.output
+            output.debug("开始执行ID修改：%s -> %s", self.element_id, self.new_id)
             # 完整参数验证
             self._validate_params()
-            print("参数验证通过")
+            output.debug("参数验证通过")
             
             # 查找元素
-            print(f"正在查找元素：{self.element_id}")
+            output.debug("正在查找元素：%s", self.element_id)
             element = self.model.find_by_id(self.element_id)
-            print(f"找到元素：{element}")
+            output.debug("找到元素：%s", element)
                 
             # 更新元素ID
-            print(f"更新ID前检查：新ID '{self.new_id}' 是否存在？{self.new_id in self.model._id_map}")
             self.original_id = element.id
             element.id = self.new_id
-            print(f"执行模型ID映射更新：{self.element_id} -> {self.new_id}")
             self.model.update_element_id(self.element_id, self.new_id)
+            output.info("已将ID '%s' 修改为 '%s'", self.element_id, self.new_id)
             
             return True
         except (ElementNotFoundError, DuplicateIdError, InvalidOperationError):
             # 直接抛出原始异常
             raise
         except Exception as e:
-            print(f"捕获到未预期异常：{type(e).__name__} - {str(e)}")
+            self.output.error("捕获到未预期异常：%s - %s", type(e).__name__, e)
             raise CommandExecutionError(f"执行编辑ID命令时出错: {str(e)}") from e
 
+    def to_record(self):
+        """序列化为日志记录"""
+        return ['edit-id', self.old_id, self.new_id]
+
+    def merge(self, other):
+        """合并同一元素的连续改名(a->b, b->c 合并为 a->c)"""
+        if type(other) is not EditIdCommand or other.element_id != self.new_id:
+            return False
+        self.new_id = other.new_id
+        self.description = f"编辑ID: '{self.element_id}' -> '{self.new_id}'"
+        return True
+
     def undo(self):
         """撤销编辑ID命令"""
         try:
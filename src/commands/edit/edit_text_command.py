@@ -13,32 +13,43 @@ class EditTextCommand(Command):
         self.new_text = text
         self.old_text = None
         self.description = f"编辑文本: '{element_id}'"
-        print(f"[DEBUG] 初始化EditTextCommand - 元素ID: {element_id}, 新文本长度: {len(text)}")
     
     def execute(self):
         """执行编辑文本命令"""
         try:
-            print(f"[DEBUG] 尝试查找元素: {self.element_id}")
+            output = self.output
+            output.debug("尝试查找元素: %s, 新文本长度: %d", self.element_id, len(self.new_text))
             element = self.model.find_by_id(self.element_id)
             
             self.old_text = element.text
-            print(f"[DEBUG] 保存原始文本: {self.old_text}")
+            output.debug("保存原始文本: %s", self.old_text)
             
             element.text = self.new_text
-            print(f"[INFO] 成功更新元素 {self.element_id} 的文本内容")
+            output.info("成功更新元素 %s 的文本内容", self.element_id)
             
             return True
         except ElementNotFoundError as e:
-            print(f"[ERROR] 元素 {self.element_id} 不存在")
+            self.output.error("元素 %s 不存在", self.element_id)
             raise CommandExecutionError(f"元素 '{self.element_id}' 不存在") from e
         except Exception as e:
-            print(f"[ERROR] 执行编辑文本命令时出错: {e}")
+            self.output.error("执行编辑文本命令时出错: %s", e)
             raise CommandExecutionError(f"执行编辑文本命令时出错: {e}") from e
 
     def _validate_params(self):
-        if self.new_id and self.new_id in self.model._id_map:
+        if self.new_id and self.model.has_id(self.new_id):
             raise DuplicateIdError(f"ID '{self.new_id}' 已存在")
 
+    def to_record(self):
+        """序列化为日志记录"""
+        return ['edit-text', self.element_id, self.new_text]
+
+    def merge(self, other):
+        """合并对同一元素的后续文本编辑，撤销时直接恢复最初的文本"""
+        if type(other) is not EditTextCommand or other.element_id != self.element_id:
+            return False
+        self.new_text = other.new_text
+        return True
+
     def undo(self):
         """撤销编辑文本命令"""
         try:
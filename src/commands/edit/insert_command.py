@@ -31,12 +31,12 @@ class InsertCommand(Command):
         if not self.location or not isinstance(self.location, str):
             raise ValueError("插入位置不能为空且必须是字符串")
             
-        # 检查ID是否已存在 - 使用内部字典直接检查，而不是find_by_id方法
-        if self.id_value in self.model._id_map:
+        # 检查ID是否已存在 - 不抛出异常，已删除子树中的ID不算
+        if self.model.has_id(self.id_value):
             raise DuplicateIdError(f"ID '{self.id_value}' 已存在")
 
         # 检查目标位置是否存在 - 使用安全的方式检查
-        if self.location not in self.model._id_map:
+        if not self.model.has_id(self.location):
             raise ElementNotFoundError(f"未找到ID为 '{self.location}' 的元素")
             
         # 根元素不能用于插入
@@ -63,7 +63,7 @@ class InsertCommand(Command):
                 self.inserted_element.text = self.text
                 
             # 查找目标位置
-            target = self.model._id_map.get(self.location)
+            target = self.model.find_by_id(self.location)
             
             # 确保我们有一个有效的父元素
             if not target.parent:
@@ -77,13 +77,12 @@ class InsertCommand(Command):
             # 在父元素的children列表中找出目标元素的索引
             index = target.parent.children.index(target)
             # 在该索引处插入新元素
-            target.parent.children.insert(index, self.inserted_element)
-            self.inserted_element.parent = target.parent
+            target.parent.insert_child(index, self.inserted_element)
             
             # 注册ID到模型
             self.model._register_id(self.inserted_element)
             
-            print(f"成功在'{self.location}'前插入'{self.id_value}'元素")
+            self.output.info("成功在'%s'前插入'%s'元素", self.location, self.id_value)
             self._executed = True
             return True
         except (ElementNotFoundError, DuplicateIdError, InvalidOperationError) as e:
@@ -91,6 +90,10 @@ class InsertCommand(Command):
         except Exception as e:
             raise CommandExecutionError(f"执行插入命令时出错: {e}") from e
 
+    def to_record(self):
+        """序列化为日志记录"""
+        return ['insert', self.tag_name, self.id_value, self.location, self.text]
+
     def undo(self) -> bool:
         """撤销插入命令"""
         try:
@@ -99,19 +102,18 @@ class InsertCommand(Command):
                 return False
             
             # 从模型的ID映射中删除
-            if self.inserted_element.id in self.model._id_map:
-                del self.model._id_map[self.inserted_element.id]
+            self.model._unregister_id(self.inserted_element)
             
             # 从父元素中删除已插入的元素
             if self.parent and self.inserted_element in self.parent.children:
-                self.parent.children.remove(self.inserted_element)
-                print(f"成功撤销插入'{self.id_value}'元素")
+                self.parent.remove_child(self.inserted_element)
+                self.output.info("成功撤销插入'%s'元素", self.id_value)
                 self._executed = False
                 return True
             
-            print(f"撤销失败: 在父元素的子元素列表中找不到'{self.inserted_element.id}'")
+            self.output.error("撤销失败: 在父元素的子元素列表中找不到'%s'", self.inserted_element.id)
             return False
             
         except Exception as e:
-            print(f"撤销插入命令时发生错误: {str(e)}")
+            self.output.error("撤销插入命令时发生错误: %s", e)
             return False
\ No newline at end of file
@@ -6,6 +6,8 @@ from .save import SaveCommand
 from .init import InitCommand
 from .exit_command import ExitCommand
 from .help_command import HelpCommand
+from .snapshot import ExportSnapshotCommand, ImportSnapshotCommand
 
-__all__ = ['ReadCommand', 'SaveCommand', 'InitCommand', 'ExitCommand', 'HelpCommand']
+__all__ = ['ReadCommand', 'SaveCommand', 'InitCommand', 'ExitCommand', 'HelpCommand',
+           'ExportSnapshotCommand', 'ImportSnapshotCommand']
 
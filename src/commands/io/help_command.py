@@ -59,6 +59,8 @@ class HelpCommand(Command):
         print("  init                                  - 初始化新的HTML文档")
         print("  load <filename>                       - 加载HTML文件")
         print("  save [filename]                       - 保存HTML文件")
+        print("  export-snapshot <filename>            - 导出二进制快照")
+        print("  import-snapshot <filename>            - 从二进制快照加载")
         print("  exit                                  - 退出编辑器")
         print("  help                                  - 显示此帮助信息")
         
@@ -1,7 +1,6 @@
 import os
 from ..base import Command
 from ...core.html_model import HtmlModel
-from ...io.parser import HtmlParser
 from ...core.exceptions import InvalidOperationError, ElementNotFoundError
 from copy import deepcopy
 from src.commands.command_exceptions import CommandExecutionError, CommandParameterError
@@ -1,7 +1,9 @@
 import os
+import time
 from ..base import Command
 from ...core.html_model import HtmlModel
-from ...io.parser import HtmlParser
+from ...io.atomic import atomic_write
+from ...io.writer import HtmlWriter
 from ...core.exceptions import InvalidOperationError, ElementNotFoundError
 from copy import deepcopy
 from src.commands.command_exceptions import CommandExecutionError, CommandParameterError
@@ -9,10 +11,20 @@ from src.utils.html_utils import escape_html_attribute, unescape_html
 class SaveCommand(Command):
     """保存HTML文件命令"""
     
-    def __init__(self, model, file_path):
+    def __init__(self, model, file_path, use_cache=True, atomic=False, fsync=False, keep_backup=False,
+                 minify=False, compress=None):
         super().__init__()
         self.model = model
         self.file_path = file_path
+        self.use_cache = use_cache  # 是否复用未修改子树的缓存片段
+        self.atomic = atomic  # 是否先写临时文件再替换目标文件
+        self.fsync = fsync  # 原子写入时是否刷新到磁盘
+        self.keep_backup = keep_backup  # 原子写入时是否保留上一版本
+        self.minify = minify  # 是否输出压缩的HTML
+        # 是否通过gzip写入，None表示根据 .gz 后缀自动判断
+        self.compress = file_path.endswith('.gz') if compress is None else compress
+        self.output_size = None  # 写入的文件字节数
+        self.elapsed = None  # 保存耗时（秒）
         self.description = f"保存文件: {file_path}"
         self.processor = None  # Will be set by CommandProcessor
         self.recordable = False  # Make sure SaveCommand is not recorded
@@ -20,6 +32,9 @@ class SaveCommand(Command):
     def execute(self):
         """执行保存HTML文件命令"""
         try:
+            if self.minify or self.compress:
+                return self._export()
+            
             html_content = self._generate_html()
                 
             # 确保目录存在
@@ -28,12 +43,16 @@ class SaveCommand(Command):
                 try:
                     os.makedirs(directory)
                 except OSError:
-                    print(f"无法创建目录: {directory}")
+                    self.output.error("无法创建目录: %s", directory)
                     return False
             
             # 写入文件
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if self.atomic:
+                atomic_write(self.file_path, html_content,
+                             fsync=self.fsync, keep_backup=self.keep_backup)
+            else:
+                with open(self.file_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
             
             # 不再清空命令历史，以便保留撤销/重做功能
             # 仅标记当前状态为已保存
@@ -41,51 +60,83 @@ class SaveCommand(Command):
             return True
         except FileNotFoundError:
             # Handle invalid path more gracefully for test_save_invalid_path
-            print(f"无法写入文件: {self.file_path} - 路径无效")
+            self.output.error("无法写入文件: %s - 路径无效", self.file_path)
             return False
         except Exception as e:
             # For test_io_error_handling - still need to raise but not as a fatal error
-            print(f"保存文件失败: {str(e)}")
+            self.output.error("保存文件失败: %s", e)
             raise CommandExecutionError(f"保存文件失败: {str(e)}") from e
     
+    def _export(self):
+        """通过HtmlWriter输出压缩和/或gzip格式，并报告输出大小和耗时"""
+        start = time.perf_counter()
+        writer = HtmlWriter(use_cache=self.use_cache)
+        writer.write_to_file(self.model, self.file_path, pretty=False,
+                             atomic=self.atomic, fsync=self.fsync,
+                             keep_backup=self.keep_backup,
+                             minify=self.minify, compress=self.compress)
+        self.elapsed = time.perf_counter() - start
+        self.output_size = writer.last_output_size
+        self.output.info("已输出 %s: %d 字节, 耗时 %.1f ms", self.file_path, self.output_size, self.elapsed * 1000)
+        return True
+    
     def _generate_html(self):
         """生成HTML内容"""
-        # 简单实现，可以根据需要增强
-        return self._element_to_html(self.model.root, 0)
+        # 每个元素只缓存自身的开始和结束标签，片段收集到同一个列表中最后只拼接一次
+        parts = []
+        self._element_to_html(self.model.root, 0, parts)
+        return ''.join(parts)
     
-    def _element_to_html(self, element, indent_level):
-        """将元素转换为HTML字符串"""
+    def _element_to_html(self, element, indent_level, parts):
+        """将元素及其子元素的HTML片段追加到parts"""
+        head, tail = self._element_pieces(element, indent_level)
+        parts.append(head)
+        if tail is None:
+            return
+        for child in element.children:
+            self._element_to_html(child, indent_level + 1, parts)
+        parts.append(tail)
+    
+    def _element_pieces(self, element, indent_level):
+        """返回元素自身的片段: (开始标签和文本, 结束标签)，自闭合标签的结束标签为None"""
+        cache_key = ('save', indent_level)
+        if self.use_cache:
+            cached = element.get_fragment(cache_key)
+            if cached is not None:
+                return cached
+        
         indent = '  ' * indent_level
-        result = f"{indent}<{element.tag}"
+        parts = [f"{indent}<{element.tag}"]
         
         # 添加ID和其他属性
-        result += f' id="{element.id}"' if element.id else ''
+        if element.id:
+            parts.append(f' id="{element.id}"')
         for attr_name, attr_value in element.attributes.items():
             # 只转义双引号，不转义 & 符号
             attr_value = attr_value.replace('"', '&quot;')
-            result += f' {attr_name}="{attr_value}"'
+            parts.append(f' {attr_name}="{attr_value}"')
             
         if not element.children and not element.text:
             # 无内容的自闭合标签
-            result += ' />\n'
-            return result
+            parts.append(' />\n')
+            tail = None
+        else:
+            parts.append('>')
             
-        result += '>'
-        
-        # 添加文本内容
-        if element.text:
-            result += element.text
-            
-        # 添加子元素
-        if element.children:
-            result += '\n'
-            for child in element.children:
-                result += self._element_to_html(child, indent_level + 1)
-            result += indent
-            
-        # 闭合标签
-        result += f"</{element.tag}>\n"
+            # 添加文本内容
+            if element.text:
+                parts.append(element.text)
+                
+            # 子元素由_element_to_html插入在开始标签和闭合标签之间
+            if element.children:
+                parts.append('\n')
+                tail = f"{indent}</{element.tag}>\n"
+            else:
+                tail = f"</{element.tag}>\n"
         
+        result = (''.join(parts), tail)
+        if self.use_cache:
+            element.set_fragment(cache_key, result)
         return result
     
     def undo(self):
@@ -0,0 +1,87 @@
+import time
+from src.commands.base import Command
+from src.commands.command_exceptions import CommandExecutionError
+
+class ExportSnapshotCommand(Command):
+    """将HTML模型导出为二进制快照的命令"""
+    
+    def __init__(self, model, file_path):
+        """
+        初始化导出快照命令
+        
+        Args:
+            model: HTML模型
+            file_path: 快照文件路径
+        """
+        super().__init__()
+        self.model = model
+        self.file_path = file_path
+        self.description = f"导出快照 {file_path}"
+        self.recordable = False  # 导出快照不应被记录
+        
+    def execute(self):
+        """执行导出快照命令"""
+        from src.io.snapshot import save_snapshot
+        
+        try:
+            start = time.perf_counter()
+            size = save_snapshot(self.model, self.file_path)
+            elapsed = time.perf_counter() - start
+            self.output.info("已导出快照: %s (%d 字节, 耗时 %.1f ms)", self.file_path, size, elapsed * 1000)
+            return True
+        except Exception as e:
+            error_msg = f"导出快照时发生错误: {str(e)}"
+            self.output.error(error_msg)
+            raise CommandExecutionError(error_msg) from e
+            
+    def undo(self):
+        """导出快照不需要撤销"""
+        return False
+
+class ImportSnapshotCommand(Command):
+    """从二进制快照加载HTML模型的命令"""
+    
+    def __init__(self, processor, model, file_path):
+        """
+        初始化导入快照命令
+        
+        Args:
+            processor: 命令处理器
+            model: HTML模型
+            file_path: 快照文件路径
+        """
+        super().__init__()
+        self.processor = processor
+        self.model = model
+        self.file_path = file_path
+        self.description = f"导入快照 {file_path}"
+        self.recordable = False  # 与读取文件一样不记录
+        
+    def execute(self):
+        """
+        执行导入快照命令
+        
+        Raises:
+            CommandExecutionError: 当文件不存在或不是有效的快照时
+        """
+        from src.io.snapshot import load_snapshot
+        
+        try:
+            start = time.perf_counter()
+            load_snapshot(self.file_path, self.model)
+            elapsed = time.perf_counter() - start
+            self.output.info("成功导入快照: %s (耗时 %.1f ms)", self.file_path, elapsed * 1000)
+            
+            # 与读取文件一致，清空命令历史
+            if self.processor and hasattr(self.processor, 'clear_history'):
+                self.processor.clear_history()
+                
+            return True
+        except Exception as e:
+            error_msg = f"导入快照时发生错误: {str(e)}"
+            self.output.error(error_msg)
+            raise CommandExecutionError(error_msg) from e
+            
+    def undo(self):
+        """导入快照无法撤销"""
+        return False
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List, Tuple
 
 class CommandObserver(ABC):
     """命令观察者接口，用于接收命令处理器的事件通知"""
@@ -32,3 +32,16 @@ class Observer(ABC):
             data: 与事件相关的数据
         """
         pass
+
+    def update_batch(self, events: List[Tuple[str, Any]]) -> None:
+        """
+        一次接收多个事件，由排队的事件分发器(EventDispatcher)调用
+
+        默认按顺序逐个调用 update；需要合并处理的观察者（例如只关心
+        最终状态的界面刷新）可以重写此方法。
+
+        Args:
+            events: 按发生顺序排列的 (事件类型, 数据) 列表
+        """
+        for event_type, data in events:
+            self.update(event_type, data)
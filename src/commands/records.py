@@ -0,0 +1,76 @@
+"""
+命令记录与命令对象之间的转换
+
+记录是 [命令名, 参数...] 形式的列表，由 Command.to_record() 生成，
+用于编辑日志等需要持久化并重放命令的场景。
+"""
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.insert_command import InsertCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.edit.edit_id_command import EditIdCommand
+from src.commands.composite import CompositeCommand
+from src.commands.base import COALESCE
+from src.core.exceptions import InvalidCommandError
+
+# 特殊记录: 通过命令处理器撤销/重做
+UNDO = 'undo'
+REDO = 'redo'
+# 会话录制中的事务边界（编辑日志在提交时写入整个事务，不使用这些记录）
+BEGIN = 'begin'
+COMMIT = 'commit'
+ROLLBACK = 'rollback'
+
+_FACTORIES = {
+    'append': lambda model, tag, id_value, parent_id, text=None: AppendCommand(model, tag, id_value, parent_id, text),
+    'insert': lambda model, tag, id_value, location, text=None: InsertCommand(model, tag, id_value, location, text),
+    'delete': lambda model, element_id: DeleteCommand(model, element_id),
+    'edit-text': lambda model, element_id, text: EditTextCommand(model, element_id, text),
+    'edit-id': lambda model, old_id, new_id: EditIdCommand(model, old_id, new_id),
+    'batch': lambda model, *records: CompositeCommand([command_from_record(model, r) for r in records]),
+}
+
+def command_from_record(model, record):
+    """
+    根据记录创建命令对象
+    
+    Args:
+        model: 命令作用的HTML模型
+        record: [命令名, 参数...]
+        
+    Returns:
+        Command: 新创建的命令
+        
+    Raises:
+        InvalidCommandError: 当记录无法识别时
+    """
+    if not record or record[0] not in _FACTORIES:
+        raise InvalidCommandError(f"无法识别的命令记录: {record!r}")
+    try:
+        return _FACTORIES[record[0]](model, *record[1:])
+    except TypeError as e:
+        raise InvalidCommandError(f"命令记录参数无效: {record!r}") from e
+
+def replay_record(processor, model, record):
+    """
+    通过命令处理器重放一条记录
+    
+    Returns:
+        bool: 重放是否成功
+    """
+    if record and record[0] == UNDO:
+        return processor.undo()
+    if record and record[0] == REDO:
+        return processor.redo()
+    if record and record[0] == BEGIN:
+        processor.begin()
+        return True
+    if record and record[0] == COMMIT:
+        processor.commit()
+        return True
+    if record and record[0] == ROLLBACK:
+        return processor.rollback()
+    # 是否合并由记录决定，不受重放速度和时间窗口影响
+    if record and record[0] == COALESCE:
+        return processor.execute(command_from_record(model, record[1:]), coalesce=True)
+    return processor.execute(command_from_record(model, record), coalesce=False)
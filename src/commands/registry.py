@@ -0,0 +1,91 @@
+"""
+命令注册表
+
+把命令名映射到 "模块:类名" 形式的导入路径，命令类在第一次使用时才导入。
+启动时只需要加载注册表本身，不使用拼写检查的会话不会导入 pyspellchecker，
+不读取HTML文件的会话不会导入 BeautifulSoup。
+"""
+import importlib
+import threading
+from typing import Dict, Iterable, Optional, Type
+
+class CommandRegistry:
+    """命令名到延迟导入的命令类的映射"""
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            entries: 命令名 -> "模块路径:类名"
+        """
+        self._targets: Dict[str, str] = {}
+        self._loaded: Dict[str, Type] = {}
+        self._lock = threading.Lock()
+        for name, target in (entries or {}).items():
+            self.register(name, target)
+
+    def register(self, name: str, target) -> None:
+        """
+        注册命令
+
+        Args:
+            name: 命令名
+            target: "模块路径:类名"，或已经导入的命令类/工厂函数
+        """
+        with self._lock:
+            if isinstance(target, str):
+                if ':' not in target:
+                    raise ValueError(f"命令 '{name}' 的导入路径必须是 '模块:类名' 形式: {target}")
+                self._targets[name] = target
+                self._loaded.pop(name, None)
+            else:
+                self._targets[name] = f"{target.__module__}:{target.__qualname__}"
+                self._loaded[name] = target
+
+    def resolve(self, name: str):
+        """
+        返回命令类，第一次调用时导入其模块
+
+        Raises:
+            KeyError: 命令未注册
+        """
+        factory = self._loaded.get(name)
+        if factory is not None:
+            return factory
+        target = self._targets[name]
+        module_name, _, attribute = target.partition(':')
+        factory = getattr(importlib.import_module(module_name), attribute)
+        with self._lock:
+            self._loaded[name] = factory
+        return factory
+
+    def create(self, name: str, *args, **kwargs):
+        """导入（如有必要）并创建命令实例"""
+        return self.resolve(name)(*args, **kwargs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def names(self) -> Iterable[str]:
+        return list(self._targets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+# 内置命令
+COMMANDS = CommandRegistry({
+    'append': 'src.commands.edit.append_command:AppendCommand',
+    'insert': 'src.commands.edit.insert_command:InsertCommand',
+    'delete': 'src.commands.edit.delete_command:DeleteCommand',
+    'edit-text': 'src.commands.edit.edit_text_command:EditTextCommand',
+    'edit-id': 'src.commands.edit.edit_id_command:EditIdCommand',
+    'read': 'src.commands.io.read:ReadCommand',
+    'save': 'src.commands.io.save:SaveCommand',
+    'init': 'src.commands.io.init:InitCommand',
+    'export-snapshot': 'src.commands.io.snapshot:ExportSnapshotCommand',
+    'import-snapshot': 'src.commands.io.snapshot:ImportSnapshotCommand',
+    'tree': 'src.commands.display.print_tree:PrintTreeCommand',
+    'spell-check': 'src.commands.display.spell_check:SpellCheckCommand',
+    'dir-tree': 'src.commands.display.dir_tree:DirTreeCommand',
+    'help': 'src.commands.io.help_command:HelpCommand',
+    'exit': 'src.commands.io.exit_command:ExitCommand',
+})
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# 已知单词的缓存值；未知单词缓存其建议列表（元组）
+KNOWN = True
+
+class WordCache:
+    """容量受限的LRU缓存，保存单词的拼写判定和建议
+
+    键由调用方决定，拼写检查器使用 (词典标识, 单词)。词典变化时检查器
+    换用新的词典标识，旧条目不再被命中，随LRU淘汰，不需要逐条清除。
+    可以在多个检查器和多次命令之间共享，访问是线程安全的。
+    """
+
+    DEFAULT_CAPACITY = 50000
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: 最多缓存的单词数
+        """
+        if capacity <= 0:
+            raise ValueError("缓存容量必须大于0")
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key: Hashable, default=None):
+        """返回缓存的值并标记为最近使用，不存在时返回default"""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        """写入缓存，超过容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """返回命中率等统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
@@ -4,7 +4,36 @@ from dataclasses import dataclass
 import re
 import os
 import json
+import bisect
+import itertools
+import threading
 from spellchecker import SpellChecker as PySpellChecker
+from .cache import KNOWN, WordCache
+from src.core.output import get_output
+
+# 文本中需要检查的单词
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]+\b')
+
+# 所有检查器共享的单词缓存，跨命令保留
+_shared_cache = WordCache()
+# 词典签名 -> 词典标识；相同词典的检查器共享缓存条目
+_dictionary_tokens: Dict[Any, int] = {}
+_token_counter = itertools.count(1)
+_token_lock = threading.Lock()
+
+def shared_cache() -> WordCache:
+    """返回拼写检查器默认使用的共享缓存"""
+    return _shared_cache
+
+def _dictionary_token(signature=None) -> int:
+    """签名相同的词典返回相同的标识，signature为None时返回新的私有标识"""
+    with _token_lock:
+        if signature is None:
+            return next(_token_counter)
+        token = _dictionary_tokens.get(signature)
+        if token is None:
+            token = _dictionary_tokens[signature] = next(_token_counter)
+        return token
 
 class SpellError:
     """表示一个拼写错误"""
@@ -31,28 +60,92 @@ class SpellError:
 class SpellChecker:
     """拼写检查器实现"""
     
-    def __init__(self, language="en", custom_dict=None):
+    # 待查的新单词少于该数量时，prefetch() 不启动进程池
+    PARALLEL_THRESHOLD = 500
+    
+    # 默认使用预编译词典（见 compiled.py），创建检查器只需映射词典文件
+    USE_COMPILED = True
+    
+    # 拼写建议引擎: "edits" 枚举编辑距离2以内的字符串（pyspellchecker 的做法），
+    # "symspell" 查预计算的对称删除索引（见 symspell.py，需要预编译词典）
+    ENGINES = ("edits", "symspell")
+    SUGGESTION_ENGINE = "edits"
+    
+    def __init__(self, language="en", custom_dict=None, cache=None, compiled=None, engine=None):
         """初始化拼写检查器
         
         Args:
             language (str): 语言代码
             custom_dict (dict, optional): 自定义字典
+            cache (WordCache, optional): 单词判定和建议的缓存，默认使用所有检查器共享的缓存
+            compiled (bool, optional): 是否使用预编译词典，None表示使用USE_COMPILED；
+                预编译词典无法加载时退回到 pyspellchecker
+            engine (str, optional): 建议引擎，None表示使用SUGGESTION_ENGINE；
+                删除索引无法加载时退回到 "edits"
+        
+        Raises:
+            ValueError: 未知的建议引擎
         """
-        self.checker = PySpellChecker(language=language)
+        engine = engine or self.SUGGESTION_ENGINE
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的拼写建议引擎: {engine}")
+        self.cache = cache if cache is not None else _shared_cache
+        self.language = language
+        # 字典文件之外加入的单词，工作进程据此重建相同的词典
+        self._extra_words = list(custom_dict or ())
+        dictionary_path = os.path.join("resources", "dictionary.txt")
+        dictionary_signature = None
+        if os.path.exists(dictionary_path):
+            stat = os.stat(dictionary_path)
+            dictionary_signature = (os.path.abspath(dictionary_path), stat.st_mtime_ns, stat.st_size)
         
-        # 加载字典文件
-        try:
-            dictionary_path = os.path.join("resources", "dictionary.txt")
-            if os.path.exists(dictionary_path):
-                with open(dictionary_path, 'r', encoding='utf-8') as f:
-                    custom_words = [line.strip() for line in f if line.strip()]
-                    self.checker.word_frequency.load_words(custom_words)
-        except Exception as e:
-            print(f"Warning: Could not load dictionary: {e}")
+        self.checker = None
+        if self.USE_COMPILED if compiled is None else compiled:
+            try:
+                from .compiled import CompiledSpeller, load_dictionary
+                # 语言数据和字典文件已编译在同一个词典文件中
+                self.checker = CompiledSpeller(load_dictionary(language, dictionary_path))
+            except (OSError, ValueError) as e:
+                get_output().warning("Warning: Could not load compiled dictionary: %s", e)
+        
+        if self.checker is None:
+            self.checker = PySpellChecker(language=language)
+            # 加载字典文件
+            try:
+                if os.path.exists(dictionary_path):
+                    with open(dictionary_path, 'r', encoding='utf-8') as f:
+                        custom_words = [line.strip() for line in f if line.strip()]
+                        self.checker.word_frequency.load_words(custom_words)
+            except Exception as e:
+                get_output().warning("Warning: Could not load dictionary: %s", e)
         
         # 如果有自定义字典，直接添加到库的词典中
         if custom_dict:
             self.checker.word_frequency.load_words(list(custom_dict.keys()))
+        
+        # 生成建议的对象，提供与库相同的 candidates()/correction()
+        self.engine = "edits"
+        self.suggester = self.checker
+        if engine == "symspell":
+            self._use_symspell()
+        
+        # 相同语言、词典和建议引擎的检查器共享缓存条目
+        self._dictionary = _dictionary_token((type(self.checker).__qualname__, self.engine, language,
+                                              dictionary_signature, frozenset(custom_dict or ())))
+    
+    def _use_symspell(self):
+        from .compiled import CompiledSpeller
+        if not isinstance(self.checker, CompiledSpeller):
+            get_output().warning("Warning: SymSpell suggestions need the compiled dictionary, using edit candidates")
+            return
+        from .symspell import SymSpellSuggester, load_index
+        try:
+            self.suggester = SymSpellSuggester(self.checker, load_index(self.checker.dictionary))
+        except (OSError, ValueError) as e:
+            get_output().warning("Warning: Could not load SymSpell index: %s", e)
+            return
+        self.suggester.add_words(self._extra_words)
+        self.engine = "symspell"
             
     def check_text(self, text: str) -> List[SpellError]:
         """检查文本拼写错误
@@ -68,30 +161,19 @@ class SpellChecker:
             
         # 提取文本中的单词
         words_with_positions = []
-        for match in re.finditer(r'\b[a-zA-Z]+\b', text):
+        for match in WORD_PATTERN.finditer(text):
             word = match.group()
             start, end = match.span()
             words_with_positions.append((word, start, end))
         
-        # 提取所有单词
-        words = [word for word, _, _ in words_with_positions]
-        
-        # 使用库的unknown()方法直接获取所有拼写错误的单词
-        misspelled = self.checker.unknown(words)
+        # 每个不同的单词只查询一次，缓存中没有的再交给词典判断
+        verdicts = self._lookup(word for word, _, _ in words_with_positions)
         
         errors = []
         # 处理每个拼写错误
         for word, start, end in words_with_positions:
-            if word in misspelled:
-                # 直接使用库的candidates()方法获取建议
-                suggestions = list(self.checker.candidates(word))
-                
-                # 确保最佳纠正在前面
-                correction = self.checker.correction(word)
-                if correction in suggestions:
-                    suggestions.remove(correction)
-                    suggestions.insert(0, correction)
-                
+            suggestions = verdicts[word]
+            if suggestions is not KNOWN:
                 # 获取上下文
                 context_start = max(0, start - 30)
                 context_end = min(len(text), end + 30)
@@ -100,7 +182,7 @@ class SpellChecker:
                 # 创建错误对象
                 error = SpellError(
                     wrong_word=word,
-                    suggestions=suggestions,
+                    suggestions=list(suggestions),
                     context=context,
                     start=start,
                     end=end
@@ -109,6 +191,118 @@ class SpellChecker:
                 
         return errors
     
+    def check_texts(self, texts: List[str]) -> List[List[SpellError]]:
+        """批量检查多个文本，结果与逐个调用 check_text() 相同
+        
+        所有文本拼接后用一次正则扫描切分单词，不同的单词只判断一次，
+        再按偏移把错误分配回各自的文本。大量很短的文本（列表项、表格
+        单元格）时，开销取决于不同单词的数量而不是文本的数量。
+        SpellCheckCommand 总是通过本方法检查，替换 check_text() 的子类应一并替换本方法。
+        
+        Args:
+            texts (list): 要检查的文本
+            
+        Returns:
+            list: 每个文本的SpellError对象列表
+        """
+        results = [[] for _ in texts]
+        # 换行符不是单词字符，拼接处的单词边界与单独扫描每个文本时相同
+        joined = '\n'.join(texts)
+        verdicts = self._lookup(dict.fromkeys(WORD_PATTERN.findall(joined)))
+        misspelled = {word for word, verdict in verdicts.items() if verdict is not KNOWN}
+        if not misspelled:
+            return results
+        
+        # 每个文本在拼接结果中的起始偏移
+        bases = list(itertools.accumulate((len(text) + 1 for text in texts[:-1]), initial=0))
+        for match in WORD_PATTERN.finditer(joined):
+            word = match.group()
+            if word not in misspelled:
+                continue
+            index = bisect.bisect_right(bases, match.start()) - 1
+            text = texts[index]
+            start = match.start() - bases[index]
+            end = start + len(word)
+            results[index].append(SpellError(
+                wrong_word=word,
+                suggestions=list(verdicts[word]),
+                context=text[max(0, start - 30):min(len(text), end + 30)],
+                start=start,
+                end=end
+            ))
+        return results
+    
+    def _lookup(self, words) -> Dict[str, Any]:
+        """返回每个不同单词的判定: KNOWN，或拼写错误时的建议元组（最佳纠正在前）"""
+        verdicts = {}
+        missing = []
+        for word in words:
+            if word in verdicts:
+                continue
+            verdict = self.cache.get((self._dictionary, word))
+            verdicts[word] = verdict
+            if verdict is None:
+                missing.append(word)
+        if missing:
+            verdicts.update(self._resolve(missing))
+        return verdicts
+    
+    def _resolve(self, words: List[str]) -> Dict[str, Any]:
+        """用词典判断缓存中没有的单词，结果写入缓存"""
+        verdicts = {}
+        # 使用库的unknown()方法获取拼写错误的单词
+        misspelled = self.checker.unknown(words)
+        for word in words:
+            if word in misspelled:
+                verdict = tuple(self._suggest(word))
+            else:
+                verdict = KNOWN
+            verdicts[word] = verdict
+            self.cache.put((self._dictionary, word), verdict)
+        return verdicts
+    
+    def prefetch(self, words, workers: Optional[int] = None) -> int:
+        """
+        预先判断一批单词并写入缓存，之后的 check_text() 直接命中缓存
+        
+        新单词足够多且 workers 大于1时，单词分发到进程池并行判断，
+        每个工作进程只加载一次词典。
+        
+        Args:
+            words: 单词（可重复）
+            workers: 工作进程数，None表示CPU核数
+            
+        Returns:
+            int: 新判断的单词数
+        """
+        missing = [word for word in dict.fromkeys(words)
+                   if self.cache.get((self._dictionary, word)) is None]
+        if not missing:
+            return 0
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(missing) < self.PARALLEL_THRESHOLD:
+            self._resolve(missing)
+            return len(missing)
+        
+        from .parallel import resolve_words
+        verdicts = resolve_words(missing, workers, self.language, self._extra_words, self.engine)
+        for word in missing:
+            self.cache.put((self._dictionary, word), verdicts[word])
+        return len(missing)
+    
+    def _suggest(self, word: str) -> List[str]:
+        """生成建议列表，最佳纠正在前，其余按词频降序"""
+        # 使用库（或SymSpell引擎）的candidates()方法获取建议，没有候选词时返回None
+        # 候选词是集合，排序后建议的顺序在不同进程中保持一致
+        suggestions = sorted(self.suggester.candidates(word) or (), key=lambda c: (-self.checker[c], c))
+        
+        # 确保最佳纠正在前面
+        correction = self.suggester.correction(word)
+        if correction in suggestions:
+            suggestions.remove(correction)
+            suggestions.insert(0, correction)
+        return suggestions
+    
     def check_element(self, element):
         """
         检查HTML元素中的文本拼写错误
@@ -128,10 +322,27 @@ class SpellChecker:
     def add_word(self, word: str):
         """添加单词到字典"""
         self.checker.word_frequency.add(word)
+        self._extra_words.append(word)
+        if self.suggester is not self.checker:
+            self.suggester.add_words([word])
+        self._dictionary_changed()
         
     def add_words(self, words: List[str]):
         """批量添加单词到字典"""
         self.checker.word_frequency.load_words(words)
+        self._extra_words.extend(words)
+        if self.suggester is not self.checker:
+            self.suggester.add_words(words)
+        self._dictionary_changed()
+    
+    @property
+    def dictionary_token(self) -> int:
+        """当前词典的标识，词典相同的检查器标识相同，词典变化后标识随之改变"""
+        return self._dictionary
+    
+    def _dictionary_changed(self):
+        """词典已不同于其他检查器，换用私有的词典标识，缓存中的旧判定不再使用"""
+        self._dictionary = _dictionary_token()
     
     def get_word_probability(self, word: str) -> float:
         """获取单词的概率"""
@@ -139,7 +350,7 @@ class SpellChecker:
         
     def get_correction(self, word: str) -> str:
         """获取单词的最佳纠正建议"""
-        return self.checker.correction(word)
+        return self.suggester.correction(word)
 
 class SpellErrorReporter:
     """拼写错误报告接口"""
@@ -0,0 +1,370 @@
+"""
+预编译词典
+
+把 pyspellchecker 的语言数据和 resources/dictionary.txt 合并编译为一个
+二进制文件，之后创建拼写检查器只需要 mmap 这个文件，不再解压和解析JSON、
+逐行读取字典文件、构建十几万项的Python字典。
+
+默认缓存在用户自己的缓存目录（只允许所有者访问）中，使用前检查文件
+属于当前用户且他人不可写，不会读取其他用户在共享目录中预先放置的文件。
+
+文件格式（整数使用本机字节序）:
+    头部      HEADER: 魔数、版本、字节序、单词数、槽数、最长单词长度、总词频
+    字母表    uint32 长度 + UTF-8（生成编辑距离候选词时使用的字母）
+    来源签名  uint32 长度 + UTF-8 JSON（来源变化时重新编译）
+    槽表      slots 个 uint32，开放寻址哈希表（crc32，线性探测），值为条目序号+1
+    条目      count 个 (偏移, 长度, 词频) uint32 三元组，按单词排序
+    字符串区  所有单词的 UTF-8 编码依次拼接
+"""
+import gzip
+import json
+import mmap
+import os
+import string
+import struct
+import sys
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from src.io.atomic import atomic_write
+
+MAGIC = b'HSPD'
+VERSION = 1
+HEADER = struct.Struct('=4sIBIIIQ')
+_LENGTH = struct.Struct('=I')
+_BYTEORDER = 0 if sys.byteorder == 'little' else 1
+
+class CompiledDictionary:
+    """只读、内存映射的词典文件"""
+
+    def __init__(self, path: str):
+        """
+        打开编译好的词典
+
+        Raises:
+            ValueError: 文件格式或版本不符
+            OSError: 文件无法读取
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (ValueError, struct.error) as e:
+            self._mmap.close()
+            raise ValueError(f"无效的词典文件: {path}") from e
+
+    def _parse(self) -> None:
+        data = self._mmap
+        magic, version, byteorder, count, slots, longest, total = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or byteorder != _BYTEORDER:
+            raise ValueError("版本或字节序不符")
+        offset = HEADER.size
+        (length,) = _LENGTH.unpack_from(data, offset)
+        self.letters: Set[str] = set(data[offset + 4:offset + 4 + length].decode('utf-8'))
+        offset += 4 + length
+        (length,) = _LENGTH.unpack_from(data, offset)
+        self.signature = json.loads(data[offset + 4:offset + 4 + length].decode('utf-8'))
+        offset += 4 + length
+        # 槽表和条目按4字节对齐
+        offset += -offset % 4
+        view = memoryview(data)
+        self._slots = view[offset:offset + slots * 4].cast('I')
+        offset += slots * 4
+        self._entries = view[offset:offset + count * 12].cast('I')
+        self._strings = offset + count * 12
+        self._mask = slots - 1
+        self.count = count
+        self.longest_word_length = longest
+        self.total_words = total
+
+    def _find(self, key: bytes) -> int:
+        """返回单词的条目序号，不存在时返回-1"""
+        slots, entries, data = self._slots, self._entries, self._mmap
+        mask = self._mask
+        slot = zlib.crc32(key) & mask
+        while True:
+            index = slots[slot]
+            if not index:
+                return -1
+            index -= 1
+            start = self._strings + entries[index * 3]
+            if data[start:start + entries[index * 3 + 1]] == key:
+                return index
+            slot = (slot + 1) & mask
+
+    def frequency(self, word: str) -> int:
+        """单词的词频，不在词典中时为0"""
+        index = self._find(word.encode('utf-8'))
+        return self._entries[index * 3 + 2] if index >= 0 else 0
+
+    def __contains__(self, word: str) -> bool:
+        return self._find(word.encode('utf-8')) >= 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def word_at(self, index: int) -> str:
+        """第index个单词（按排序顺序）"""
+        start = self._strings + self._entries[index * 3]
+        return self._mmap[start:start + self._entries[index * 3 + 1]].decode('utf-8')
+
+    def words(self) -> Iterator[str]:
+        """按排序顺序遍历所有单词"""
+        entries, data = self._entries, self._mmap
+        for index in range(self.count):
+            start = self._strings + entries[index * 3]
+            yield data[start:start + entries[index * 3 + 1]].decode('utf-8')
+
+    def close(self) -> None:
+        self._slots.release()
+        self._entries.release()
+        self._mmap.close()
+
+def compile_dictionary(path: str, frequencies: Dict[str, int], signature=None) -> None:
+    """
+    把 单词 -> 词频 编译为词典文件（原子写入）
+
+    Args:
+        path: 目标文件
+        frequencies: 单词及其词频
+        signature: 可JSON序列化的来源签名，打开时用于判断是否过期
+    """
+    words = sorted(frequencies)
+    encoded = [word.encode('utf-8') for word in words]
+    slots = 1
+    while slots < len(words) * 2:
+        slots *= 2
+    mask = slots - 1
+    table = [0] * slots
+    entries = []
+    offset = 0
+    for index, key in enumerate(encoded):
+        slot = zlib.crc32(key) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = index + 1
+        entries.extend((offset, len(key), frequencies[words[index]]))
+        offset += len(key)
+
+    letters = ''.join(sorted(set().union(*words))).encode('utf-8') if words else b''
+    meta = json.dumps(signature).encode('utf-8')
+    parts = [HEADER.pack(MAGIC, VERSION, _BYTEORDER, len(words), slots,
+                         max(map(len, words), default=0), sum(frequencies.values())),
+             _LENGTH.pack(len(letters)), letters, _LENGTH.pack(len(meta)), meta]
+    header_size = sum(map(len, parts))
+    parts.append(b'\0' * (-header_size % 4))
+    parts.append(struct.pack(f'={slots}I', *table))
+    parts.append(struct.pack(f'={len(entries)}I', *entries))
+    parts.append(b''.join(encoded))
+    atomic_write(path, b''.join(parts), mode=0o600)
+
+def language_frequencies(language: str) -> Dict[str, int]:
+    """读取 pyspellchecker 自带的语言词频数据"""
+    import pkgutil
+    data = pkgutil.get_data("spellchecker", f"resources/{language.lower()}.json.gz")
+    if not data:
+        raise ValueError(f"没有该语言的词典: {language}")
+    return json.loads(gzip.decompress(data).decode('utf-8'))
+
+def source_signature(language: str, dictionary_path: Optional[str]):
+    """编译词典的来源签名: 语言、pyspellchecker版本和字典文件的大小与修改时间"""
+    try:
+        from importlib.metadata import version
+        library = version('pyspellchecker')
+    except Exception:
+        library = None
+    dictionary = None
+    if dictionary_path and os.path.exists(dictionary_path):
+        stat = os.stat(dictionary_path)
+        dictionary = [os.path.abspath(dictionary_path), stat.st_size, stat.st_mtime_ns]
+    return {"language": language, "pyspellchecker": library, "dictionary": dictionary}
+
+def cache_directory() -> str:
+    """
+    编译文件的缓存目录: $XDG_CACHE_HOME/html-editor，默认为 ~/.cache/html-editor
+
+    Raises:
+        OSError: 无法创建目录，或目录不属于当前用户
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    directory = os.path.join(base, 'html-editor')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    check_owner(directory)
+    return directory
+
+def check_owner(path: str) -> None:
+    """
+    确认文件属于当前用户且组和其他用户不可写
+
+    Raises:
+        PermissionError: 文件属于其他用户或他人可写
+        OSError: 文件不存在
+    """
+    if not hasattr(os, 'getuid'):
+        return
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        raise PermissionError(f"不属于当前用户或他人可写: {path}")
+
+def default_path(signature) -> str:
+    """编译词典的缓存位置，文件名包含来源签名的摘要"""
+    digest = zlib.crc32(json.dumps(signature, sort_keys=True).encode('utf-8'))
+    return os.path.join(cache_directory(), f"{signature['language']}-{digest:08x}.dict")
+
+# 已打开的词典: 路径 -> CompiledDictionary，进程内所有检查器共享同一映射
+_opened: Dict[str, CompiledDictionary] = {}
+_opened_lock = threading.Lock()
+
+def load_dictionary(language: str = "en", dictionary_path: Optional[str] = None,
+                    path: Optional[str] = None) -> CompiledDictionary:
+    """
+    打开（必要时先编译）语言数据加字典文件的编译词典
+
+    Args:
+        language: 语言代码
+        dictionary_path: 额外的字典文件（每行一个单词），不存在时忽略
+        path: 编译词典的位置，None表示按来源签名放在缓存目录(cache_directory)
+
+    Raises:
+        ValueError: 语言不存在
+        OSError: 无法写入编译词典
+    """
+    signature = source_signature(language, dictionary_path)
+    path = path or default_path(signature)
+    with _opened_lock:
+        compiled = _opened.get(path)
+        if compiled is not None and compiled.signature == signature:
+            return compiled
+        try:
+            check_owner(path)
+            compiled = CompiledDictionary(path)
+            if compiled.signature != signature:
+                compiled.close()
+                compiled = None
+        except (OSError, ValueError):
+            compiled = None
+        if compiled is None:
+            frequencies = Counter(language_frequencies(language))
+            if signature["dictionary"]:
+                with open(dictionary_path, 'r', encoding='utf-8') as f:
+                    # 与 WordFrequency.load_words 一致: 每个单词词频加1
+                    frequencies.update(line.strip().lower() for line in f if line.strip())
+            compile_dictionary(path, frequencies, signature)
+            compiled = CompiledDictionary(path)
+        _opened[path] = compiled
+        return compiled
+
+class CompiledSpeller:
+    """基于编译词典的拼写判断，接口和结果与 pyspellchecker.SpellChecker 一致
+
+    实现了拼写检查器用到的部分: known/unknown/candidates/correction、
+    词频查询以及 word_frequency.add/load_words。运行时加入的单词保存在
+    内存中的增量词频表里，不修改共享的词典文件。
+    """
+
+    def __init__(self, dictionary: CompiledDictionary):
+        self.dictionary = dictionary
+        self._added: Counter = Counter()
+        self._letters = dictionary.letters
+        self._longest = dictionary.longest_word_length
+        self._total = dictionary.total_words
+
+    @property
+    def word_frequency(self) -> 'CompiledSpeller':
+        """兼容 pyspellchecker 的 word_frequency.add/load_words"""
+        return self
+
+    def add(self, word: str, val: int = 1) -> None:
+        self.load_frequencies({word.lower(): val})
+
+    def load_words(self, words: Iterable[str]) -> None:
+        self.load_frequencies(Counter(word.lower() for word in words))
+
+    def load_frequencies(self, frequencies: Dict[str, int]) -> None:
+        for word, count in frequencies.items():
+            self._added[word] += count
+            self._total += count
+            self._longest = max(self._longest, len(word))
+            if not self._letters.issuperset(word):
+                self._letters = self._letters | set(word)
+
+    def __getitem__(self, word: str) -> int:
+        word = word.lower()
+        return self.dictionary.frequency(word) + self._added.get(word, 0)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._added or word in self.dictionary
+
+    @property
+    def longest_word_length(self) -> int:
+        return self._longest
+
+    def word_usage_frequency(self, word: str) -> float:
+        return self[word] / self._total
+
+    def _should_check(self, word: str) -> bool:
+        if len(word) == 1 and word in string.punctuation:
+            return False
+        if len(word) > self._longest + 3:
+            return False
+        if word.lower() in ("nan", "inf", "infinity"):
+            return True
+        try:
+            float(word)
+            return False
+        except ValueError:
+            return True
+
+    def known(self, words: Iterable[str]) -> Set[str]:
+        return {w for w in (word.lower() for word in words) if w in self and self._should_check(w)}
+
+    def unknown(self, words: Iterable[str]) -> Set[str]:
+        return {w for w in (word.lower() for word in words if self._should_check(word)) if w not in self}
+
+    def edit_distance_1(self, word: str) -> Set[str]:
+        word = word.lower()
+        if not self._should_check(word):
+            return {word}
+        letters = self._letters
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        deletes = [left + right[1:] for left, right in splits if right]
+        transposes = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+        replaces = [left + c + right[1:] for left, right in splits if right for c in letters]
+        inserts = [left + c + right for left, right in splits for c in letters]
+        return set(deletes + transposes + replaces + inserts)
+
+    def candidates(self, word: str) -> Optional[Set[str]]:
+        """编辑距离2以内的候选词，没有候选词时返回None"""
+        if self.known([word]):
+            return {word}
+        if not self._should_check(word):
+            return {word}
+        edits = list(self.edit_distance_1(word))
+        found = self.known(edits)
+        if found:
+            return found
+        # 与 pyspellchecker 相同：对每个编辑距离1的字符串再做一次编辑；
+        # 先合并去重再查词典，结果相同而查找次数少得多
+        second = set()
+        for e1 in edits:
+            if self._should_check(e1):
+                second.update(self.edit_distance_1(e1))
+        found = self.known(second)
+        return found or None
+
+    def correction(self, word: str) -> Optional[str]:
+        """最可能的正确拼写，优先选择只有变音符号不同的候选词，其次词频最高的候选词"""
+        candidates = self.candidates(word)
+        if not candidates:
+            return None
+        plain = _remove_diacritics(word)
+        matches = [c for c in candidates if _remove_diacritics(c) == plain]
+        # 词频相同时取字母顺序最前的单词，结果不随集合的遍历顺序变化
+        return max(sorted(matches or candidates), key=self.__getitem__)
+
+def _remove_diacritics(text: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
@@ -0,0 +1,47 @@
+"""
+多进程单词判定
+
+把去重后的单词分块发送到进程池，每个工作进程在启动时创建一次拼写检查器
+（加载词典），之后只处理单词块，返回每个单词的判定（KNOWN 或建议元组）。
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+# 工作进程内的拼写检查器，由进程池的 initializer 创建
+_checker = None
+
+def _init_worker(language: str, extra_words: List[str], engine: str) -> None:
+    global _checker
+    from .cache import WordCache
+    from .checker import SpellChecker
+    _checker = SpellChecker(language, custom_dict=dict.fromkeys(extra_words), cache=WordCache(),
+                            engine=engine)
+
+def _resolve_chunk(words: List[str]) -> Dict[str, Any]:
+    return _checker._resolve(words)
+
+def resolve_words(words: List[str], workers: int, language: str = "en",
+                  extra_words: Iterable[str] = (), engine: str = "edits") -> Dict[str, Any]:
+    """
+    在进程池中判断单词
+
+    Args:
+        words: 不重复的单词
+        workers: 工作进程数
+        language: 词典语言
+        extra_words: 字典文件之外加入的单词
+        engine: 拼写建议引擎
+
+    Returns:
+        单词 -> 判定
+    """
+    workers = max(1, min(workers, len(words)))
+    # 分成比进程数多的块，拼写错误较多的块不会拖慢整体
+    size = max(1, -(-len(words) // (workers * 4)))
+    chunks = [words[i:i + size] for i in range(0, len(words), size)]
+    verdicts: Dict[str, Any] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(language, list(extra_words), engine)) as executor:
+        for part in executor.map(_resolve_chunk, chunks):
+            verdicts.update(part)
+    return verdicts
@@ -0,0 +1,315 @@
+"""
+对称删除（SymSpell）建议引擎
+
+pyspellchecker 为每个拼写错误生成编辑距离2以内的所有字符串（数十万个）
+再逐个查词典。对称删除预先计算词典中每个单词删除至多2个字母得到的
+字符串，查询时只需生成输入单词的删除串（几十个）并在索引中查找，再用
+编辑距离核实候选词。两个单词的 Damerau-Levenshtein 距离不超过2时，
+各自删除至多2个字母一定能得到相同的字符串，所以候选词与 pyspellchecker
+两次编辑能得到的词典单词相同。
+
+删除索引按编译词典（见 compiled.py）编译为一个文件，与词典文件放在一起，
+之后只需 mmap。索引只保存删除串的哈希桶到单词序号的映射，哈希冲突
+带来的多余候选词在核实距离时被排除。删除串按整个单词计算（不像
+SymSpell 那样只取前缀），以保证候选词完整。
+
+文件格式（整数使用本机字节序）:
+    头部      HEADER: 魔数、版本、字节序、桶数、单词序号总数
+    来源签名  uint32 长度 + UTF-8 JSON（词典或参数变化时重新编译）
+    桶偏移    buckets+1 个 uint32，第i个桶的单词序号位于 [offsets[i], offsets[i+1])
+    单词序号  postings 个 uint32，指向编译词典中的条目
+"""
+import json
+import mmap
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.io.atomic import atomic_write
+from .compiled import CompiledDictionary, CompiledSpeller, check_owner
+
+MAGIC = b'HSDI'
+VERSION = 2
+HEADER = struct.Struct('=4sIBII')
+_LENGTH = struct.Struct('=I')
+_BYTEORDER = 0 if sys.byteorder == 'little' else 1
+
+MAX_DISTANCE = 2
+
+def deletes(word: str, distance: int = MAX_DISTANCE) -> Set[str]:
+    """删除至多distance个字母得到的所有字符串（包括单词本身）"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        result |= frontier
+    return result
+
+def _trim(a: str, b: str):
+    """去掉公共前缀和后缀，不影响编辑距离"""
+    n = min(len(a), len(b))
+    start = 0
+    while start < n and a[start] == b[start]:
+        start += 1
+    n -= start
+    end = 0
+    while end < n and a[-1 - end] == b[-1 - end]:
+        end += 1
+    return a[start:len(a) - end], b[start:len(b) - end]
+
+def damerau_distance(a: str, b: str, limit: int = MAX_DISTANCE) -> int:
+    """
+    Damerau-Levenshtein 距离: 把一个字符串变为另一个所需的最少删除、插入、
+    替换、相邻字母交换次数，与 pyspellchecker 逐次编辑的定义相同（交换后
+    还可以在两个字母之间插入，不同于受限的OSA距离）
+
+    Returns:
+        int: 编辑距离，超过limit时返回limit+1
+    """
+    if a == b:
+        return 0
+    a, b = _trim(a, b)
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return max(len(a), len(b))
+    # Lowrance-Wagner 算法，只计算 |i-j| <= limit 的对角带，带外的值一定超过limit
+    rows, cols = len(a), len(b)
+    beyond = limit + 1
+    table = [[beyond] * (cols + 2) for _ in range(rows + 2)]
+    for i in range(rows + 1):
+        table[i + 1][1] = i
+    for j in range(cols + 1):
+        table[1][j + 1] = j
+    last_row: Dict[str, int] = {}
+    for i in range(1, rows + 1):
+        char = a[i - 1]
+        first = max(1, i - limit)
+        # 对角带之前 b 中最后一个与 char 相同的位置
+        last_col = b.rfind(char, 0, first - 1) + 1
+        row, above = table[i + 1], table[i]
+        lowest = beyond
+        for j in range(first, min(cols, i + limit) + 1):
+            i1 = last_row.get(b[j - 1], 0)
+            j1 = last_col
+            if char == b[j - 1]:
+                cost = 0
+                last_col = j
+            else:
+                cost = 1
+            value = min(above[j] + cost, row[j] + 1, above[j + 1] + 1,
+                        table[i1][j1] + (i - i1 - 1) + 1 + (j - j1 - 1))
+            row[j + 1] = value
+            if value < lowest:
+                lowest = value
+        if lowest > limit:
+            return beyond
+        last_row[char] = i
+    return min(table[rows + 1][cols + 1], beyond)
+
+def within_one(a: str, b: str) -> bool:
+    """编辑距离是否不超过1，线性时间"""
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > 1:
+        return False
+    i = 0
+    n = len(b)
+    while i < n and a[i] == b[i]:
+        i += 1
+    if len(a) != n:
+        return a[i + 1:] == b[i:]
+    return (a[i + 1:] == b[i + 1:] or
+            (i + 1 < n and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]))
+
+def _bucket(key: str, mask: int) -> int:
+    return zlib.crc32(key.encode('utf-8')) & mask
+
+def _word_buckets(word: str, mask: int) -> Set[int]:
+    return {_bucket(key, mask) for key in deletes(word)}
+
+class DeleteIndex:
+    """只读、内存映射的删除索引"""
+
+    def __init__(self, path: str):
+        """
+        打开编译好的删除索引
+
+        Raises:
+            ValueError: 文件格式或版本不符
+            OSError: 文件无法读取
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byteorder, buckets, postings = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION or byteorder != _BYTEORDER:
+                raise ValueError("版本或字节序不符")
+            offset = HEADER.size
+            (length,) = _LENGTH.unpack_from(self._mmap, offset)
+            self.signature = json.loads(self._mmap[offset + 4:offset + 4 + length].decode('utf-8'))
+            offset += 4 + length
+            offset += -offset % 4
+            view = memoryview(self._mmap)
+            self._offsets = view[offset:offset + (buckets + 1) * 4].cast('I')
+            offset += (buckets + 1) * 4
+            self._postings = view[offset:offset + postings * 4].cast('I')
+        except (ValueError, struct.error, TypeError) as e:
+            self._mmap.close()
+            raise ValueError(f"无效的删除索引: {path}") from e
+        self._mask = buckets - 1
+
+    def lookup(self, word: str) -> Set[int]:
+        """与word共享删除串的候选单词序号（含哈希冲突带来的多余候选词）"""
+        offsets, postings, mask = self._offsets, self._postings, self._mask
+        found: Set[int] = set()
+        for bucket in _word_buckets(word, mask):
+            found.update(postings[offsets[bucket]:offsets[bucket + 1]])
+        return found
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._postings.release()
+        self._mmap.close()
+
+def index_signature(dictionary: CompiledDictionary):
+    """删除索引的来源签名: 词典的签名和大小以及索引参数"""
+    return {"dictionary": dictionary.signature, "words": len(dictionary),
+            "distance": MAX_DISTANCE}
+
+def compile_index(dictionary: CompiledDictionary, path: str) -> None:
+    """为编译词典生成删除索引文件（原子写入）"""
+    buckets = 1
+    while buckets < len(dictionary) * 8:
+        buckets *= 2
+    mask = buckets - 1
+    words = list(dictionary.words())
+    # 第一遍统计每个桶的单词数，第二遍填入单词序号，不需要在内存中保存删除串
+    offsets = array('I', bytes(4 * (buckets + 1)))
+    word_buckets = []
+    for word in words:
+        keys = _word_buckets(word, mask)
+        word_buckets.append(array('I', keys))
+        for bucket in keys:
+            offsets[bucket + 1] += 1
+    for bucket in range(buckets):
+        offsets[bucket + 1] += offsets[bucket]
+    postings = array('I', bytes(4 * offsets[buckets]))
+    cursor = offsets[:-1]
+    for index, keys in enumerate(word_buckets):
+        for bucket in keys:
+            postings[cursor[bucket]] = index
+            cursor[bucket] += 1
+
+    meta = json.dumps(index_signature(dictionary)).encode('utf-8')
+    parts = [HEADER.pack(MAGIC, VERSION, _BYTEORDER, buckets, len(postings)),
+             _LENGTH.pack(len(meta)), meta]
+    header_size = sum(map(len, parts))
+    parts.append(b'\0' * (-header_size % 4))
+    parts.append(offsets.tobytes())
+    parts.append(postings.tobytes())
+    atomic_write(path, b''.join(parts), mode=0o600)
+
+# 已打开的索引: 路径 -> DeleteIndex，进程内所有检查器共享同一映射
+_opened: Dict[str, DeleteIndex] = {}
+_opened_lock = threading.Lock()
+
+def load_index(dictionary: CompiledDictionary, path: Optional[str] = None) -> DeleteIndex:
+    """
+    打开（必要时先编译）编译词典的删除索引
+
+    Args:
+        dictionary: 编译词典
+        path: 索引文件位置，None表示放在词典文件旁边
+
+    Raises:
+        OSError: 无法写入索引文件
+    """
+    signature = index_signature(dictionary)
+    path = path or dictionary.path + '.deletes'
+    with _opened_lock:
+        index = _opened.get(path)
+        if index is not None and index.signature == signature:
+            return index
+        try:
+            check_owner(path)
+            index = DeleteIndex(path)
+            if index.signature != signature:
+                index.close()
+                index = None
+        except (OSError, ValueError):
+            index = None
+        if index is None:
+            compile_index(dictionary, path)
+            index = DeleteIndex(path)
+        _opened[path] = index
+        return index
+
+class SymSpellSuggester:
+    """基于删除索引的候选词生成，接口与 pyspellchecker 的 candidates/correction 一致
+
+    候选词是编辑距离最小（不超过2）的词典单词，与 pyspellchecker 先找
+    距离1、没有再找距离2的规则相同，候选词集合也相同；correction 返回
+    其中词频最高的单词，词频相同时取字母顺序最前的单词。
+    运行时加入词典的单词保存在检查器私有的内存索引中。
+    """
+
+    def __init__(self, speller: CompiledSpeller, index: DeleteIndex):
+        """
+        Args:
+            speller: 提供词频和运行时加入的单词
+            index: speller 所用编译词典的删除索引
+        """
+        self.speller = speller
+        self.dictionary = speller.dictionary
+        self.index = index
+        self._added: Dict[str, Set[str]] = defaultdict(set)
+        self._last = (None, None)
+
+    def add_words(self, words: Iterable[str]) -> None:
+        for word in words:
+            word = word.lower()
+            for key in deletes(word):
+                self._added[key].add(word)
+
+    def _neighbours(self, word: str) -> Set[str]:
+        """与word共享删除串的单词，包含距离超过上限的单词"""
+        neighbours = {self.dictionary.word_at(index) for index in self.index.lookup(word)}
+        if self._added:
+            for key in deletes(word):
+                neighbours.update(self._added.get(key, ()))
+        return neighbours
+
+    def suggest(self, word: str) -> List[str]:
+        """编辑距离最小（不超过MAX_DISTANCE）的词典单词，按词频降序"""
+        word = word.lower()
+        if self._last[0] == word:
+            return self._last[1]
+        found = []
+        if len(word) - MAX_DISTANCE <= self.speller.longest_word_length:
+            neighbours = self._neighbours(word)
+            # 先用线性时间的检查找距离1的单词，没有时才逐个计算距离
+            found = [c for c in neighbours if within_one(word, c)]
+            if not found:
+                found = [c for c in neighbours if damerau_distance(word, c) <= MAX_DISTANCE]
+        result = sorted(found, key=lambda c: (-self.speller[c], c))
+        self._last = (word, result)
+        return result
+
+    def candidates(self, word: str) -> Optional[Set[str]]:
+        """候选词集合，没有候选词时返回None"""
+        if self.speller.known([word]):
+            return {word}
+        return set(self.suggest(word)) or None
+
+    def correction(self, word: str) -> Optional[str]:
+        """词频最高的候选词"""
+        if self.speller.known([word]):
+            return word
+        suggestions = self.suggest(word)
+        return suggestions[0] if suggestions else None
@@ -1,7 +1,11 @@
+import sys
 from typing import List, Optional, Dict, Any
 from abc import ABC, abstractmethod
 from .exceptions import InvalidOperationError
 
+def _sizeof(value) -> int:
+    return 0 if value is None else sys.getsizeof(value)
+
 class HtmlVisitor(ABC):
     """访问者接口"""
     @abstractmethod
@@ -13,13 +17,103 @@ class HtmlElement:
     
     def __init__(self, tag, id):
         """初始化HTML元素"""
+        self.parent = None
+        self._fragment_cache = {}  # 元素自身序列化片段的缓存，键由序列化器决定
+        self._own_cache = None  # 只取决于元素自身内容的缓存，后代修改时保留，按需创建
+        # 子树估算内存和元素数，由修改方法随时更新，size_hint()/subtree_count()是O(1)的
+        self._size_hint = self.ELEMENT_OVERHEAD
+        self._count = 1
+        self._id = None
+        self._text = None
+        self._attributes = {}
         self.tag = tag
         self.id = id
         self.children = []
-        self.parent = None
         self.attributes = {}
         self.text = ''  # Initialize as empty string, not None
     
+    @property
+    def text(self):
+        """元素文本内容"""
+        return self._text
+    
+    @text.setter
+    def text(self, value):
+        self._resize(_sizeof(value) - _sizeof(self._text))
+        self._text = value
+        self.invalidate_fragments()
+    
+    @property
+    def id(self):
+        """元素ID"""
+        return self._id
+    
+    @id.setter
+    def id(self, value):
+        self._resize(_sizeof(value) - _sizeof(self._id))
+        self._id = value
+        self.invalidate_fragments()
+    
+    @property
+    def attributes(self):
+        """元素属性字典"""
+        return self._attributes
+    
+    @attributes.setter
+    def attributes(self, value):
+        self._resize(self.attributes_size(value) - self.attributes_size(self._attributes))
+        self._attributes = value
+        self.invalidate_fragments()
+    
+    def invalidate_fragments(self):
+        """使当前元素及其所有祖先的序列化片段缓存失效
+        
+        任何会改变元素输出的修改都必须调用此方法。元素自身的片段取决于
+        是否有子元素，因此沿祖先路径一起失效，
+        保存时只需重新生成从修改点到根节点路径上的片段。
+        own=True 保存的缓存只在元素自身修改时失效。
+        """
+        if self._own_cache:
+            self._own_cache.clear()
+        node = self
+        while node is not None:
+            if node._fragment_cache:
+                node._fragment_cache.clear()
+            node = node.parent
+    
+    def _resize(self, size, count=0):
+        """子树大小和元素数变化后，更新当前元素及其所有祖先的统计"""
+        if not size and not count:
+            return
+        node = self
+        while node is not None:
+            node._size_hint += size
+            node._count += count
+            node = node.parent
+    
+    def get_fragment(self, key, own=False):
+        """获取缓存的序列化片段，不存在时返回None"""
+        if own:
+            return self._own_cache.get(key) if self._own_cache else None
+        return self._fragment_cache.get(key)
+    
+    def child_fragments(self, key, default=None):
+        """按顺序获取所有子元素在key下缓存的片段，不存在的用default代替"""
+        return [child._fragment_cache.get(key, default) for child in self.children]
+    
+    def set_fragment(self, key, fragment, own=False):
+        """缓存序列化片段
+        
+        Args:
+            own: 片段只取决于元素自身的文本、ID和属性，修改后代时不失效
+        """
+        if own:
+            if self._own_cache is None:
+                self._own_cache = {}
+            self._own_cache[key] = fragment
+        else:
+            self._fragment_cache[key] = fragment
+    
     def add_child(self, child):
         """添加子元素，并处理父子关系"""
         # 检查是否试图添加元素自身
@@ -37,18 +131,39 @@ class HtmlElement:
         # 建立父子关系
         self.children.append(child)
         child.parent = self
+        self._resize(child._size_hint, child._count)
+        self.invalidate_fragments()
+    
+    def insert_child(self, index, child):
+        """在指定位置插入子元素，并处理父子关系"""
+        if child == self:
+            raise InvalidOperationError(f"不能将元素自身添加为子元素: {self.id}")
+        if child.is_ancestor_of(self):
+            raise InvalidOperationError(f"循环引用: 元素 {self.id} 已经是 {child.id} 的后代")
+        if child.parent:
+            child.parent.remove_child(child)
+        
+        self.children.insert(index, child)
+        child.parent = self
+        self._resize(child._size_hint, child._count)
+        self.invalidate_fragments()
         
     def remove_child(self, child):
         """移除子元素，解除父子关系"""
         if child in self.children:
             self.children.remove(child)
             child.parent = None
+            self._resize(-child._size_hint, -child._count)
+            self.invalidate_fragments()
             return True
         return False
         
     def set_attribute(self, name, value):
         """设置元素属性"""
+        old = self.attributes.get(name)
+        self._resize(_sizeof(value) - _sizeof(old) + (0 if name in self.attributes else _sizeof(name)))
         self.attributes[name] = value
+        self.invalidate_fragments()
         
     def get_attribute(self, name, default=None):
         """获取元素属性值，不存在时返回默认值"""
@@ -57,7 +172,9 @@ class HtmlElement:
     def remove_attribute(self, name):
         """移除元素属性"""
         if name in self.attributes:
+            self._resize(-_sizeof(name) - _sizeof(self.attributes[name]))
             del self.attributes[name]
+            self.invalidate_fragments()
             
     def has_attribute(self, name):
         """检查是否存在指定属性"""
@@ -86,6 +203,26 @@ class HtmlElement:
                 
         return new_element
         
+    # 单个元素对象、实例字典、子元素列表和属性字典的大致开销
+    ELEMENT_OVERHEAD = 512
+    
+    def size_hint(self) -> int:
+        """估算以当前元素为根的子树占用的内存字节数（只统计文本、ID和属性的字符串）
+        
+        统计由添加、移除子元素以及修改文本、ID和属性的方法随时更新，
+        因此估算任意大的子树（如删除时计入历史占用）都是O(1)的。
+        """
+        return self._size_hint
+    
+    def subtree_count(self) -> int:
+        """以当前元素为根的子树中的元素数，O(1)"""
+        return self._count
+    
+    @staticmethod
+    def attributes_size(attributes) -> int:
+        """属性字典中字符串的估算内存"""
+        return sum(_sizeof(name) + _sizeof(value) for name, value in attributes.items())
+        
     def is_ancestor_of(self, element):
         """检查当前元素是否是指定元素的祖先"""
         if element is None or element == self:
@@ -1,9 +1,32 @@
-from typing import Optional, Dict
+import weakref
+from typing import Optional, Dict, List
 from .element import HtmlElement
 from .exceptions import DuplicateIdError, ElementNotFoundError, IdCollisionError
+from .output import get_output
+
+class Tombstone:
+    """被删除的子树
+
+    子树整体从父元素上摘下，结构保持完整，其中元素的ID仍留在模型的
+    ID映射中，查找时才发现已失效并注销（displaced 记录这些被注销的ID，
+    恢复时重新注册）。撤销删除只需把子树插回原位置。
+    """
+    __slots__ = ('root', 'parent', 'index', 'generation', 'displaced', '_finalizer', '__weakref__')
+
+    def __init__(self, root: HtmlElement, parent: HtmlElement, index: int, generation: int):
+        self.root = root
+        self.parent = parent
+        self.index = index
+        self.generation = generation  # 删除时模型的代数
+        self.displaced: Dict[str, HtmlElement] = {}
+        self._finalizer = None
 
 class HtmlModel:
     """HTML文档模型"""
+
+    # 每次删除时顺带清理的已放弃子树中的元素数
+    SWEEP_STEP = 256
+
     def __init__(self):
         # 创建根元素
         self.root = HtmlElement('html', 'html')  # 修改ID为'html'
@@ -19,6 +42,110 @@ class HtmlModel:
             'head': head,
             'body': body
         }
+        self._reset_tombstones()
+        
+    def _reset_tombstones(self) -> None:
+        """清空删除子树的记录，ID映射被整体重建时调用"""
+        # 每次删除子树时递增；某个ID在当前代数下确认过仍在文档中，就不必再检查
+        self._generation = 0
+        self._verified: Dict[str, int] = {}
+        # 尚可撤销的删除: 子树根元素 -> Tombstone（删除命令被丢弃后自动移除）
+        self._tombstones = weakref.WeakValueDictionary()
+        # 删除命令被丢弃、不会再恢复的子树，等待逐步注销其中的ID
+        self._abandoned: List[HtmlElement] = []
+        self._sweep_stack: List[HtmlElement] = []
+        
+    def tombstone(self, element: HtmlElement) -> Tombstone:
+        """
+        从文档中删除元素及其子树，不遍历子树
+        
+        子树中的ID延迟注销：之后的查找会发现它们已不在文档中。
+        返回的 Tombstone 交给 revive() 即可恢复；调用方不再持有它时，
+        子树中残留的ID在之后的删除中分批清理。
+        """
+        parent = element.parent
+        index = parent.children.index(element)
+        parent.remove_child(element)
+        self._generation += 1
+        tombstone = Tombstone(element, parent, index, self._generation)
+        tombstone._finalizer = weakref.finalize(tombstone, HtmlModel._abandon, weakref.ref(self), element)
+        tombstone._finalizer.atexit = False
+        self._tombstones[element] = tombstone
+        self.sweep_tombstones(self.SWEEP_STEP)
+        return tombstone
+    
+    def revive(self, tombstone: Tombstone) -> None:
+        """把删除的子树插回原位置，并重新注册查找时已注销的ID"""
+        element = tombstone.root
+        tombstone._finalizer.detach()
+        self._tombstones.pop(element, None)
+        parent = tombstone.parent
+        parent.insert_child(min(tombstone.index, len(parent.children)), element)
+        for displaced in tombstone.displaced.values():
+            self._register_id(displaced)
+        tombstone.displaced.clear()
+    
+    @staticmethod
+    def _abandon(model_ref, element: HtmlElement) -> None:
+        model = model_ref()
+        if model is not None:
+            model._abandoned.append(element)
+    
+    def sweep_tombstones(self, limit: Optional[int] = None) -> int:
+        """
+        从ID映射中注销已放弃的删除子树里的ID
+        
+        Args:
+            limit: 最多检查的元素数，None表示全部清理
+            
+        Returns:
+            int: 注销的ID数
+        """
+        removed = checked = 0
+        stack = self._sweep_stack
+        while limit is None or checked < limit:
+            if not stack:
+                if not self._abandoned:
+                    break
+                root = self._abandoned.pop()
+                # 子树可能已被恢复后再次删除
+                if root.parent is not None or root in self._tombstones or root is self.root:
+                    continue
+                stack.append(root)
+            element = stack.pop()
+            checked += 1
+            if self._id_map.get(element.id) is element:
+                del self._id_map[element.id]
+                self._verified.pop(element.id, None)
+                removed += 1
+            stack.extend(element.children)
+        if not stack and not self._abandoned and not self._tombstones:
+            self._verified.clear()
+        return removed
+    
+    def _lookup(self, id: str) -> Optional[HtmlElement]:
+        """按ID查找仍在文档中的元素，遇到已删除子树中的元素时将其注销"""
+        element = self._id_map.get(id)
+        if element is None or not (self._tombstones or self._abandoned or self._sweep_stack):
+            return element
+        if self._verified.get(id) == self._generation:
+            return element
+        top = element
+        while top.parent is not None:
+            top = top.parent
+        if top is self.root:
+            self._verified[id] = self._generation
+            return element
+        del self._id_map[id]
+        self._verified.pop(id, None)
+        tombstone = self._tombstones.get(top)
+        if tombstone is not None:
+            tombstone.displaced[id] = element
+        return None
+    
+    def has_id(self, id: str) -> bool:
+        """文档中是否有该ID的元素"""
+        return self._lookup(id) is not None
         
     def find_by_id(self, id: str) -> HtmlElement:
         """
@@ -30,7 +157,7 @@ class HtmlModel:
         Raises:
             ElementNotFoundError: 当元素不存在时抛出
         """
-        element = self._id_map.get(id)
+        element = self._lookup(id)
         if element is None:
             # 恢复原始错误信息格式以匹配测试
             raise ElementNotFoundError(f"未找到ID为 '{id}' 的元素")
@@ -38,13 +165,13 @@ class HtmlModel:
         
     def _register_id(self, element: HtmlElement) -> None:
         """注册元素ID到映射表"""
-        if element.id in self._id_map:
+        if self.has_id(element.id):
             raise DuplicateIdError(f"ID '{element.id}' 已存在")
         self._id_map[element.id] = element
         
     def _unregister_id(self, element: HtmlElement) -> None:
         """从映射表中移除元素ID"""
-        if element.id in self._id_map:
+        if self._id_map.get(element.id) is element:
             del self._id_map[element.id]
             
     def insert_before(self, target_id: str, new_element: HtmlElement) -> bool:
@@ -63,11 +190,9 @@ class HtmlModel:
             index = parent.children.index(target)
 
             # 设置父子关系
-            new_element.parent = parent
-            parent.children.insert(index, new_element)
+            parent.insert_child(index, new_element)
 
-            # 调试输出
-            print(f"Inserted element '{new_element.id}' with parent '{new_element.parent.id}'")
+            get_output().debug("Inserted element '%s' with parent '%s'", new_element.id, parent.id)
 
             return True
 
@@ -81,7 +206,7 @@ class HtmlModel:
         if element.id in self._id_map:
             self._unregister_id(element)
         if element in parent.children:
-            parent.children.remove(element)
+            parent.remove_child(element)
         element.parent = None
             
     def _register_subtree_ids(self, root: HtmlElement) -> None:
@@ -136,7 +261,7 @@ class HtmlModel:
         try:
             return element.parent.remove_child(element)
         except Exception as e:
-            print(f"删除元素时发生错误: {str(e)}")
+            get_output().error("删除元素时发生错误: %s", e)
             return False
             
     def _unregister_subtree_ids(self, root: HtmlElement) -> None:
@@ -155,6 +280,7 @@ class HtmlModel:
         """替换整个文档内容"""
         # 清除旧的ID映射
         self._id_map.clear()
+        self._reset_tombstones()
         
         # 替换根元素
         self.root = new_root
@@ -182,11 +308,11 @@ class HtmlModel:
             return
         
         # 检查旧ID是否存在 - 修正属性名称 _elements_by_id -> _id_map
-        if old_id not in self._id_map:
+        if not self.has_id(old_id):
             raise ElementNotFoundError(f"元素 '{old_id}' 不存在")
         
         # 检查新ID是否已存在
-        if new_id in self._id_map:
+        if self.has_id(new_id):
             raise IdCollisionError(new_id)
         
         # 获取元素并更新索引
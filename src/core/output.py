@@ -0,0 +1,179 @@
+"""
+输出目标(OutputSink)
+
+命令、模型和命令处理器通过输出目标报告执行信息，而不是直接print。
+每条消息带有级别，低于输出目标级别的消息在格式化之前就被丢弃：
+消息使用 %-风格的参数延迟格式化，NullSink 下调用几乎没有开销。
+
+    output.debug("找到元素：%s", element)   # element 只在需要输出时才转为字符串
+
+未注入输出目标的对象使用全局输出(get_output())，默认为INFO级别的控制台输出。
+"""
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, TextIO, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+SILENT = 100  # 高于所有级别，不输出任何消息
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+
+def parse_level(value) -> int:
+    """将级别名(debug/info/warning/error/silent)或数字转换为级别"""
+    if isinstance(value, int):
+        return value
+    names = {name: level for level, name in LEVEL_NAMES.items()}
+    names['silent'] = SILENT
+    try:
+        return names[str(value).lower()]
+    except KeyError:
+        raise ValueError(f"无效的输出级别: {value}") from None
+
+class OutputSink:
+    """输出目标基类，子类实现 emit"""
+
+    def __init__(self, level: int = INFO):
+        self.level = parse_level(level)
+
+    def enabled(self, level: int) -> bool:
+        """该级别的消息是否会被输出，可用于跳过昂贵的消息构造"""
+        return level >= self.level
+
+    def log(self, level: int, message: str, *args) -> None:
+        if level >= self.level:
+            self.emit(level, message % args if args else message)
+
+    def debug(self, message: str, *args) -> None:
+        self.log(DEBUG, message, *args)
+
+    def info(self, message: str, *args) -> None:
+        self.log(INFO, message, *args)
+
+    def warning(self, message: str, *args) -> None:
+        self.log(WARNING, message, *args)
+
+    def error(self, message: str, *args) -> None:
+        self.log(ERROR, message, *args)
+
+    def emit(self, level: int, message: str) -> None:
+        """输出一条已格式化的消息"""
+        raise NotImplementedError
+
+class ConsoleSink(OutputSink):
+    """输出到控制台，与原先的print行为一致"""
+
+    def __init__(self, level: int = INFO, stream: Optional[TextIO] = None):
+        """
+        Args:
+            level: 最低输出级别
+            stream: 输出流，None表示每次输出时使用当前的sys.stdout
+        """
+        super().__init__(level)
+        self.stream = stream
+
+    def emit(self, level, message):
+        if self.stream is None:
+            print(message)
+        else:
+            print(message, file=self.stream)
+
+class NullSink(OutputSink):
+    """丢弃所有消息"""
+
+    def __init__(self):
+        super().__init__(SILENT)
+
+    def enabled(self, level):
+        return False
+
+    # 直接覆盖各级别方法，跳过级别比较和格式化
+    def log(self, level, message, *args):
+        pass
+
+    def debug(self, message, *args):
+        pass
+
+    def info(self, message, *args):
+        pass
+
+    def warning(self, message, *args):
+        pass
+
+    def error(self, message, *args):
+        pass
+
+    def emit(self, level, message):
+        pass
+
+class BufferedSink(OutputSink):
+    """将消息缓存在内存中，之后统一检查或转发"""
+
+    def __init__(self, level: int = DEBUG):
+        super().__init__(level)
+        self.records: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def emit(self, level, message):
+        with self._lock:
+            self.records.append((level, message))
+
+    @property
+    def messages(self) -> List[str]:
+        return [message for _, message in self.records]
+
+    def getvalue(self) -> str:
+        return "".join(message + "\n" for message in self.messages)
+
+    def flush_to(self, sink: OutputSink) -> None:
+        """把缓存的消息转发到另一个输出目标并清空缓存"""
+        with self._lock:
+            records, self.records = self.records, []
+        for level, message in records:
+            if sink.enabled(level):
+                sink.emit(level, message)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records = []
+
+class JsonSink(OutputSink):
+    """每条消息输出一行JSON，便于机器处理"""
+
+    def __init__(self, level: int = INFO, stream: Optional[TextIO] = None):
+        super().__init__(level)
+        self.stream = stream
+
+    def emit(self, level, message):
+        entry = {"time": round(time.time(), 6),
+                 "level": LEVEL_NAMES.get(level, str(level)),
+                 "message": message}
+        print(json.dumps(entry, ensure_ascii=False), file=self.stream or sys.stdout)
+
+NULL_OUTPUT = NullSink()
+
+_output: OutputSink = ConsoleSink()
+
+def get_output() -> OutputSink:
+    """返回全局输出目标"""
+    return _output
+
+def set_output(sink: OutputSink) -> OutputSink:
+    """替换全局输出目标，返回原来的输出目标"""
+    global _output
+    previous, _output = _output, sink
+    return previous
+
+@contextmanager
+def use_output(sink: OutputSink):
+    """在上下文中临时替换全局输出目标"""
+    previous = set_output(sink)
+    try:
+        yield sink
+    finally:
+        set_output(previous)
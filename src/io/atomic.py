@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+
+# 保留上一版本文件时使用的后缀
+BACKUP_SUFFIX = '.bak'
+
+def _read_umask():
+    # os.umask只能通过设置来读取，而且作用于整个进程，只在导入时读取一次，
+    # 避免与自动保存线程等并发创建文件的代码产生竞争
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+_UMASK = _read_umask()
+
+def atomic_write(file_path, content, encoding='utf-8', fsync=False, keep_backup=False, mode=None):
+    """
+    以原子方式写入文件
+
+    先写入同目录下的临时文件，再通过os.replace替换目标文件。
+    写入过程中崩溃只会留下临时文件，目标文件要么是旧版本，要么是完整的新版本。
+
+    Args:
+        file_path: 目标文件路径
+        content: 要写入的内容，str按encoding编码，bytes原样写入
+        encoding: 文本编码
+        fsync: 是否在替换前将数据刷新到磁盘
+        keep_backup: 是否保留上一版本为 <file_path>.bak
+        mode: 写入后文件的权限位，None表示沿用目标文件的权限（新文件按umask）
+
+    Raises:
+        OSError: 当写入或替换失败时
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    data = content.encode(encoding) if isinstance(content, str) else content
+    fd, temp_path = tempfile.mkstemp(dir=directory,
+                                     prefix=f".{os.path.basename(file_path)}.",
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        if mode is None:
+            _copy_permissions(file_path, temp_path)
+        else:
+            os.chmod(temp_path, mode)
+
+        if keep_backup and os.path.exists(file_path):
+            _retain_previous_version(file_path)
+
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+
+def _copy_permissions(file_path, temp_path):
+    """让临时文件沿用目标文件的权限，新文件则使用umask默认权限"""
+    if os.path.exists(file_path):
+        shutil.copymode(file_path, temp_path)
+    else:
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+
+def _retain_previous_version(file_path):
+    """将当前版本保留为备份文件，优先使用硬链接避免复制大文件"""
+    backup_path = file_path + BACKUP_SUFFIX
+    try:
+        link_path = backup_path + '.tmp'
+        if os.path.exists(link_path):
+            os.remove(link_path)
+        os.link(file_path, link_path)
+        os.replace(link_path, backup_path)
+    except OSError:
+        # 文件系统不支持硬链接时退化为复制
+        shutil.copy2(file_path, backup_path)
+
+def _fsync_directory(directory):
+    """刷新目录项，确保重命名本身也已落盘"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
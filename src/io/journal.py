@@ -0,0 +1,176 @@
+import json
+import os
+
+from .atomic import atomic_write
+
+class EditJournal:
+    """追加写入的编辑日志
+
+    日志是HTML文件旁的 <file>.journal，每行一条JSON记录。
+    第一行是头部，记录日志所基于的HTML文件的签名（大小和修改时间），
+    之后每行是一条命令记录（见 Command.to_record）。
+    打开文件时，只有签名与当前HTML文件一致的日志才会被重放，
+    避免在已经合并过的HTML上重复应用同一批修改。
+    """
+
+    SUFFIX = '.journal'
+
+    def __init__(self, html_path, fsync=False):
+        """
+        初始化编辑日志
+
+        Args:
+            html_path: 日志所属的HTML文件路径
+            fsync: 每条记录写入后是否刷新到磁盘
+        """
+        self.html_path = html_path
+        self.path = html_path + self.SUFFIX
+        self.fsync = fsync
+        self.needs_compaction = False  # 出现了无法记录的命令，需要尽快合并
+        self._file = None
+        # 从日志基准开始重放时可撤销/可重做的命令数
+        self._undo_depth = 0
+        self._redo_depth = 0
+
+    @staticmethod
+    def base_signature(html_path):
+        """返回HTML文件的签名，文件不存在时返回None"""
+        try:
+            stat = os.stat(html_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def exists(self):
+        """日志文件是否存在"""
+        return os.path.exists(self.path)
+
+    def read_records(self):
+        """
+        读取日志中的命令记录
+
+        Returns:
+            list: 记录列表；日志不存在时返回空列表，
+                  日志与当前HTML文件不匹配或已损坏时返回None
+        """
+        if not self.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return None
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return None
+        if header.get('base') != self.base_signature(self.html_path):
+            return None
+
+        records = []
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # 最后一行可能在崩溃时只写了一半，之前的记录仍然有效
+                break
+        return records
+
+    def open(self):
+        """打开日志准备追加；日志与当前HTML文件不匹配时重新开始"""
+        if self._file:
+            return
+        records = self.read_records()
+        if records is None or not self.exists():
+            self.reset()
+        else:
+            self._track_all(records)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _track(self, record):
+        """
+        更新重放时的撤销/重做深度
+
+        Returns:
+            bool: 记录能否从日志基准重放（撤销的命令是否在日志中）
+        """
+        if record[0] == 'undo':
+            if not self._undo_depth:
+                return False
+            self._undo_depth -= 1
+            self._redo_depth += 1
+        elif record[0] == 'redo':
+            if not self._redo_depth:
+                return False
+            self._redo_depth -= 1
+            self._undo_depth += 1
+        elif record[0] == 'coalesce':
+            # 合并进上一条记录，上一条必须也在日志中
+            if not self._undo_depth:
+                return False
+            self._redo_depth = 0
+        else:
+            self._undo_depth += 1
+            self._redo_depth = 0
+        return True
+
+    def _track_all(self, records):
+        """从头计算已有记录的撤销/重做深度"""
+        self._undo_depth = self._redo_depth = 0
+        for record in records:
+            if not self._track(record):
+                self.needs_compaction = True
+
+    def append(self, record):
+        """追加一条记录；撤销了合并前的命令时不写入，而是要求合并"""
+        if not self._file:
+            self.open()
+        if not self._track(record):
+            self.needs_compaction = True
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def size(self):
+        """日志当前的字节数"""
+        if self._file:
+            return os.fstat(self._file.fileno()).st_size
+        return os.path.getsize(self.path) if self.exists() else 0
+
+    def reset(self, keep_from=None):
+        """
+        在HTML文件合并后重写日志头部
+
+        Args:
+            keep_from: 保留从该字节偏移开始的记录（合并开始后才追加的记录），
+                       None表示清空所有记录
+        """
+        tail = ''
+        if keep_from is not None and self.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                f.seek(keep_from)
+                tail = f.read()
+
+        reopen = self._file is not None
+        self.close()
+        header = json.dumps({'base': self.base_signature(self.html_path)})
+        atomic_write(self.path, header + '\n' + tail, fsync=self.fsync)
+        self.needs_compaction = False
+        self._track_all(json.loads(line) for line in tail.splitlines() if line)
+        if reopen:
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        """关闭日志文件"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """关闭并删除日志文件"""
+        self.close()
+        if self.exists():
+            os.remove(self.path)
@@ -20,6 +20,9 @@ class HtmlParser:
             html_content: HTML字符串内容
             model: 要填充的HTML模型
         """
+        # ID映射将被重建，之前删除的子树不再可恢复
+        model._reset_tombstones()
+        
         # 检查内容是否为空 - 只在非测试环境中执行
         if not html_content or html_content.strip() == "":
             # 为测试创建一个基本结构，而不是引发错误
@@ -177,7 +180,7 @@ class HtmlParser:
                 # 如果属性值是列表，转换为字符串 (通常是 'class' 属性)
                 if isinstance(attr_value, list):
                     attr_value = ' '.join(attr_value)
-                element.attributes[attr_name] = attr_value
+                element.set_attribute(attr_name, attr_value)
         
         # 处理文本内容
         text_content = ""
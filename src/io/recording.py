@@ -0,0 +1,117 @@
+import base64
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.io.snapshot import encode_snapshot
+
+class SessionRecorder:
+    """会话录制文件
+
+    录制命令处理器执行的每个操作，用作可重现的性能测试负载。
+    文件每行一条JSON：第一行是头部（版本、录制时间，以及可选的起始文档
+    二进制快照），之后每行是一个操作:
+
+        {"t": 距开始的秒数, "op": 操作名, "record": 命令记录, "elapsed": 耗时秒数, "ok": 是否成功}
+
+    record 与编辑日志的记录格式相同（见 Command.to_record），另外还有
+    ["begin"]、["commit"]、["rollback"]；无法序列化的命令（显示、保存等）
+    record 为 null，只保留名称和耗时，重放时跳过。
+    """
+
+    VERSION = 1
+    SUFFIX = '.replay'
+
+    def __init__(self, path: str, model=None):
+        """
+        创建录制文件
+
+        Args:
+            path: 录制文件路径，已存在时被覆盖
+            model: 起始文档，提供时在头部保存其快照，重放时不需要原始文件
+        """
+        self.path = path
+        self.count = 0  # 已录制的操作数
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        header = {"version": self.VERSION, "created": time.time(), "snapshot": None}
+        if model is not None:
+            header["snapshot"] = base64.b64encode(encode_snapshot(model.root)).decode('ascii')
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(header) + '\n')
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def record(self, record: Optional[list], elapsed: float, ok, command=None) -> None:
+        """
+        追加一个操作
+
+        Args:
+            record: 命令记录，None表示命令无法重放
+            elapsed: 操作耗时（秒）
+            ok: 操作是否成功
+            command: 命令对象，record为None时用于记录命令名称
+        """
+        entry = {
+            "t": round(time.perf_counter() - self._started, 6),
+            "op": operation_name(record, command),
+            "record": record,
+            "elapsed": elapsed,
+            "ok": bool(ok),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self.count += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def operation_name(record: Optional[list], command=None) -> str:
+    """操作的类型名，用于按类型统计延迟；合并进上一条记录的命令按原命令名统计"""
+    if record:
+        if record[0] == 'coalesce' and len(record) > 1:
+            return record[1]
+        return record[0]
+    if command is not None:
+        return type(command).__name__
+    return 'unknown'
+
+def read_recording(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    读取录制文件
+
+    Returns:
+        (头部, 操作列表)
+
+    Raises:
+        ValueError: 文件不是有效的录制文件
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    try:
+        header = json.loads(lines[0])
+        entries = [json.loads(line) for line in lines[1:] if line.strip()]
+    except (IndexError, json.JSONDecodeError) as e:
+        raise ValueError(f"无效的录制文件: {path}") from e
+    if not isinstance(header, dict) or header.get("version") != SessionRecorder.VERSION:
+        raise ValueError(f"不支持的录制文件版本: {path}")
+    return header, entries
+
+def recording_snapshot(header: Dict[str, Any]) -> Optional[bytes]:
+    """返回头部中保存的起始文档快照"""
+    snapshot = header.get("snapshot")
+    return base64.b64decode(snapshot) if snapshot else None
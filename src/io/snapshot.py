@@ -0,0 +1,220 @@
+"""
+HtmlModel的紧凑二进制快照格式
+
+文件布局（整数均为小端序）:
+    头部      magic(4s) version(H) reserved(H) 字符串数(I) 标签数(I) 节点数(I)
+    字符串表  每项为 长度(I) + UTF-8字节
+    标签表    每项为 字符串表索引(I)
+    节点记录  按先序排列，每项为
+              标签表索引(I) ID字符串索引(I) 文本字符串索引(I)
+              父节点序号(i) 子节点数(I) 属性数(I)
+              之后紧跟 属性数 个 (名称索引(I), 值索引(I))
+
+索引为NO_STRING表示空值。加载时通过mmap直接读取记录构建元素树，无需解析HTML。
+"""
+import mmap
+import os
+import struct
+
+from src.core.element import HtmlElement
+from .atomic import atomic_write
+
+MAGIC = b'HTMS'
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<4sHHIII')
+_LENGTH = struct.Struct('<I')
+_NODE = struct.Struct('<IIIiII')
+_ATTRIBUTE = struct.Struct('<II')
+
+class SnapshotFormatError(ValueError):
+    """快照文件格式无效"""
+    pass
+
+def encode_snapshot(root):
+    """
+    将元素树编码为二进制快照
+
+    Args:
+        root: 根元素
+
+    Returns:
+        bytes: 快照数据
+    """
+    strings = []
+    string_index = {}
+    tags = []
+    tag_index = {}
+
+    def intern(value):
+        if value is None or value == '':
+            return NO_STRING
+        value = str(value)
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    records = []
+    node_count = 0
+    # 先序遍历，栈中保存(元素, 父节点序号)
+    stack = [(root, -1)]
+    while stack:
+        element, parent = stack.pop()
+        tag = tag_index.get(element.tag)
+        if tag is None:
+            tag = tag_index[element.tag] = len(tags)
+            tags.append(intern(element.tag))
+        records.append(_NODE.pack(tag, intern(element.id), intern(element.text),
+                                  parent, len(element.children), len(element.attributes)))
+        for name, value in element.attributes.items():
+            records.append(_ATTRIBUTE.pack(intern(name), intern(value)))
+        for child in reversed(element.children):
+            stack.append((child, node_count))
+        node_count += 1
+
+    parts = [_HEADER.pack(MAGIC, VERSION, 0, len(strings), len(tags), node_count)]
+    for value in strings:
+        data = value.encode('utf-8')
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    parts.extend(_LENGTH.pack(index) for index in tags)
+    parts.extend(records)
+    return b''.join(parts)
+
+def decode_snapshot(buffer):
+    """
+    从二进制快照重建元素树
+
+    Args:
+        buffer: 快照数据（bytes或mmap）
+
+    Returns:
+        HtmlElement: 根元素
+
+    Raises:
+        SnapshotFormatError: 当数据不是有效的快照时
+    """
+    try:
+        magic, version, _, string_count, tag_count, node_count = _HEADER.unpack_from(buffer, 0)
+    except struct.error as e:
+        raise SnapshotFormatError(f"快照文件过短: {e}") from e
+    if magic != MAGIC:
+        raise SnapshotFormatError("不是HTML模型快照文件")
+    if version != VERSION:
+        raise SnapshotFormatError(f"不支持的快照版本: {version}")
+    if node_count == 0:
+        raise SnapshotFormatError("快照中没有元素")
+
+    try:
+        offset = _HEADER.size
+        strings = []
+        for _ in range(string_count):
+            (length,) = _LENGTH.unpack_from(buffer, offset)
+            offset += _LENGTH.size
+            strings.append(str(buffer[offset:offset + length], 'utf-8'))
+            offset += length
+
+        tags = []
+        for _ in range(tag_count):
+            (index,) = _LENGTH.unpack_from(buffer, offset)
+            tags.append(strings[index])
+            offset += _LENGTH.size
+
+        def lookup(index, default):
+            return default if index == NO_STRING else strings[index]
+
+        elements = []
+        for _ in range(node_count):
+            tag, id_index, text_index, parent, _, attr_count = _NODE.unpack_from(buffer, offset)
+            offset += _NODE.size
+
+            element = HtmlElement(tags[tag], lookup(id_index, ''))
+            element.text = lookup(text_index, '')
+            if attr_count:
+                attributes = element.attributes
+                for _ in range(attr_count):
+                    name, value = _ATTRIBUTE.unpack_from(buffer, offset)
+                    attributes[strings[name]] = lookup(value, '')
+                    offset += _ATTRIBUTE.size
+                element._size_hint += HtmlElement.attributes_size(attributes)
+
+            # 先序排列保证父节点已经创建，直接追加即可保持子元素顺序
+            if parent >= 0:
+                parent_element = elements[parent]
+                element.parent = parent_element
+                parent_element.children.append(element)
+            elements.append(element)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SnapshotFormatError(f"快照文件已损坏: {e}") from e
+
+    # 子元素直接追加，没有经过add_child，按逆先序（后代先于祖先）补上子树的统计
+    for element in reversed(elements):
+        parent_element = element.parent
+        if parent_element is not None:
+            parent_element._size_hint += element._size_hint
+            parent_element._count += element._count
+
+    return elements[0]
+
+def save_snapshot(model, file_path):
+    """
+    将模型保存为二进制快照文件（原子写入）
+
+    Returns:
+        int: 写入的字节数
+    """
+    data = encode_snapshot(model.root)
+    atomic_write(file_path, data)
+    return len(data)
+
+def load_snapshot(file_path, model):
+    """
+    通过mmap读取快照文件并替换模型内容
+
+    Args:
+        file_path: 快照文件路径
+        model: 要填充的HTML模型
+
+    Returns:
+        HtmlElement: 新的根元素
+
+    Raises:
+        FileNotFoundError: 当文件不存在时
+        SnapshotFormatError: 当文件不是有效的快照时
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"文件不存在: {file_path}")
+    if os.path.getsize(file_path) == 0:
+        raise SnapshotFormatError("快照文件为空")
+
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return restore_snapshot(buffer, model)
+
+def restore_snapshot(buffer, model):
+    """
+    用快照数据替换模型内容并重建ID索引
+
+    Args:
+        buffer: 快照数据（bytes或mmap）
+        model: 要填充的HTML模型
+
+    Returns:
+        HtmlElement: 新的根元素
+    """
+    root = decode_snapshot(buffer)
+
+    # 与HtmlParser一致: 重复ID以先出现的元素为准
+    model.root = root
+    model._id_map.clear()
+    model._reset_tombstones()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if element.id and element.id not in model._id_map:
+            model._id_map[element.id] = element
+        stack.extend(reversed(element.children))
+    return root
@@ -0,0 +1,107 @@
+import tempfile
+import threading
+
+class SpillFile:
+    """追加写入的临时数据文件，用于把不常用的数据从内存换出到磁盘
+
+    数据写入后返回一个编号作为引用，之后可按引用读回；不再需要的数据
+    用 discard() 丢弃。被丢弃的字节超过仍在使用的字节（且至少为
+    compact_bytes）时，把仍在使用的数据复制到新的临时文件并替换旧文件，
+    引用保持不变，文件大小始终不超过使用中数据的大约两倍。
+    文件是匿名临时文件，关闭或进程退出时自动删除。
+    """
+
+    DEFAULT_COMPACT_BYTES = 1024 * 1024
+
+    def __init__(self, directory=None, compact_bytes: int = DEFAULT_COMPACT_BYTES):
+        """
+        初始化换出文件
+
+        Args:
+            directory: 临时文件所在目录，None使用系统临时目录
+            compact_bytes: 被丢弃的字节至少达到多少才压缩文件
+        """
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self._file = None
+        self._lock = threading.Lock()
+        self._entries = {}  # 引用编号 -> (偏移, 长度)
+        self._next_ref = 0
+        self.size = 0  # 文件的字节数
+        self.live = 0  # 仍在使用的字节数
+        self.compactions = 0
+
+    def _open(self):
+        return tempfile.TemporaryFile(prefix='htmledit-', suffix='.spill', dir=self.directory)
+
+    def put(self, data: bytes) -> int:
+        """写入数据，返回读回时使用的引用"""
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            offset = self.size
+            self._file.seek(offset)
+            self._file.write(data)
+            self.size += len(data)
+            self.live += len(data)
+            ref = self._next_ref
+            self._next_ref += 1
+            self._entries[ref] = (offset, len(data))
+            return ref
+
+    def get(self, ref: int) -> bytes:
+        """按引用读回数据"""
+        with self._lock:
+            offset, length = self._entries[ref]
+            self._file.flush()
+            self._file.seek(offset)
+            data = self._file.read(length)
+        if len(data) != length:
+            raise IOError(f"换出文件已损坏: 偏移 {offset} 处只读到 {len(data)}/{length} 字节")
+        return data
+
+    def discard(self, ref: int) -> None:
+        """丢弃不再需要的数据，丢弃的字节过多时压缩文件"""
+        with self._lock:
+            entry = self._entries.pop(ref, None)
+            if entry is None:
+                return
+            self.live -= entry[1]
+            dropped = self.size - self.live
+            if dropped > self.live and dropped >= self.compact_bytes:
+                self._compact()
+
+    def _compact(self) -> None:
+        """把仍在使用的数据按原顺序复制到新文件，更新各引用的偏移"""
+        self._file.flush()
+        compacted = self._open()
+        offset = 0
+        for ref, (old_offset, length) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            self._file.seek(old_offset)
+            compacted.write(self._file.read(length))
+            self._entries[ref] = (offset, length)
+            offset += length
+        self._file.close()
+        self._file = compacted
+        self.size = offset
+        self.compactions += 1
+
+    def reset(self):
+        """丢弃所有数据"""
+        with self._lock:
+            if self._file is not None:
+                self._file.seek(0)
+                self._file.truncate()
+            self._entries.clear()
+            self.size = 0
+            self.live = 0
+
+    def close(self):
+        """关闭并删除临时文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._entries.clear()
+            self.size = 0
+            self.live = 0
@@ -1,10 +1,62 @@
+import gzip
 import html
 import os
+import re
+import time
+from src.core.element import HtmlElement
+from .atomic import atomic_write
+
+# 压缩模式下可以省略结束标签的元素:
+# 标签 -> (允许省略时紧随其后的兄弟元素标签集合, 作为最后一个子元素时是否可以省略)
+# 集合为None表示无论后面是什么都可以省略
+OPTIONAL_END_TAGS = {
+    'html': (None, True),
+    'head': (None, True),
+    'body': (None, True),
+    'li': ({'li'}, True),
+    'dt': ({'dt', 'dd'}, False),
+    'dd': ({'dt', 'dd'}, True),
+    'p': ({'address', 'article', 'aside', 'blockquote', 'details', 'div', 'dl',
+           'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+           'h4', 'h5', 'h6', 'header', 'hgroup', 'hr', 'main', 'menu', 'nav', 'ol',
+           'p', 'pre', 'section', 'table', 'ul'}, True),
+    'option': ({'option', 'optgroup'}, True),
+    'thead': ({'tbody', 'tfoot'}, False),
+    'tbody': ({'tbody', 'tfoot'}, True),
+    'tr': ({'tr'}, True),
+    'td': ({'td', 'th'}, True),
+    'th': ({'td', 'th'}, True),
+}
+
+# 作为这些元素的最后一个子元素时，<p>的结束标签不能省略
+P_END_TAG_REQUIRED_PARENTS = {'a', 'audio', 'del', 'ins', 'map', 'noscript', 'video'}
+
+# 压缩模式下保留原始空白的元素
+WHITESPACE_PRESERVING_TAGS = {'pre', 'textarea', 'script', 'style'}
+
+VOID_ELEMENTS = ['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'param', 'source', 'track', 'wbr']
+
+_WHITESPACE_RE = re.compile(r'\s+')
 
 class HtmlWriter:
     """HTML写入器，负责将HTML模型写入文件"""
     
-    def generate_html(self, model, include_doctype=False, pretty=True):
+    def __init__(self, use_cache=True, workers=None):
+        """
+        初始化HTML写入器
+        
+        Args:
+            use_cache: 是否复用元素上缓存的子树片段
+            workers: 并行序列化使用的进程数，None或1表示在当前进程中串行序列化
+        """
+        self.use_cache = use_cache
+        self.workers = workers
+        self._prerendered = {}  # 并行预先生成的片段: id(元素) -> 片段
+        self.last_output_size = None  # 最近一次写入的文件字节数
+        self.last_elapsed = None  # 最近一次写入耗时（秒）
+    
+    def generate_html(self, model, include_doctype=False, pretty=True, minify=False):
         """
         从模型生成HTML字符串
         
@@ -12,24 +64,107 @@ class HtmlWriter:
             model: HTML模型
             include_doctype: 是否包含DOCTYPE声明
             pretty: 是否格式化输出
+            minify: 是否压缩输出（折叠空白、省略自动生成的ID和可选结束标签），
+                    为True时忽略pretty
             
         Returns:
             str: 生成的HTML字符串
         """
+        output, separator = self._collect_html(model, include_doctype, pretty, minify)
+        return separator.join(output)
+    
+    def _collect_html(self, model, include_doctype, pretty, minify):
+        """生成HTML片段列表，返回(片段列表, 连接符)"""
         output = []
         
         # 添加DOCTYPE声明
         if include_doctype:
             output.append('<!DOCTYPE html>')
         
-        # 生成HTML元素树
-        indent = 0
-        self._generate_element_html(model.root, output, pretty, indent)
+        try:
+            if self.workers and self.workers > 1:
+                self._prerender_body_children(model, pretty, minify)
+            
+            if minify:
+                self._generate_minified_html(model.root, output, False)
+                output.append(self._minified_end_tag(model.root, None))
+                return output, ''
+            
+            # 生成HTML元素树
+            indent = 0
+            self._generate_element_html(model.root, output, pretty, indent)
+            
+            return output, '\n' if pretty else ''
+        finally:
+            self._prerendered.clear()
+    
+    def _prerender_body_children(self, model, pretty, minify):
+        """在进程池中并行生成body各个直接子元素（分区）的完整片段
+        
+        每个工作进程为每个分区返回一个拼接好的字符串，写入_prerendered，
+        随后的串行遍历直接拼接这些字符串，不再遍历分区内的元素。
+        启用缓存时分区字符串缓存在分区根元素上（只有这一层，内存与文档大小相当），
+        分区内任何修改都会使其失效，下次只重新生成修改过的分区。
+        
+        支持fork的平台上工作进程直接继承文档，只传递分区的序号；
+        否则把子树转换为嵌套元组的紧凑形式发送给工作进程。
+        """
+        body = next((child for child in model.root.children if child.tag == 'body'), None)
+        if body is None:
+            return
+        
+        depth = len(body.get_parent_chain()) + 1
+        cache_key = ('partition', 'minify') if minify else ('partition', pretty, depth)
+        pending = []
+        for child in body.children:
+            fragment = child.get_fragment(cache_key) if self.use_cache else None
+            if fragment is not None:
+                self._prerendered[id(child)] = fragment
+            else:
+                pending.append(child)
+        if len(pending) < 2:
+            return
         
-        # 合并并返回
-        return '\n'.join(output) if pretty else ''.join(output)
+        # 按子树元素数把分区按顺序分成大小相近的若干批次，每批由一个工作进程生成
+        total = sum(child.subtree_count() for child in pending)
+        target = max(1, total // (self.workers * 4))
+        bounds, current = [0], 0
+        for index, child in enumerate(pending, 1):
+            current += child.subtree_count()
+            if current >= target:
+                bounds.append(index)
+                current = 0
+        if bounds[-1] != len(pending):
+            bounds.append(len(pending))
+        count = len(bounds) - 1
+        
+        # 进程池只在并行序列化时才需要，延迟导入以加快启动
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        global _fork_partitions
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            _fork_partitions = pending
+            tasks = [(bounds[i], bounds[i + 1], pretty, depth, minify) for i in range(count)]
+            render = _render_fork_batch
+        else:
+            context = None
+            tasks = [([_to_compact(child) for child in pending[bounds[i]:bounds[i + 1]]],
+                      pretty, depth, minify) for i in range(count)]
+            render = _render_compact_batch
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                for i, fragments in enumerate(executor.map(render, tasks)):
+                    for element, fragment in zip(pending[bounds[i]:bounds[i + 1]], fragments):
+                        self._prerendered[id(element)] = fragment
+                        if self.use_cache:
+                            element.set_fragment(cache_key, fragment)
+        finally:
+            _fork_partitions = None
     
-    def write_to_file(self, model, file_path, include_doctype=True, pretty=True):
+    def write_to_file(self, model, file_path, include_doctype=True, pretty=True,
+                      atomic=False, fsync=False, keep_backup=False,
+                      minify=False, compress=None):
         """
         将HTML模型写入文件
         
@@ -38,6 +173,11 @@ class HtmlWriter:
             file_path: 输出文件路径
             include_doctype: 是否包含DOCTYPE声明
             pretty: 是否格式化输出
+            atomic: 是否先写临时文件再替换目标文件
+            fsync: 原子写入时是否刷新到磁盘
+            keep_backup: 原子写入时是否保留上一版本为 <file_path>.bak
+            minify: 是否压缩输出
+            compress: 是否通过gzip写入，None表示根据 .gz 后缀自动判断
             
         Returns:
             bool: 成功写入返回True，否则返回False
@@ -45,18 +185,33 @@ class HtmlWriter:
         Raises:
             OSError: 当写入失败时
         """
+        if compress is None:
+            compress = file_path.endswith('.gz')
+        start = time.perf_counter()
         try:
-            html_content = self.generate_html(model, include_doctype, pretty)
+            output, separator = self._collect_html(model, include_doctype, pretty, minify)
             
-            # 确保目录存在
-            dirname = os.path.dirname(file_path)
-            if dirname and not os.path.exists(dirname):
-                os.makedirs(dirname)
-            
-            # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if atomic:
+                data = separator.join(output).encode('utf-8')
+                if compress:
+                    data = gzip.compress(data)
+                atomic_write(file_path, data, fsync=fsync, keep_backup=keep_backup)
+            else:
+                # 确保目录存在
+                dirname = os.path.dirname(file_path)
+                if dirname and not os.path.exists(dirname):
+                    os.makedirs(dirname)
+                
+                # 写入文件，压缩时逐个片段流式写入gzip
+                if compress:
+                    with gzip.open(file_path, 'wt', encoding='utf-8') as f:
+                        self._write_fragments(f, output, separator)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(separator.join(output))
             
+            self.last_output_size = os.path.getsize(file_path)
+            self.last_elapsed = time.perf_counter() - start
             return True
         except (IOError, FileNotFoundError, PermissionError) as e:
             # 明确抛出OSError以匹配测试预期
@@ -68,56 +223,202 @@ class HtmlWriter:
     # Alias for backward compatibility
     write_file = write_to_file
     
+    @staticmethod
+    def _write_fragments(f, output, separator):
+        """逐个写入片段，避免拼接出完整的文档字符串"""
+        for i, fragment in enumerate(output):
+            if i and separator:
+                f.write(separator)
+            f.write(fragment)
+    
     def _generate_element_html(self, element, output, pretty, depth):
-        """递归生成元素的HTML"""
+        """递归生成元素的HTML，未修改的元素直接复用缓存的开始标签、文本和结束标签
+        
+        每个元素只缓存自身的片段，不缓存整个子树拼接后的字符串，
+        所有片段收集到同一个列表中，最后只拼接一次。
+        """
+        if self._prerendered:
+            fragment = self._prerendered.get(id(element))
+            if fragment is not None:
+                output.append(fragment)
+                return
+        head, tail = self._element_pieces(element, pretty, depth)
+        output.extend(head)
+        if tail is None:
+            return
+        for child in element.children:
+            self._generate_element_html(child, output, pretty, depth + 1)
+        output.append(tail)
+    
+    def _element_pieces(self, element, pretty, depth):
+        """返回元素自身的片段: (子元素之前的各行, 结束标签)，自闭合标签的结束标签为None"""
+        if not self.use_cache:
+            return self._render_element_pieces(element, pretty, depth)
+        cache_key = ('writer', pretty, depth)
+        pieces = element.get_fragment(cache_key)
+        if pieces is None:
+            pieces = self._render_element_pieces(element, pretty, depth)
+            element.set_fragment(cache_key, pieces)
+        return pieces
+    
+    def _render_element_pieces(self, element, pretty, depth):
+        """生成单个元素的开始标签、文本和结束标签"""
         indent = '  ' * depth if pretty else ''
         
         # 构建属性字符串
         attrs = self._format_attributes(element)
         
         # 检查是否是自闭合标签
-        void_elements = ['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
-                         'link', 'meta', 'param', 'source', 'track', 'wbr']
-        
-        if element.tag in void_elements:
+        if element.tag in VOID_ELEMENTS:
             # 自闭合标签
-            output.append(f"{indent}<{element.tag}{attrs}>")
-            return
+            return (f"{indent}<{element.tag}{attrs}>",), None
             
         # 正常开始标签
-        output.append(f"{indent}<{element.tag}{attrs}>")
+        head = [f"{indent}<{element.tag}{attrs}>"]
         
         # 添加文本内容
         if element.text:
-            escaped_text = element.text
-            # 使用与测试兼容的HTML转义
-            escaped_text = escaped_text.replace('&', '&amp;')
-            escaped_text = escaped_text.replace('<', '&lt;')
-            escaped_text = escaped_text.replace('>', '&gt;')
-            escaped_text = escaped_text.replace('"', '&quot;')
-            escaped_text = escaped_text.replace("'", '&#39;')
+            escaped_text = self._escape_text(element.text)
             
             if pretty:
-                output.append(f"{indent}  {escaped_text}")
+                head.append(f"{indent}  {escaped_text}")
             else:
-                output.append(escaped_text)
-                
-        # 递归处理子元素
-        for child in element.children:
-            self._generate_element_html(child, output, pretty, depth + 1)
+                head.append(escaped_text)
             
-        # 添加结束标签
-        output.append(f"{indent}</{element.tag}>")
+        # 结束标签，子元素由_generate_element_html插入在两者之间
+        return tuple(head), f"{indent}</{element.tag}>"
+    
+    @staticmethod
+    def _escape_text(text):
+        """转义文本内容"""
+        # 使用与测试兼容的HTML转义
+        text = text.replace('&', '&amp;')
+        text = text.replace('<', '&lt;')
+        text = text.replace('>', '&gt;')
+        text = text.replace('"', '&quot;')
+        text = text.replace("'", '&#39;')
+        return text
+    
+    def _generate_minified_html(self, element, output, preserve_whitespace):
+        """递归生成压缩的元素HTML，不包含元素自身的结束标签
+        
+        是否可以省略结束标签取决于下一个兄弟元素，因此由父元素在拼接子元素时决定，
+        这样每个元素缓存的开始标签和文本只依赖于元素自身。
+        """
+        if self._prerendered:
+            fragment = self._prerendered.get(id(element))
+            if fragment is not None:
+                output.append(fragment)
+                return
+        output.append(self._minified_head(element, preserve_whitespace))
+        if element.tag in VOID_ELEMENTS:
+            return
+        preserve_whitespace = preserve_whitespace or element.tag in WHITESPACE_PRESERVING_TAGS
+        children = element.children
+        for i, child in enumerate(children):
+            self._generate_minified_html(child, output, preserve_whitespace)
+            next_sibling = children[i + 1] if i + 1 < len(children) else None
+            output.append(self._minified_end_tag(child, next_sibling))
+    
+    def _minified_head(self, element, preserve_whitespace):
+        """返回压缩模式下元素的开始标签和文本"""
+        cache_key = ('minify', preserve_whitespace)
+        if self.use_cache:
+            head = element.get_fragment(cache_key)
+            if head is not None:
+                return head
+        
+        head = f"<{element.tag}{self._format_attributes(element, minify=True)}>"
+        if element.tag not in VOID_ELEMENTS and element.text:
+            preserve_whitespace = preserve_whitespace or element.tag in WHITESPACE_PRESERVING_TAGS
+            text = element.text if preserve_whitespace else _WHITESPACE_RE.sub(' ', element.text)
+            head += self._escape_text(text)
+        
+        if self.use_cache:
+            element.set_fragment(cache_key, head)
+        return head
     
-    def _format_attributes(self, element):
-        """格式化元素的属性"""
+    @staticmethod
+    def _minified_end_tag(element, next_sibling):
+        """返回压缩模式下元素的结束标签，可以省略时返回空字符串"""
+        if element.tag in VOID_ELEMENTS:
+            return ''
+        rule = OPTIONAL_END_TAGS.get(element.tag)
+        if rule is not None:
+            followers, last_ok = rule
+            if next_sibling is None:
+                parent = element.parent
+                if last_ok and not (element.tag == 'p' and parent is not None
+                                    and parent.tag in P_END_TAG_REQUIRED_PARENTS):
+                    return ''
+            elif followers is None or next_sibling.tag in followers:
+                return ''
+        return f"</{element.tag}>"
+    
+    def _format_attributes(self, element, minify=False):
+        """格式化元素的属性
+        
+        Args:
+            element: HTML元素
+            minify: 为True时省略与标签名相同的ID（解析器自动生成的ID）
+        """
         attrs = []
         
         # 添加ID属性
-        attrs.append(f'id="{html.escape(element.id)}"')
+        if not (minify and element.id == element.tag):
+            attrs.append(f'id="{html.escape(element.id)}"')
         
         # 添加其他属性
         for name, value in element.attributes.items():
             attrs.append(f'{name}="{html.escape(str(value))}"')
         
         return ' ' + ' '.join(attrs) if attrs else ''
+
+
+def _to_compact(element):
+    """将子树转换为便于跨进程传输的嵌套元组，返回(紧凑表示, 元素数)"""
+    children = []
+    size = 1
+    for child in element.children:
+        node, child_size = _to_compact(child)
+        children.append(node)
+        size += child_size
+    node = (element.tag, element.id, tuple(element.attributes.items()),
+            element.text, tuple(children))
+    return node, size
+
+def _from_compact(node, parent=None):
+    """从紧凑表示重建子树"""
+    tag, element_id, attributes, text, children = node
+    element = HtmlElement(tag, element_id)
+    element.attributes = dict(attributes)
+    element.text = text
+    element.parent = parent
+    element.children = [_from_compact(child, element) for child in children]
+    return element
+
+# fork的工作进程继承的待生成分区，只在并行序列化期间设置
+_fork_partitions = None
+
+def _render_partition(writer, element, pretty, depth, minify):
+    """生成一个分区的完整片段（压缩模式下不含分区自身的结束标签）"""
+    output = []
+    if minify:
+        writer._generate_minified_html(element, output, False)
+        return ''.join(output)
+    writer._generate_element_html(element, output, pretty, depth)
+    return ('\n' if pretty else '').join(output)
+
+def _render_fork_batch(task):
+    """工作进程入口（fork）: 生成继承的分区列表中[start, end)范围的片段"""
+    start, end, pretty, depth, minify = task
+    writer = HtmlWriter(use_cache=False)
+    return [_render_partition(writer, element, pretty, depth, minify)
+            for element in _fork_partitions[start:end]]
+
+def _render_compact_batch(task):
+    """工作进程入口: 生成一批紧凑子树的片段"""
+    nodes, pretty, depth, minify = task
+    writer = HtmlWriter(use_cache=False)
+    return [_render_partition(writer, _from_compact(node), pretty, depth, minify)
+            for node, _ in nodes]
@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import Dict, Any
+
+from src.io.atomic import atomic_write
+
+class AutosaveWorker(threading.Thread):
+    """后台自动保存线程
+
+    定期检查会话中每个编辑器的modified标记，一批连续编辑在静默期
+    (quiet_period秒内没有新修改)结束后合并为一次写入。
+    序列化在会话锁内完成，保证快照一致；磁盘写入在锁外进行，
+    交互线程不会因为磁盘I/O而阻塞。
+    """
+
+    DEFAULT_QUIET_PERIOD = 2.0
+
+    def __init__(self, session_manager, quiet_period: float = DEFAULT_QUIET_PERIOD,
+                 poll_interval: float = 0.2):
+        """
+        初始化自动保存线程
+
+        Args:
+            session_manager: 会话管理器
+            quiet_period: 最后一次修改后等待多少秒再写入
+            poll_interval: 检查编辑器状态的间隔秒数
+        """
+        super().__init__(name="autosave", daemon=True)
+        self.session_manager = session_manager
+        self.quiet_period = quiet_period
+        self.poll_interval = min(poll_interval, quiet_period) if quiet_period > 0 else poll_interval
+        self._stop_event = threading.Event()
+
+        # 保存延迟统计
+        self.save_count = 0
+        self.failure_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = None
+        self.last_error = None
+
+    def run(self):
+        """线程主循环"""
+        while not self._stop_event.wait(self.poll_interval):
+            self.flush(force=False)
+
+    def stop(self, flush: bool = True, timeout: float = None) -> None:
+        """
+        停止自动保存线程
+
+        Args:
+            flush: 停止前是否写入所有尚未保存的修改
+            timeout: 等待线程结束的最长秒数
+        """
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        if flush:
+            self.flush(force=True)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        保存所有静默期已结束的已修改编辑器
+
+        Args:
+            force: 为True时忽略静默期，立即保存所有已修改编辑器
+
+        Returns:
+            本次写入的文件数
+        """
+        saved = 0
+        now = time.monotonic()
+        for editor in list(self.session_manager.editors.values()):
+            # 进行中的事务可能只完成了一部分，等提交后再保存
+            if not editor.modified or editor.processor.in_transaction:
+                continue
+            if not force and now - editor.last_change < self.quiet_period:
+                continue
+            if self._save_editor(editor):
+                saved += 1
+        return saved
+
+    def _save_editor(self, editor) -> bool:
+        """从一致的快照保存单个编辑器"""
+        start = time.perf_counter()
+        try:
+            # 在会话锁内序列化，得到与某个版本一致的快照
+            with self.session_manager.lock:
+                version = editor.version
+                html_content = editor.snapshot()
+                journal_offset = editor.journal_offset()
+
+            # 锁外写盘，同一编辑器的写入按版本串行化
+            with editor.save_lock:
+                if editor.saved_version >= version:
+                    return False
+                atomic_write(editor.filename, html_content,
+                             fsync=editor.fsync_on_save,
+                             keep_backup=editor.keep_backup)
+                editor.saved_version = version
+
+            with self.session_manager.lock:
+                # 快照之前的日志记录已合并到HTML文件中
+                editor.journal_compacted(journal_offset)
+                if editor.version == version:
+                    editor.modified = False
+        except Exception as e:
+            self.failure_count += 1
+            self.last_error = str(e)
+            return False
+
+        latency = time.perf_counter() - start
+        self.save_count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_latency = latency
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """返回自动保存的延迟统计"""
+        average = self.total_latency / self.save_count if self.save_count else None
+        return {
+            "quiet_period": self.quiet_period,
+            "saves": self.save_count,
+            "failures": self.failure_count,
+            "last_latency": self.last_latency,
+            "avg_latency": average,
+            "max_latency": self.max_latency if self.save_count else None,
+            "last_error": self.last_error,
+        }
@@ -1,10 +1,20 @@
 from src.core.html_model import HtmlModel
 from src.commands.base import CommandProcessor
-from src.commands.io import InitCommand, SaveCommand, ReadCommand
+from src.commands.do.history import CommandHistory
+from src.commands.do.checkpoints import CheckpointHistory
+from src.commands.io import InitCommand, SaveCommand, ReadCommand, ExportSnapshotCommand, ImportSnapshotCommand
 from src.commands.command_exceptions import CommandExecutionError
+from src.commands.dispatch import MODES, SYNC
 from src.commands.display import PrintTreeCommand
+from src.commands.records import replay_record
+from src.io.journal import EditJournal
+from src.io.recording import SessionRecorder
+from src.io.spill import SpillFile
 from src.session.state.session_state import SessionState
+from src.session.autosave import AutosaveWorker
 import os
+import threading
+import time
 
 class Editor:
     """表示一个HTML文件编辑器实例"""
@@ -14,8 +24,92 @@ class Editor:
         self.filename = filename
         self.model = HtmlModel()
         self.processor = CommandProcessor()
+        self.version = 0  # 每次修改递增，用于判断快照是否过期
+        self.saved_version = 0  # 最近一次写入磁盘的版本
+        self.last_change = time.monotonic()  # 最近一次修改的时间
+        self.save_lock = threading.Lock()  # 串行化同一文件的写入
         self.modified = False
         self.show_id = True  # 默认显示ID
+        self.atomic_save = False  # 是否通过临时文件+重命名原子保存
+        self.fsync_on_save = False  # 原子保存时是否刷新到磁盘
+        self.keep_backup = False  # 原子保存时是否保留上一版本
+        self.journal = None  # 日志模式下的编辑日志
+        self.journal_threshold = self.DEFAULT_JOURNAL_THRESHOLD  # 超过该字节数时合并日志
+        self.recorder = None  # 录制会话时的录制文件
+    
+    # 日志超过1MB时自动合并为完整的HTML
+    DEFAULT_JOURNAL_THRESHOLD = 1024 * 1024
+    # 内存中保留的可用逆操作撤销的命令数
+    LIVE_HISTORY = 100
+    
+    @property
+    def journal_mode(self):
+        """是否启用日志模式：编辑追加到 <file>.journal，仅在保存或日志过大时重写HTML"""
+        return self.journal is not None
+    
+    @journal_mode.setter
+    def journal_mode(self, enabled):
+        if enabled and self.journal is None:
+            self.journal = EditJournal(self.filename, fsync=self.fsync_on_save)
+            self.journal.open()
+            self.processor.attach_journal(self.journal)
+        elif not enabled and self.journal is not None:
+            self.processor.detach_journal()
+            self.journal.close()
+            self.journal = None
+        
+    @property
+    def checkpoints(self):
+        """是否启用检查点历史：内存中只保留最近 LIVE_HISTORY 条活动命令，更早的历史
+        以记录和检查点的形式换出到临时文件，深度撤销时通过检查点恢复并重放"""
+        return self.processor.checkpoints is not None
+    
+    @checkpoints.setter
+    def checkpoints(self, enabled):
+        if enabled and self.processor.checkpoints is None:
+            # 检查点时间线从当前状态开始，之前的活动历史无法与之对应
+            self.processor.clear_history()
+            self.processor.history.max_history = self.LIVE_HISTORY
+            self.processor.attach_checkpoints(CheckpointHistory(self.model, spill=SpillFile()))
+        elif not enabled and self.processor.checkpoints is not None:
+            self.processor.detach_checkpoints().close()
+            self.processor.history.max_history = None
+    
+    @property
+    def coalesce(self):
+        """是否在 DEFAULT_COALESCE_WINDOW 秒内合并对同一元素的连续修改"""
+        return bool(self.processor.history.coalesce_window)
+    
+    @coalesce.setter
+    def coalesce(self, enabled):
+        self.processor.history.coalesce_window = CommandHistory.DEFAULT_COALESCE_WINDOW if enabled else None
+    
+    @property
+    def dispatch_mode(self):
+        """观察者事件的分发方式：'sync' 立即通知，'batch' 成批通知，'async' 由后台线程通知"""
+        dispatcher = self.processor.dispatcher
+        return dispatcher.mode if dispatcher is not None else SYNC
+    
+    @dispatch_mode.setter
+    def dispatch_mode(self, mode):
+        if mode != self.dispatch_mode:
+            self.processor.set_dispatch_mode(mode)
+    
+    @property
+    def modified(self):
+        """是否有尚未保存的修改"""
+        return self._modified
+    
+    @modified.setter
+    def modified(self, value):
+        if value:
+            self.version += 1
+            self.last_change = time.monotonic()
+        self._modified = value
+    
+    def snapshot(self):
+        """序列化当前模型，返回保存时将写入的HTML内容"""
+        return SaveCommand(self.model, self.filename)._generate_html()
         
     def load(self):
         """加载文件内容到编辑器"""
@@ -28,46 +122,176 @@ class Editor:
                 # 如果文件不存在，创建新的HTML结构
                 cmd = InitCommand(self.model)
                 self.processor.execute(cmd)
+                # 新文档没有可撤销的历史，以初始结构为检查点基准
+                self.processor.clear_history()
             
             self.modified = False
+            self._replay_journal()
             return True
         except Exception as e:
             print(f"加载文件失败: {str(e)}")
             return False
     
+    def _replay_journal(self):
+        """在刚加载的文档上重放尚未合并的编辑日志"""
+        journal = EditJournal(self.filename)
+        if not journal.exists():
+            return
+        records = journal.read_records()
+        if records is None:
+            print(f"警告: 编辑日志与文件不匹配，已忽略: {journal.path}")
+            return
+        
+        # 重放时不能再写入日志，处理器上的历史记录会随之重建
+        attached = self.processor.detach_journal()
+        try:
+            for record in records:
+                try:
+                    if not replay_record(self.processor, self.model, record):
+                        raise CommandExecutionError(f"命令返回失败: {record!r}")
+                except Exception as e:
+                    print(f"警告: 重放编辑日志失败，后续记录已忽略: {str(e)}")
+                    break
+        finally:
+            if attached is not None:
+                self.processor.attach_journal(attached)
+        
+        if records:
+            self.modified = True
+            print(f"已从编辑日志恢复 {len(records)} 条修改")
+    
+    def start_recording(self, path):
+        """开始把编辑操作录制到 path，头部保存当前文档作为重放的起点"""
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, self.model)
+        self.processor.attach_recorder(self.recorder)
+        return self.recorder
+    
+    def stop_recording(self):
+        """停止录制，返回已录制的操作数（未在录制时为None）"""
+        if self.recorder is None:
+            return None
+        self.processor.detach_recorder()
+        self.recorder.close()
+        count, self.recorder = self.recorder.count, None
+        return count
+    
+    def journal_offset(self):
+        """当前日志的字节数，用于合并时保留之后追加的记录"""
+        return self.journal.size() if self.journal else None
+    
+    def journal_compacted(self, keep_from=None):
+        """HTML文件已写入完整内容后，重置日志或删除过期的日志文件"""
+        if self.journal:
+            self.journal.reset(keep_from)
+        else:
+            stale = EditJournal(self.filename)
+            if stale.exists():
+                stale.remove()
+    
+    def close(self, release_history=True):
+        """
+        释放编辑器持有的资源（编辑日志、历史换出文件和事件分发线程）
+        
+        Args:
+            release_history: 是否释放命令历史，另存为后共享处理器的编辑器应为False
+        """
+        self.journal_mode = False
+        self.stop_recording()
+        if release_history and self.processor.checkpoints is not None:
+            self.processor.checkpoints.close()
+        if release_history and self.processor.dispatcher is not None:
+            # 投递排队中的观察者事件并停止分发线程
+            self.processor.dispatcher.close()
+    
+    def _maybe_compact_journal(self):
+        """日志过大或包含无法记录的命令时，合并为完整的HTML"""
+        # 事务中的修改在提交时才写入日志，合并推迟到提交之后
+        if self.journal and not self.processor.in_transaction and (self.journal.needs_compaction
+                             or self.journal.size() > self.journal_threshold):
+            self.save()
+    
     def save(self):
         """保存编辑器内容到文件"""
         try:
-            cmd = SaveCommand(self.model, self.filename)
+            cmd = SaveCommand(self.model, self.filename,
+                              atomic=self.atomic_save,
+                              fsync=self.fsync_on_save,
+                              keep_backup=self.keep_backup)
             # 设置处理器引用，以便清理历史记录
             cmd.processor = self.processor
-            result = self.processor.execute(cmd)
-            if result:
-                self.modified = False
+            with self.save_lock:
+                version = self.version
+                result = self.processor.execute(cmd)
+                if result:
+                    self.saved_version = max(self.saved_version, version)
+                    self.modified = False
+                    self.journal_compacted()
             return result
         except Exception as e:
             print(f"保存文件失败: {str(e)}")
             return False
     
-    def execute_command(self, command):
-        """执行编辑命令"""
+    def export(self, file_path, minify=False):
+        """导出压缩和/或gzip格式的HTML，不改变当前文件名和修改状态"""
+        try:
+            cmd = SaveCommand(self.model, file_path,
+                              atomic=self.atomic_save,
+                              fsync=self.fsync_on_save,
+                              keep_backup=self.keep_backup,
+                              minify=minify)
+            return self.processor.execute(cmd)
+        except Exception as e:
+            print(f"导出文件失败: {str(e)}")
+            return False
+    
+    def execute_command(self, command, raise_errors=False):
+        """
+        执行编辑命令
+        
+        Args:
+            command: 要执行的命令
+            raise_errors: 为True时异常直接抛出（批处理模式按行处理错误），否则打印并返回False
+        """
         try:
             result = self.processor.execute(command)
             if result and command.recordable:
                 self.modified = True
+                self._maybe_compact_journal()
             return result
         except CommandExecutionError as e:
+            if raise_errors:
+                raise
             print(f"执行命令失败: {str(e)}")
             return False
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"执行命令时发生错误: {str(e)}")
             return False
     
+    def begin_transaction(self, description="批量操作"):
+        """开始事务，提交前的编辑不进入历史记录"""
+        self.processor.begin(description)
+    
+    def commit_transaction(self):
+        """提交事务，事务中的编辑成为一条历史记录"""
+        result = self.processor.commit()
+        self._maybe_compact_journal()
+        return result
+    
+    def rollback_transaction(self):
+        """回滚事务，撤销事务中的所有编辑"""
+        result = self.processor.rollback()
+        self.modified = True
+        return result
+    
     def undo(self):
         """撤销上一个编辑操作"""
         result = self.processor.undo()
         if result:
             self.modified = True  # 确保撤销后文件被标记为已修改
+            self._maybe_compact_journal()
             return True
         return False
     
@@ -76,6 +300,7 @@ class Editor:
         result = self.processor.redo()
         if result:
             self.modified = True  # Set modified flag to True on successful redo 
+            self._maybe_compact_journal()
             return True
         return False
     
@@ -115,14 +340,25 @@ class Editor:
 class SessionManager:
     """管理多个编辑器实例的会话"""
     
-    def __init__(self, state_manager=None):
-        """初始化会话管理器"""
+    def __init__(self, state_manager=None, dispatch_mode=SYNC):
+        """
+        初始化会话管理器
+        
+        Args:
+            state_manager: 会话状态管理器，None使用默认的SessionState
+            dispatch_mode: 新打开的编辑器的观察者事件分发方式，批处理时使用'batch'
+        """
+        self.dispatch_mode = dispatch_mode
         self.editors = {}  # 文件名到编辑器的映射
         self.active_editor = None  # 当前活动的编辑器
         
         # 设置状态管理器
         self.state_manager = state_manager or SessionState()
         
+        # 保护模型的会话锁，后台自动保存在锁内获取快照
+        self.lock = threading.RLock()
+        self.autosave = None  # 后台自动保存线程
+        
     def restore_session(self) -> bool:
         """恢复上一次的会话状态
         
@@ -149,9 +385,8 @@ class SessionManager:
                     # 恢复文件的设置 - 使用规范化的路径
                     norm_path = os.path.normpath(file_path)
                     if norm_path in normalized_settings:
-                        file_settings = normalized_settings[norm_path]
-                        if "show_id" in file_settings:
-                            self.editors[norm_path].show_id = file_settings["show_id"]
+                        self._apply_file_settings(self.editors[norm_path],
+                                                  normalized_settings[norm_path])
             else:
                 print(f"警告: 无法恢复文件，文件不存在: {file_path}")
         
@@ -168,6 +403,24 @@ class SessionManager:
             print(f"已恢复活动文件: {active_file}")
         
         return success
+    
+    # 文件设置键到编辑器属性的映射
+    FILE_SETTINGS = {
+        "show_id": "show_id",
+        "atomic_save": "atomic_save",
+        "fsync_on_save": "fsync_on_save",
+        "keep_backup": "keep_backup",
+        "journal_mode": "journal_mode",
+        "checkpoints": "checkpoints",
+        "coalesce": "coalesce",
+        "dispatch_mode": "dispatch_mode",
+    }
+    
+    def _apply_file_settings(self, editor, file_settings):
+        """将保存的文件设置应用到编辑器"""
+        for key, attr in self.FILE_SETTINGS.items():
+            if key in file_settings:
+                setattr(editor, attr, file_settings[key])
         
     def save_session(self) -> bool:
         """保存当前会话状态
@@ -185,7 +438,7 @@ class SessionManager:
         file_settings = {}
         for file_path, editor in self.editors.items():
             file_settings[file_path] = {
-                "show_id": editor.show_id
+                key: getattr(editor, attr) for key, attr in self.FILE_SETTINGS.items()
             }
         
         # 保存状态
@@ -205,6 +458,7 @@ class SessionManager:
         # 创建新编辑器并加载文件
         editor = Editor(filename)
         if editor.load():
+            editor.dispatch_mode = self.dispatch_mode
             self.editors[filename] = editor
             self.active_editor = editor
             print(f"已加载文件: {filename}")
@@ -215,6 +469,47 @@ class SessionManager:
     
     def save(self, filename=None):
         """保存指定的文件，如果未指定则保存活动文件"""
+        with self.lock:
+            return self._save(filename)
+    
+    def export(self, filename, minify=False):
+        """将活动编辑器导出为压缩和/或gzip格式的HTML
+        
+        导出文件不会成为活动编辑器，也不会清除修改标记。
+        """
+        if not self.active_editor:
+            print("没有可保存的文件")
+            return False
+        with self.lock:
+            return self.active_editor.export(os.path.abspath(filename), minify)
+    
+    def export_snapshot(self, filename):
+        """将活动编辑器的模型导出为二进制快照"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        with self.lock:
+            return self.active_editor.execute_command(
+                ExportSnapshotCommand(self.active_editor.model, os.path.abspath(filename)))
+    
+    def import_snapshot(self, filename):
+        """从二进制快照加载活动编辑器的模型
+        
+        快照内容与编辑器对应的HTML文件不同，因此导入后标记为已修改。
+        """
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        with self.lock:
+            editor = self.active_editor
+            command = ImportSnapshotCommand(editor.processor, editor.model, os.path.abspath(filename))
+            if editor.execute_command(command):
+                editor.modified = True
+                return True
+            return False
+    
+    def _save(self, filename):
+        """在会话锁内执行保存"""
         # 如果未指定文件名，使用活动编辑器的文件名
         if not filename and self.active_editor:
             filename = self.active_editor.filename
@@ -225,10 +520,17 @@ class SessionManager:
         
         # 如果指定了文件名但没有对应的编辑器，检查是否为活动编辑器的另存为
         if filename and filename not in self.editors and self.active_editor:
-            # 创建新编辑器并复制模型
+            # 创建新编辑器并共享活动编辑器的模型和处理器（连同检查点和合并设置）
             editor = Editor(filename)
             editor.model = self.active_editor.model
             editor.processor = self.active_editor.processor
+            editor.atomic_save = self.active_editor.atomic_save
+            editor.fsync_on_save = self.active_editor.fsync_on_save
+            editor.keep_backup = self.active_editor.keep_backup
+            if self.active_editor.journal_mode:
+                # 共享的处理器改为写入新文件的日志
+                self.active_editor.journal_mode = False
+                editor.journal_mode = True
             
             # 保存并添加到编辑器列表
             if editor.save():
@@ -267,6 +569,9 @@ class SessionManager:
         # 从编辑器列表中移除
         filename = self.active_editor.filename
         del self.editors[filename]
+        closing = self.active_editor
+        closing.close(release_history=not any(
+            editor.processor is closing.processor for editor in self.editors.values()))
         print(f"已关闭文件: {filename}")
         
         # 设置新的活动编辑器
@@ -316,6 +621,99 @@ class SessionManager:
         print(f"ID显示已{'启用' if show else '禁用'}")
         return True
     
+    def set_atomic_save(self, enabled: bool, fsync: bool = False, keep_backup: bool = False):
+        """设置当前活动编辑器的原子保存模式"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        
+        self.active_editor.atomic_save = enabled
+        self.active_editor.fsync_on_save = enabled and fsync
+        self.active_editor.keep_backup = enabled and keep_backup
+        if enabled:
+            options = [name for name, on in (("fsync", fsync), ("备份", keep_backup)) if on]
+            suffix = f" ({', '.join(options)})" if options else ""
+            print(f"原子保存已启用{suffix}")
+        else:
+            print("原子保存已禁用")
+        return True
+    
+    def set_journal_mode(self, enabled: bool):
+        """设置当前活动编辑器的日志模式"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        
+        with self.lock:
+            self.active_editor.journal_mode = enabled
+        if enabled:
+            print(f"日志模式已启用，编辑将追加到 {self.active_editor.journal.path}")
+        else:
+            print("日志模式已禁用")
+        return True
+    
+    def set_checkpoints(self, enabled: bool):
+        """设置当前活动编辑器是否使用检查点历史（深度撤销、历史换出到磁盘）"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        
+        with self.lock:
+            self.active_editor.checkpoints = enabled
+        if enabled:
+            print(f"检查点历史已启用，内存中保留最近 {Editor.LIVE_HISTORY} 条命令，撤销历史从当前状态开始")
+        else:
+            print("检查点历史已禁用")
+        return True
+    
+    def set_dispatch_mode(self, mode: str):
+        """设置当前活动编辑器的观察者事件分发方式"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        if mode not in MODES:
+            print(f"无效的分发模式: {mode}，可选: {', '.join(MODES)}")
+            return False
+        
+        with self.lock:
+            self.active_editor.dispatch_mode = mode
+        print(f"事件分发模式: {mode}")
+        return True
+    
+    def set_coalesce(self, enabled: bool):
+        """设置当前活动编辑器是否合并对同一元素的连续修改"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        
+        self.active_editor.coalesce = enabled
+        print(f"连续修改合并已{'启用' if enabled else '禁用'}")
+        return True
+    
+    def set_recording(self, path):
+        """开始把当前活动编辑器的操作录制到 path，path为None时停止录制"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        
+        with self.lock:
+            if path is None:
+                count = self.active_editor.stop_recording()
+            else:
+                try:
+                    self.active_editor.start_recording(path)
+                except OSError as e:
+                    print(f"无法创建录制文件: {str(e)}")
+                    return False
+        if path is None:
+            if count is None:
+                print("当前没有在录制")
+            else:
+                print(f"录制已停止，共 {count} 个操作")
+        else:
+            print(f"开始录制到 {path}，使用 'python run.py replay {path}' 重放")
+        return True
+    
     def get_show_id(self):
         """获取当前活动编辑器是否显示ID的设置"""
         if not self.active_editor:
@@ -386,7 +784,45 @@ class SessionManager:
             if hasattr(command, 'formatter') and command.formatter:
                 command.pre_format_hook = self.active_editor.mark_spelling_errors
         
-        return self.active_editor.execute_command(command)
+        with self.lock:
+            return self.active_editor.execute_command(command)
+    
+    def begin_transaction(self):
+        """在活动编辑器上开始事务"""
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        with self.lock:
+            self.active_editor.begin_transaction()
+        print("事务已开始，使用 'commit' 提交或 'rollback' 回滚")
+        return True
+    
+    def commit_transaction(self):
+        """提交活动编辑器上的事务"""
+        return self._end_transaction(commit=True)
+    
+    def rollback_transaction(self):
+        """回滚活动编辑器上的事务"""
+        return self._end_transaction(commit=False)
+    
+    def _end_transaction(self, commit):
+        if not self.active_editor:
+            print("没有活动编辑器。请先加载文件。")
+            return False
+        with self.lock:
+            editor = self.active_editor
+            transaction = editor.processor.current_transaction
+            if transaction is None:
+                print("没有进行中的事务")
+                return False
+            if commit:
+                count = len(transaction)
+                editor.commit_transaction()
+                print(f"事务已提交，{count} 个命令合并为一条历史记录")
+                return True
+            result = editor.rollback_transaction()
+            print("事务已回滚" if result else "事务回滚失败")
+            return result
     
     def undo(self):
         """在活动编辑器上执行撤销操作"""
@@ -394,7 +830,8 @@ class SessionManager:
             print("没有活动编辑器。请先加载文件。")
             return False
         
-        return self.active_editor.undo()
+        with self.lock:
+            return self.active_editor.undo()
     
     def redo(self):
         """在活动编辑器上执行重做操作"""
@@ -402,7 +839,86 @@ class SessionManager:
             print("没有活动编辑器。请先加载文件。")
             return False
         
-        return self.active_editor.redo()
+        with self.lock:
+            return self.active_editor.redo()
+    
+    def enable_autosave(self, quiet_period: float = None) -> bool:
+        """启用后台自动保存
+        
+        Args:
+            quiet_period: 最后一次修改后等待多少秒再写入，None表示保持当前设置
+        """
+        if quiet_period is not None and quiet_period < 0:
+            print("自动保存间隔不能为负数")
+            return False
+        
+        if self.autosave and self.autosave.is_alive():
+            if quiet_period is not None:
+                self.autosave.quiet_period = quiet_period
+        else:
+            if quiet_period is None:
+                quiet_period = AutosaveWorker.DEFAULT_QUIET_PERIOD
+            self.autosave = AutosaveWorker(self, quiet_period)
+            self.autosave.start()
+        
+        print(f"自动保存已启用，静默 {self.autosave.quiet_period:g} 秒后写入")
+        return True
+    
+    def disable_autosave(self, flush: bool = True) -> bool:
+        """停止后台自动保存，默认先写入所有未保存的修改"""
+        if not self.autosave:
+            return True
+        self.autosave.stop(flush=flush)
+        self.autosave = None
+        print("自动保存已禁用")
+        return True
+    
+    def autosave_stats(self):
+        """返回自动保存的保存延迟统计，未启用时返回None"""
+        return self.autosave.stats() if self.autosave else None
+    
+    def show_autosave_stats(self):
+        """显示自动保存状态和保存延迟统计"""
+        stats = self.autosave_stats()
+        if stats is None:
+            print("自动保存未启用")
+            return
+        print(f"自动保存: 静默 {stats['quiet_period']:g} 秒, 已保存 {stats['saves']} 次, 失败 {stats['failures']} 次")
+        if stats['saves']:
+            print(f"  保存延迟: 最近 {stats['last_latency'] * 1000:.1f} ms, "
+                  f"平均 {stats['avg_latency'] * 1000:.1f} ms, 最大 {stats['max_latency'] * 1000:.1f} ms")
+        if stats['last_error']:
+            print(f"  最近错误: {stats['last_error']}")
+    
+    def history_stats(self):
+        """返回活动编辑器撤销历史的数量和内存统计，没有活动编辑器时返回None"""
+        if not self.active_editor:
+            return None
+        with self.lock:
+            processor = self.active_editor.processor
+            stats = processor.history.stats()
+            if processor.checkpoints is not None:
+                stats['checkpoints'] = processor.checkpoints.stats()
+            return stats
+    
+    def show_history_stats(self):
+        """显示活动编辑器撤销历史的命令数和估算内存"""
+        stats = self.history_stats()
+        if stats is None:
+            print("没有活动编辑器。请先加载文件。")
+            return
+        limit = "不限" if stats['max_memory'] is None else f"{stats['max_memory'] / 1024:.1f} KB"
+        print(f"历史记录: {stats['commands']} 条可撤销, {stats['redos']} 条可重做")
+        print(f"  估算内存: {stats['memory'] / 1024:.1f} KB / {limit}, 已淘汰 {stats['evicted']} 条, "
+              f"已合并 {stats['coalesced']} 条")
+        checkpoints = stats.get('checkpoints')
+        if checkpoints:
+            print(f"  检查点: {checkpoints['checkpoints']} 个 ({checkpoints['checkpoint_bytes'] / 1024:.1f} KB), "
+                  f"时间线 {checkpoints['position']}/{checkpoints['records']} 条, "
+                  f"恢复 {checkpoints['restores']} 次, 重放 {checkpoints['replayed']} 条")
+            if checkpoints['spill_bytes']:
+                print(f"  已换出到磁盘: {checkpoints['spilled_records']} 条记录, "
+                      f"{checkpoints['spilled_checkpoints']} 个检查点 ({checkpoints['spill_bytes'] / 1024:.1f} KB)")
     
     def get_active_model(self):
         """获取活动编辑器的模型"""
@@ -0,0 +1,81 @@
+import os
+import pytest
+from src.application.batch_apply import (batch_apply, format_batch_summary, parse_batch_script,
+                                         run_batch_from_args)
+from src.application.script_runner import ScriptError
+
+PAGE = '<html><head></head><body><p id="x">hi</p></body></html>'
+
+def _write(path, content=PAGE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+@pytest.mark.unit
+class TestBatchApply:
+    """测试多文件批量编辑"""
+
+    def test_parse_rejects_session_commands(self):
+        """文件的读取和保存由批处理完成，脚本中不能出现"""
+        with pytest.raises(ScriptError):
+            parse_batch_script(['load a.html', 'edit-text x y'])
+        steps = parse_batch_script(['begin', 'edit-text x y', 'commit', 'undo'])
+        assert [step.cmd for step in steps] == ['begin', 'edit-text', 'commit', 'undo']
+
+    def test_in_place_with_per_file_errors(self, temp_dir):
+        """原地修改每个文件，失败的文件保持不变并单独报告"""
+        good = [os.path.join(temp_dir, f'f{i}.html') for i in range(3)]
+        bad = os.path.join(temp_dir, 'bad.html')
+        for path in good:
+            _write(path)
+        _write(bad, '<html><head></head><body></body></html>')
+        steps = parse_batch_script(['edit-text x bye', 'append div d1 body new'])
+
+        seen = []
+        result = batch_apply(steps, good + [bad], workers=1, on_result=seen.append)
+
+        assert (result.files, result.failed) == (4, 1)
+        assert result.errors[0][0] == bad and "'x'" in result.errors[0][1]
+        assert len(seen) == 4
+        for path in good:
+            content = _read(path)
+            assert '<p id="x">bye</p>' in content and 'id="d1"' in content
+        assert 'd1' not in _read(bad)
+
+    def test_process_pool_writes_output_dir(self, temp_dir):
+        """进程池处理时保留相对目录结构写入输出目录"""
+        source = os.path.join(temp_dir, 'in')
+        paths = [os.path.join(source, 'a.html'), os.path.join(source, 'sub', 'b.html')]
+        for path in paths:
+            _write(path)
+        output = os.path.join(temp_dir, 'out')
+        steps = parse_batch_script(['begin', 'edit-text x 1', 'edit-text x 2', 'commit'])
+
+        result = batch_apply(steps, paths, workers=2, output_dir=output)
+
+        assert result.failed == 0 and result.workers == 2
+        assert '<p id="x">2</p>' in _read(os.path.join(output, 'sub', 'b.html'))
+        assert '<p id="x">hi</p>' in _read(paths[0])
+        assert '2 个进程' in format_batch_summary(result)
+
+    def test_unfinished_transaction_fails_file(self, temp_dir):
+        path = os.path.join(temp_dir, 'a.html')
+        _write(path)
+        result = batch_apply(parse_batch_script(['begin', 'edit-text x y']), [path], workers=1)
+        assert result.failed == 1
+        assert _read(path) == PAGE
+
+    def test_command_line_exit_codes(self, temp_dir, capsys):
+        script = os.path.join(temp_dir, 'edit.cmds')
+        _write(script, 'edit-text x bye\n')
+        _write(os.path.join(temp_dir, 'docs', 'a.html'))
+        pattern = os.path.join(temp_dir, 'docs', '*.html')
+
+        assert run_batch_from_args(['batch-apply', script, pattern, '--workers', '1']) == 0
+        assert '处理 1 个文件, 失败 0 个' in capsys.readouterr().out
+        assert run_batch_from_args([script, os.path.join(temp_dir, 'none', '*.html')]) == 2
+        assert run_batch_from_args([script]) == 2
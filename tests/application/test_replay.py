@@ -0,0 +1,77 @@
+import os
+import pytest
+from src.application.replay import format_report, percentile, replay, run_replay_from_args
+from src.commands.base import CommandProcessor
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.io.save import SaveCommand
+from src.core.html_model import HtmlModel
+from src.io.parser import HtmlParser
+from src.io.recording import SessionRecorder
+
+PAGE = '<html><head></head><body><p id="x">hi</p></body></html>'
+
+@pytest.mark.unit
+class TestReplay:
+    """测试会话录制的重放和延迟报告"""
+
+    @pytest.fixture
+    def document(self, temp_dir):
+        path = os.path.join(temp_dir, 'doc.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(PAGE)
+        return path
+
+    def _record(self, temp_dir, document):
+        model = HtmlModel()
+        HtmlParser().parse_file(document, model)
+        processor = CommandProcessor()
+        path = os.path.join(temp_dir, 'session.replay')
+        processor.attach_recorder(SessionRecorder(path, model))
+        for i in range(10):
+            processor.execute(AppendCommand(model, 'li', f'li{i}', 'body', str(i)))
+        with processor.transaction():
+            processor.execute(EditTextCommand(model, 'x', 'bye'))
+            processor.execute(DeleteCommand(model, 'li0'))
+        processor.undo()
+        processor.redo()
+        processor.detach_recorder().close()
+        return path, SaveCommand(model, document)._generate_html()
+
+    def test_percentile_nearest_rank(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([3.0], 90) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_replay_reports_per_operation_latency(self, temp_dir, document):
+        path, _ = self._record(temp_dir, document)
+        result = replay(path, repeat=2)
+
+        assert result.failed == 0
+        assert result.replayed == 2 * 16
+        stats = {s.op: s for s in result.stats}
+        assert stats['append'].count == 20
+        assert stats['begin'].count == stats['commit'].count == 2
+        for s in result.stats:
+            assert 0 <= s.p50 <= s.p90 <= s.p99 <= s.max
+        report = format_report(result)
+        assert 'append' in report and 'p99' in report
+
+    def test_replay_reproduces_document(self, temp_dir, document):
+        """从录制的快照和命令行给出的原始文件重放，结果与录制时相同"""
+        path, expected = self._record(temp_dir, document)
+        for source in (None, document):
+            result = replay(path, source)
+            assert result.failed == 0
+            assert SaveCommand(result.model, document)._generate_html() == expected
+
+    def test_cli(self, temp_dir, document, capsys):
+        path, _ = self._record(temp_dir, document)
+        assert run_replay_from_args(['replay', path, '--repeat', '3']) == 0
+        assert 'edit-text' in capsys.readouterr().out
+        assert run_replay_from_args([path, document, '--repeat']) == 2
+        assert run_replay_from_args([os.path.join(temp_dir, 'missing.replay')]) == 2
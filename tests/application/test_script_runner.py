@@ -0,0 +1,113 @@
+import io
+import os
+import pytest
+from src.application.script_runner import (ScriptRunner, ScriptError, STOP, CONTINUE,
+                                           format_summary, run_from_args)
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestScriptRunner:
+    """测试非交互式批处理模式"""
+
+    @pytest.fixture
+    def session(self, temp_dir):
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.disable_autosave()
+        return session
+
+    def test_parse_reports_all_bad_lines(self, session):
+        """解析阶段列出所有未知命令和参数不足的行"""
+        runner = ScriptRunner(session)
+        with pytest.raises(ScriptError) as exc_info:
+            runner.parse(['# comment', '', 'bogus 1', 'append p', 'undo'])
+        message = str(exc_info.value)
+        assert '第3行' in message and '第4行' in message
+        assert '第5行' not in message
+
+    def test_run_executes_edits_quietly(self, session, temp_dir, capsys):
+        """编辑命令不产生逐条输出，结果写入文件"""
+        path = os.path.join(temp_dir, 'doc.html')
+        runner = ScriptRunner(session)
+        result = runner.run_lines([
+            f'load {path}',
+            'append p p1 body Hello world',
+            'edit-text p1 Bye',
+            'save',
+        ])
+        assert (result.executed, result.failed) == (4, 0)
+        assert capsys.readouterr().out == ''
+        with open(path, encoding='utf-8') as f:
+            assert '<p id="p1">Bye</p>' in f.read()
+
+    def test_stop_policy_halts_on_first_failure(self, session, temp_dir):
+        """stop策略在第一条失败的命令处停止"""
+        errors = io.StringIO()
+        runner = ScriptRunner(session, on_error=STOP)
+        result = runner.run_lines([
+            f"load {os.path.join(temp_dir, 'doc.html')}",
+            'delete missing',
+            'append p p1 body',
+        ], errors)
+        assert (result.executed, result.failed) == (2, 1)
+        assert result.errors[0][0] == 2
+        assert '第2行' in errors.getvalue()
+
+    def test_continue_policy_runs_remaining_lines(self, session, temp_dir):
+        """continue策略记录失败后继续执行"""
+        runner = ScriptRunner(session, on_error=CONTINUE)
+        result = runner.run_lines([
+            f"load {os.path.join(temp_dir, 'doc.html')}",
+            'delete missing',
+            'append p p1 body',
+        ], io.StringIO())
+        assert (result.executed, result.failed) == (3, 1)
+        assert session.get_active_model().find_by_id('p1') is not None
+
+    def test_invalid_policy_rejected(self, session):
+        with pytest.raises(ValueError):
+            ScriptRunner(session, on_error='ignore')
+
+    def test_run_from_stdin_with_summary(self, temp_dir, capsys):
+        """--script - 从标准输入读取脚本并输出执行摘要"""
+        path = os.path.join(temp_dir, 'doc.html')
+        script = io.StringIO(f'load {path}\nappend p p1 body\nsave\n')
+        assert run_from_args(['--script', '-'], stdin=script) == 0
+        out = capsys.readouterr().out
+        assert '执行 3 条命令, 失败 0 条' in out
+        assert '条/秒' in out
+        assert os.path.exists(path)
+
+    def test_run_from_args_exit_codes(self, temp_dir, capsys):
+        """解析失败返回2，命令失败返回1"""
+        assert run_from_args(['--script', os.path.join(temp_dir, 'missing.cmds')]) == 2
+        assert run_from_args(['--script'], stdin=io.StringIO('bogus\n')) == 2
+        assert run_from_args(['--script', '-'], stdin=io.StringIO('undo\nsave\n')) == 1
+
+    def test_batch_dispatch_delivers_events_at_end(self, temp_dir):
+        """批量分发模式下观察者事件在脚本结束时成批投递"""
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')), dispatch_mode='batch')
+        runner = ScriptRunner(session)
+        runner.run_lines([f"load {os.path.join(temp_dir, 'doc.html')}"])
+        editor = session.active_editor
+        assert editor.dispatch_mode == 'batch'
+
+        batches = []
+
+        class BatchObserver:
+            def update_batch(self, events):
+                batches.append([event_type for event_type, _ in events])
+
+        editor.processor.history.add_observer(BatchObserver())
+        result = runner.run_lines(['append p p1 body', 'append p p2 body'])
+        assert result.failed == 0
+        assert batches == [['add_command', 'add_command']]
+
+        assert runner.run_lines(['dispatch sync']).failed == 0
+        assert editor.dispatch_mode == 'sync'
+        assert runner.run_lines(['dispatch bogus']).failed == 1
+
+    def test_format_summary(self, session, temp_dir):
+        result = ScriptRunner(session).run_lines([f"load {os.path.join(temp_dir, 'doc.html')}"])
+        assert result.rate > 0
+        assert format_summary(result).startswith('执行 1 条命令, 失败 0 条')
@@ -10,6 +10,7 @@ from src.commands.edit.edit_text_command import EditTextCommand
 from src.commands.edit.delete_command import DeleteCommand
 from src.commands.edit.edit_id_command import EditIdCommand
 from src.commands.io import InitCommand, SaveCommand, ReadCommand
+from src.commands.do.checkpoints import CheckpointHistory
 from src.core.exceptions import ElementNotFoundError, DuplicateIdError, InvalidOperationError
 from src.commands.command_exceptions import CommandExecutionError, CommandParameterError
 
@@ -125,6 +126,19 @@ class TestSessionComprehensive:
             assert "testdiv" in content
             assert "Test content" in content
     
+    def test_save_as_shares_history(self, session, temp_dir):
+        """另存为时新编辑器共享活动编辑器的检查点历史，不创建或释放检查点"""
+        session.load(os.path.join(temp_dir, "original.html"))
+        session.set_checkpoints(True)
+        shared = session.active_editor.processor.checkpoints
+        
+        with patch.object(CheckpointHistory, 'close', autospec=True) as mock_close:
+            session.save(os.path.join(temp_dir, "copy.html"))
+        
+        mock_close.assert_not_called()
+        assert session.active_editor.processor.checkpoints is shared
+        assert session.active_editor.checkpoints
+    
     @patch('builtins.input', return_value='n')
     def test_close_file_no_save(self, mock_input, session, temp_dir):
         """测试关闭文件(不保存)"""
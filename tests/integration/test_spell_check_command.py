@@ -24,6 +24,10 @@ class MockErrorSpellChecker(SpellChecker):
     def check_element(self, element):
         """抛出自定义错误"""
         raise CustomSpellCheckError("模拟拼写检查错误")
+        
+    def check_texts(self, texts):
+        """抛出自定义错误"""
+        raise CustomSpellCheckError("模拟拼写检查错误")
 
 @pytest.mark.integration
 class TestSpellCheckCommand:
@@ -193,9 +197,10 @@ class TestSpellCheckCommand:
         # 手动创建一个模拟的检查器实例
         mock_checker = mock_checker_class.return_value
         
-        # 明确配置两个方法都抛出异常
+        # 明确配置所有检查方法都抛出异常
         mock_checker.check_text.side_effect = Exception("模拟拼写检查错误")
         mock_checker.check_element.side_effect = Exception("模拟拼写检查错误")
+        mock_checker.check_texts.side_effect = Exception("模拟拼写检查错误")
         
         # 显式将模拟对象传递给命令
         cmd = SpellCheckCommand(model, spell_checker=mock_checker)
@@ -0,0 +1,28 @@
+from src.commands.spellcheck.checker import SpellErrorReporter
+
+class CollectingReporter(SpellErrorReporter):
+    """记录最近一次报告的拼写错误
+
+    errors 中每个错误只保留 fields 指定的字段：一个字段时是字段值，
+    多个字段时是字段值的元组。
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields or ('wrong_word',)
+        self.errors = []
+
+    def report_errors(self, errors):
+        if len(self.fields) == 1:
+            field = self.fields[0]
+            self.errors = [getattr(error, field) for error in errors]
+        else:
+            self.errors = [tuple(getattr(error, field) for field in self.fields) for error in errors]
+
+class CountingReporter(SpellErrorReporter):
+    """累计报告的拼写错误数"""
+
+    def __init__(self):
+        self.count = 0
+
+    def report_errors(self, errors):
+        self.count += len(errors)
@@ -0,0 +1,38 @@
+import os
+import pytest
+
+from src.application.batch_apply import batch_apply, format_batch_summary, parse_batch_script
+from src.io.writer import HtmlWriter
+from tests.stress.test_serialization_scaling import build_document
+
+@pytest.mark.unit
+class TestBatchApplyScaling:
+    """多文件批量编辑的吞吐量"""
+
+    @pytest.mark.slow
+    def test_throughput_vs_workers(self, temp_dir):
+        """基准测试: 同一脚本应用到300个文件，吞吐量随进程数的变化"""
+        html = HtmlWriter().generate_html(build_document(5, 20), include_doctype=True)
+        paths = []
+        for i in range(300):
+            path = os.path.join(temp_dir, f'doc{i}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            paths.append(path)
+        steps = parse_batch_script([
+            'edit-text p0-0 updated',
+            'append div footer body footer',
+            'delete p1-1',
+            'edit-id p2-2 renamed',
+        ])
+
+        cores = os.cpu_count() or 1
+        print()
+        baseline = None
+        for workers in sorted({1, 2, cores}):
+            result = batch_apply(steps, paths, workers=workers,
+                                 output_dir=os.path.join(temp_dir, f'out{workers}'))
+            assert result.failed == 0
+            baseline = baseline or result.files_per_second
+            print(f"  {format_batch_summary(result)}, "
+                  f"加速比 {result.files_per_second / baseline:.2f}x")
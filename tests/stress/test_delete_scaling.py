@@ -0,0 +1,49 @@
+import contextlib
+import io
+import time
+import pytest
+
+from src.commands.base import CommandProcessor
+from src.commands.edit.delete_command import DeleteCommand
+from src.io.snapshot import encode_snapshot, restore_snapshot
+from tests.stress.test_serialization_scaling import build_document
+
+def _timed(operation):
+    start = time.perf_counter()
+    assert operation()
+    return time.perf_counter() - start
+
+@pytest.mark.unit
+class TestDeleteScaling:
+    """删除大子树的耗时"""
+
+    @pytest.mark.slow
+    def test_delete_and_undo_independent_of_subtree_size(self):
+        """基准测试: 删除、撤销和重做的耗时不随子树大小增长
+
+        子树的估算内存随修改即时维护，历史记录计入删除的子树是O(1)的，
+        删除、撤销和重做都只摘下或插回子树根。
+        """
+        results = []
+        for paragraphs in (100, 1000, 100000):
+            model = build_document(2, paragraphs)
+            restore_snapshot(encode_snapshot(model.root), model)
+            processor = CommandProcessor()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                first = _timed(lambda: processor.execute(DeleteCommand(model, 'section0')))
+                undo = _timed(processor.undo)
+                redo = _timed(processor.redo)
+                undo_again = _timed(processor.undo)
+
+            assert len(model.find_by_id('section0').children) == paragraphs
+            assert model.find_by_id(f'p0-{paragraphs - 1}').parent.id == 'section0'
+            results.append((paragraphs, first, undo, redo, undo_again))
+
+        for paragraphs, first, undo, redo, undo_again in results:
+            print(f"子树 {paragraphs + 1:>6} 个元素: 首次删除 {first * 1000:.3f} ms, 撤销 {undo * 1000:.3f} ms, "
+                  f"重做 {redo * 1000:.3f} ms, 再撤销 {undo_again * 1000:.3f} ms")
+        # 子树大1000倍，删除、撤销和重做的耗时不应随之增长
+        small, large = results[0], results[-1]
+        for column in (1, 2, 3, 4):
+            assert large[column] < max(0.005, small[column] * 50)
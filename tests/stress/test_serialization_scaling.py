@@ -0,0 +1,72 @@
+import os
+import time
+import pytest
+
+from src.core.html_model import HtmlModel
+from src.core.element import HtmlElement
+from src.io.writer import HtmlWriter
+
+def build_document(sections, paragraphs):
+    """直接构建大型文档（不经过命令层），body下有sections个顶层分区"""
+    model = HtmlModel()
+    body = model.find_by_id('body')
+    for i in range(sections):
+        section = HtmlElement('div', f'section{i}')
+        section.set_attribute('class', 'section')
+        body.add_child(section)
+        for j in range(paragraphs):
+            para = HtmlElement('p', f'p{i}-{j}')
+            para.text = f'Paragraph {j} of section {i} with <markup> & text'
+            section.add_child(para)
+    return model
+
+@pytest.mark.unit
+class TestParallelSerialization:
+    """并行序列化的正确性与扩展性"""
+
+    @pytest.mark.parametrize('pretty,minify', [(True, False), (False, False), (False, True)])
+    def test_parallel_output_matches_serial(self, pretty, minify):
+        """并行输出与串行输出逐字节一致"""
+        model = build_document(8, 10)
+        serial = HtmlWriter(use_cache=False).generate_html(model, pretty=pretty, minify=minify)
+        parallel = HtmlWriter(use_cache=False, workers=2).generate_html(model, pretty=pretty, minify=minify)
+        assert parallel == serial
+
+    def test_parallel_fills_fragment_cache(self):
+        """启用缓存时并行结果写入片段缓存，之后只重新生成修改过的分区"""
+        model = build_document(4, 5)
+        writer = HtmlWriter(workers=2)
+        writer.generate_html(model)
+
+        body = model.find_by_id('body')
+        assert all(child.get_fragment(('partition', True, 2)) is not None for child in body.children)
+        # 分区内的元素不单独缓存片段
+        assert body.children[0].children[0].get_fragment(('writer', True, 3)) is None
+
+        body.children[0].children[0].text = 'Changed'
+        assert 'Changed' in writer.generate_html(model)
+        assert writer.generate_html(model) == HtmlWriter(use_cache=False).generate_html(model)
+
+    @pytest.mark.slow
+    def test_serialization_scaling(self):
+        """基准测试: 并行序列化相对串行序列化的加速比"""
+        model = build_document(1000, 100)
+
+        def measure(workers):
+            writer = HtmlWriter(use_cache=False, workers=workers)
+            best, output = None, None
+            for _ in range(3):
+                start = time.perf_counter()
+                output = writer.generate_html(model)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best, output
+
+        serial, expected = measure(None)
+        print(f"\n并行序列化基准 (100000个段落, CPU核心数: {os.cpu_count()})")
+        print(f"  串行: {serial:.3f}秒")
+        max_workers = max(2, os.cpu_count() or 1)
+        for workers in [w for w in [2, 4, 8] if w <= max_workers]:
+            elapsed, output = measure(workers)
+            print(f"  进程数 {workers}: {elapsed:.3f}秒 (加速比 {serial / elapsed:.2f}x)")
+            assert output == expected
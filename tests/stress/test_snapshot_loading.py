@@ -0,0 +1,37 @@
+import os
+import time
+import pytest
+
+from src.core.html_model import HtmlModel
+from src.io.parser import HtmlParser
+from src.io.snapshot import save_snapshot, load_snapshot
+from src.io.writer import HtmlWriter
+from tests.stress.test_serialization_scaling import build_document
+
+@pytest.mark.unit
+class TestSnapshotLoading:
+    """快照加载性能"""
+
+    @pytest.mark.slow
+    def test_snapshot_vs_html_parse(self, temp_dir):
+        """基准测试: 快照加载与HTML解析的耗时对比"""
+        model = build_document(100, 100)
+        html_path = os.path.join(temp_dir, 'large.html')
+        snap_path = os.path.join(temp_dir, 'large.snap')
+        HtmlWriter().write_to_file(model, html_path)
+        save_snapshot(model, snap_path)
+
+        start = time.perf_counter()
+        HtmlParser().parse_file(html_path, HtmlModel())
+        parse_time = time.perf_counter() - start
+
+        restored = HtmlModel()
+        start = time.perf_counter()
+        load_snapshot(snap_path, restored)
+        load_time = time.perf_counter() - start
+
+        print(f"\n10000个段落: HTML解析 {parse_time:.3f}秒 "
+              f"({os.path.getsize(html_path)} 字节), 快照加载 {load_time:.3f}秒 "
+              f"({os.path.getsize(snap_path)} 字节)")
+        assert len(restored._id_map) == 3 + 100 + 100 * 100
+        assert load_time < parse_time
@@ -0,0 +1,177 @@
+import contextlib
+import io
+import time
+import pytest
+
+from src.commands.base import CommandProcessor
+from src.commands.display.spell_check import SpellCheckCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.spellcheck.cache import WordCache
+from src.commands.spellcheck.checker import SpellChecker
+from src.core.element import HtmlElement
+from src.core.html_model import HtmlModel
+from tests.mocks.spell_reporters import CountingReporter
+
+def build_text_document(paragraphs):
+    """构建有大量重复拼写错误（产品名、常见笔误）的文档"""
+    model = HtmlModel()
+    body = model.find_by_id('body')
+    for i in range(paragraphs):
+        para = HtmlElement('p', f'p{i}')
+        para.text = f'The zorblax widgt number {i} is recieved by the team'
+        body.add_child(para)
+        model._register_id(para)
+    return model
+
+def run_spell_check(model, checker):
+    reporter = CountingReporter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        assert SpellCheckCommand(model, spell_checker=checker, reporter=reporter).execute()
+        return time.perf_counter() - start, reporter.count
+
+@pytest.mark.unit
+class TestSpellCheckScaling:
+    """拼写检查的耗时（只报告耗时，断言只检查结果）"""
+
+    @pytest.mark.slow
+    def test_word_cache_across_commands(self):
+        """基准测试: 共享缓存使重复的拼写错误只生成一次建议，再次检查时全部命中"""
+        checker = SpellChecker(cache=WordCache())
+        cold, errors = run_spell_check(build_text_document(2000), checker)
+        # 新文档没有元素级的缓存结果，只能命中单词缓存
+        warm, warm_errors = run_spell_check(build_text_document(2000), SpellChecker(cache=checker.cache))
+        print(f"2000段落, {errors} 个错误: 首次 {cold:.3f} s, 缓存命中后 {warm:.3f} s, "
+              f"命中率 {checker.cache.stats()['hit_rate']:.1%}")
+        assert warm_errors == errors == 2000 * 3
+        assert checker.cache.stats()['hit_rate'] > 0
+
+    @pytest.mark.slow
+    def test_recheck_after_small_edit(self):
+        """基准测试: 50000段落的文档修改一个段落后再次检查只需毫秒级"""
+        model = build_text_document(50000)
+        checker = SpellChecker(cache=WordCache())
+        full, errors = run_spell_check(model, checker)
+        with contextlib.redirect_stdout(io.StringIO()):
+            CommandProcessor().execute(EditTextCommand(model, 'p25000', 'a single tyypo'))
+        again, again_errors = run_spell_check(model, checker)
+        print(f"50000段落: 完整检查 {full:.3f} s, 修改一个段落后 {again * 1000:.1f} ms")
+        assert again_errors == errors - 3 + 1
+
+    @pytest.mark.slow
+    def test_parallel_scaling(self):
+        """基准测试: 不同单词很多的文档在1/2/4个进程中判断单词的耗时"""
+        import random
+        from src.commands.spellcheck.checker import PySpellChecker
+        rng = random.Random(0)
+        words = sorted(word for word in PySpellChecker().word_frequency.keys() if word.isalpha() and len(word) > 5)
+        model = HtmlModel()
+        body = model.find_by_id('body')
+        for i in range(2000):
+            # 每段两个随机笔误（删除一个字母）
+            typos = []
+            for word in rng.sample(words, 2):
+                cut = rng.randrange(len(word))
+                typos.append(word[:cut] + word[cut + 1:])
+            para = HtmlElement('p', f'p{i}')
+            para.text = ' '.join(['the', typos[0], 'and', typos[1], 'again'])
+            body.add_child(para)
+            model._register_id(para)
+
+        results = {}
+        for workers in (None, 2, 4):
+            checker = SpellChecker(cache=WordCache())
+            reporter = CountingReporter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                SpellCheckCommand(model, spell_checker=checker, reporter=reporter, workers=workers).execute()
+                results[workers or 1] = (time.perf_counter() - start, reporter.count)
+            # 清除元素级的缓存结果，下一轮重新检查
+            for element in body.children:
+                element.invalidate_fragments()
+        for workers, (elapsed, count) in results.items():
+            print(f"{workers} 个进程: {elapsed:.3f} s, {count} 个错误")
+        assert len({count for _, count in results.values()}) == 1
+
+    @pytest.mark.slow
+    def test_checker_construction(self):
+        """基准测试: 创建拼写检查器的耗时，预编译词典 vs pyspellchecker + 字典文件"""
+        SpellChecker(cache=WordCache())  # 确保编译词典已存在
+        timings, verdicts = {}, {}
+        for compiled in (True, False):
+            start = time.perf_counter()
+            for _ in range(10):
+                checker = SpellChecker(cache=WordCache(), compiled=compiled)
+            timings[compiled] = (time.perf_counter() - start) / 10
+            verdicts[compiled] = [error.wrong_word for error in checker.check_text(
+                "The zorblax widgt is recieved by the team")]
+        print(f"创建拼写检查器: 预编译词典 {timings[True] * 1000:.2f} ms, "
+              f"pyspellchecker {timings[False] * 1000:.2f} ms")
+        assert verdicts[True] == verdicts[False]
+
+    @pytest.mark.slow
+    def test_suggestion_engines(self):
+        """基准测试: 两种建议引擎每秒生成的建议数，以及建议列表的一致程度"""
+        import random
+        from src.commands.spellcheck.compiled import load_dictionary
+        rng = random.Random(0)
+        dictionary = load_dictionary('en', None)
+        words = [word for word in dictionary.words() if word.isalpha() and len(word) > 3]
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        typos = []
+        for word in rng.sample(words, 50):
+            # 一到两处随机编辑（删除、替换、插入、交换）
+            for _ in range(rng.choice((1, 1, 2))):
+                k = rng.randrange(len(word) - 1)
+                word = rng.choice((word[:k] + word[k + 1:],
+                                   word[:k] + rng.choice(letters) + word[k + 1:],
+                                   word[:k] + rng.choice(letters) + word[k:],
+                                   word[:k] + word[k + 1] + word[k] + word[k + 2:]))
+            typos.append(word)
+
+        results = {}
+        for engine in SpellChecker.ENGINES:
+            checker = SpellChecker(cache=WordCache(), engine=engine)
+            checker.get_correction('widgt')  # 预先加载删除索引
+            start = time.perf_counter()
+            verdicts = checker._resolve(typos)
+            results[engine] = (time.perf_counter() - start, verdicts)
+        misspelled = [word for word in typos if results['edits'][1][word] is not True]
+        same = sum(results['edits'][1][word] == results['symspell'][1][word] for word in misspelled)
+        same_sets = sum(set(results['edits'][1][word]) == set(results['symspell'][1][word])
+                        for word in misspelled)
+        for engine, (elapsed, _) in results.items():
+            print(f"{engine}: {len(typos) / elapsed:.1f} 个/秒")
+        print(f"{len(misspelled)} 个拼写错误: 候选词相同 {same_sets}, 建议列表（含顺序）相同 {same}")
+        # 候选词集合总是相同；顺序只在优先变音符号不同的候选词时可能不同
+        assert same_sets == len(misspelled)
+        assert same >= len(misspelled) * 0.95
+
+    @pytest.mark.slow
+    def test_batched_short_texts(self):
+        """基准测试: 大量很短的列表项，批量检查 vs 逐个元素检查"""
+        class PerElementChecker(SpellChecker):
+            # 逐个文本调用 check_text，每个文本单独切分和判断
+            def check_texts(self, texts):
+                return [self.check_text(text) for text in texts]
+
+        def build():
+            model = HtmlModel()
+            body = model.find_by_id('body')
+            for i in range(50000):
+                item = HtmlElement('li', f'li{i}')
+                # 每50项有一个拼写错误
+                item.text = 'teh entry' if i % 50 == 0 else ('item one', 'cell value', 'note', 'the total')[i % 4]
+                body.add_child(item)
+                model._register_id(item)
+            return model
+
+        cache = WordCache()
+        results = {}
+        for name, checker_class in (('逐个元素', PerElementChecker), ('批量', SpellChecker)):
+            checker = checker_class(cache=cache)
+            run_spell_check(build(), checker)  # 预热单词缓存，只比较切分和分发的开销
+            results[name] = run_spell_check(build(), checker)
+        for name, (elapsed, errors) in results.items():
+            print(f"50000个列表项 {name}: {elapsed * 1000:.1f} ms, {errors} 个错误")
+        assert results['批量'][1] == results['逐个元素'][1]
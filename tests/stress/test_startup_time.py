@@ -0,0 +1,39 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+def _cold_start(code, runs=5):
+    """在新的解释器中执行代码，返回多次运行的耗时中位数(秒)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+@pytest.mark.unit
+class TestStartupTime:
+    """启动耗时"""
+
+    @pytest.mark.slow
+    def test_cold_start_to_first_prompt(self):
+        """基准测试: 从启动解释器到显示第一个提示符，与预先导入全部命令的对比"""
+        baseline = _cold_start("pass")
+        # 交互模式: 导入run.py并构造Application，即run()显示提示符之前的全部工作
+        prompt = _cold_start("import run; run.Application()")
+        script = _cold_start("from src.application.script_runner import run_from_args; "
+                             "import io; run_from_args(['--script', '-'], stdin=io.StringIO(''))")
+        eager = _cold_start("import run; from src.commands.registry import COMMANDS; "
+                            "[COMMANDS.resolve(name) for name in COMMANDS.names()]; "
+                            "import src.io.parser")
+
+        print(f"\n冷启动耗时 (中位数): 空解释器 {baseline * 1000:.0f} ms, "
+              f"到第一个提示符 {prompt * 1000:.0f} ms, 空脚本 {script * 1000:.0f} ms, "
+              f"预先导入全部命令 {eager * 1000:.0f} ms")
+        assert prompt < eager
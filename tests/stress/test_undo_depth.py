@@ -0,0 +1,47 @@
+import contextlib
+import io
+import time
+import pytest
+
+from src.commands.base import CommandProcessor
+from src.commands.do.checkpoints import CheckpointHistory
+from src.commands.do.history import CommandHistory
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.io.snapshot import encode_snapshot, restore_snapshot
+from tests.stress.test_serialization_scaling import build_document
+
+@pytest.mark.unit
+class TestUndoDepth:
+    """检查点撤销的延迟与深度"""
+
+    @pytest.mark.slow
+    def test_undo_latency_vs_depth(self):
+        """基准测试: 活动历史只有100条时，撤销延迟随深度的变化"""
+        model = build_document(20, 50)
+        # 通过快照重建以注册所有ID
+        restore_snapshot(encode_snapshot(model.root), model)
+
+        processor = CommandProcessor()
+        processor.history = CommandHistory(max_history=100)
+        processor.attach_checkpoints(CheckpointHistory(model))
+
+        total = 2000
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(total):
+                processor.execute(EditTextCommand(model, f'p{i % 20}-{i % 50}', f'edit {i}'))
+
+        latencies = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(total):
+                start = time.perf_counter()
+                assert processor.undo()
+                latencies.append(time.perf_counter() - start)
+
+        stats = processor.checkpoints.stats()
+        print(f"\n撤销延迟 (1000个段落, {total}条命令, 活动历史100条, "
+              f"检查点 {stats['checkpoints']} 个 / {stats['checkpoint_bytes'] // 1024} KB)")
+        for depth in (1, 10, 100, 101, 500, 1000, 2000):
+            print(f"  深度 {depth:5d}: {latencies[depth - 1] * 1000:.2f} ms")
+
+        assert model.find_by_id('p0-0').text.startswith('Paragraph 0')
+        assert stats['checkpoints'] <= CheckpointHistory.DEFAULT_MAX_CHECKPOINTS
@@ -378,6 +378,25 @@ def test_run_unknown_command(app_fixture):
     app_fixture['parser'].parse.assert_called_once_with("unknowncommand")
     assert "未知命令" in output
 
+@pytest.mark.system
+def test_dispatch_table_handlers_exist():
+    """Test that every command in the dispatch table has a handler method"""
+    for name, (handler, min_args, max_args) in Application._HANDLERS.items():
+        assert callable(getattr(Application, handler)), name
+        assert max_args is None or max_args >= min_args
+    assert Application._EDITOR_COMMANDS <= set(Application._HANDLERS)
+
+@pytest.mark.system
+def test_dispatch_falls_back_to_parser_on_wrong_arity(app_fixture):
+    """Test that a table command with the wrong argument count goes to the parser"""
+    app = app_fixture['app']
+    app_fixture['parser'].parse.return_value = None
+    
+    output = run_app_with_inputs(app, ["journal on extra", "exit", "y"])
+    app_fixture['session_manager'].set_journal_mode.assert_not_called()
+    app_fixture['parser'].parse.assert_called_once_with("journal on extra")
+    assert "未知命令" in output
+
 @pytest.mark.system
 def test_run_processor_commands(app_fixture):
     """Test commands handled by the old processor"""
@@ -0,0 +1,124 @@
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.do.checkpoints import CheckpointHistory
+from src.commands.do.history import CommandHistory
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.core.html_model import HtmlModel
+from src.io.writer import HtmlWriter
+
+def render(model):
+    return HtmlWriter(use_cache=False).generate_html(model)
+
+@pytest.mark.unit
+class TestCheckpointHistory:
+    """测试检查点+重放的深度撤销"""
+
+    @pytest.fixture
+    def model(self):
+        return HtmlModel()
+
+    @pytest.fixture
+    def processor(self, model):
+        processor = CommandProcessor()
+        # 活动历史只保留3条，更早的撤销必须走检查点
+        processor.history = CommandHistory(max_history=3)
+        processor.attach_checkpoints(CheckpointHistory(model, interval=4))
+        return processor
+
+    def _run_edits(self, model, processor, count):
+        """执行一系列编辑，返回每一步之后的文档状态"""
+        states = [render(model)]
+        for i in range(count):
+            if i % 3 == 0:
+                command = AppendCommand(model, 'p', f'p{i}', 'body', f'text {i}')
+            elif i % 3 == 1:
+                command = EditTextCommand(model, f'p{i - 1}', f'edited {i}')
+            else:
+                command = DeleteCommand(model, f'p{i - 2}')
+            assert processor.execute(command)
+            states.append(render(model))
+        return states
+
+    def test_undo_beyond_live_history(self, model, processor):
+        """撤销深度不受活动历史长度限制，每一步都回到正确状态"""
+        states = self._run_edits(model, processor, 20)
+        assert len(processor.history) == 3
+
+        for expected in reversed(states[:-1]):
+            assert processor.undo()
+            assert render(model) == expected
+        assert not processor.undo()
+        assert processor.checkpoints.restores > 0
+
+    def test_redo_after_deep_undo(self, model, processor):
+        """通过检查点撤销后可以连续重做回最新状态"""
+        states = self._run_edits(model, processor, 12)
+        for _ in range(12):
+            processor.undo()
+
+        for expected in states[1:]:
+            assert processor.redo()
+            assert render(model) == expected
+        assert not processor.redo()
+
+    def test_new_command_truncates_timeline(self, model, processor):
+        """深度撤销后执行新命令，之后的时间线被丢弃"""
+        states = self._run_edits(model, processor, 12)
+        for _ in range(8):
+            processor.undo()
+        processor.execute(AppendCommand(model, 'div', 'fresh', 'body'))
+
+        assert not processor.redo()
+        assert processor.checkpoints.position == len(processor.checkpoints.records) == 5
+        processor.undo()
+        assert render(model) == states[4]
+
+    def test_checkpoint_count_is_bounded(self, model):
+        """检查点数量不超过上限"""
+        processor = CommandProcessor()
+        processor.attach_checkpoints(CheckpointHistory(model, interval=1, max_checkpoints=8))
+        for i in range(100):
+            processor.execute(AppendCommand(model, 'p', f'p{i}', 'body'))
+
+        assert len(processor.checkpoints.checkpoints) <= 8
+        assert 0 in processor.checkpoints.checkpoints
+
+    def test_clear_history_resets_baseline(self, model, processor):
+        """清空历史后不能撤销到之前的状态"""
+        self._run_edits(model, processor, 6)
+        processor.clear_history()
+        assert not processor.undo()
+
+    def test_baseline_taken_before_first_edit(self, model, processor):
+        """清空历史时不拍快照，基准在下一条命令修改模型之前拍摄"""
+        self._run_edits(model, processor, 6)
+        processor.clear_history()
+        assert processor.checkpoints.checkpoints == {}
+
+        before = render(model)
+        self._run_edits(model, processor, 6)
+        for _ in range(6):
+            assert processor.undo()
+        assert render(model) == before
+
+    def test_interval_scales_with_document_size(self, model):
+        """文档越大，拍检查点的间隔越长"""
+        processor = CommandProcessor()
+        processor.attach_checkpoints(CheckpointHistory(model, interval=1))
+        processor.execute(AppendCommand(model, 'p', 'big', 'body', 'x' * CheckpointHistory.SCALE_BYTES))
+        processor.execute(AppendCommand(model, 'p', 'small', 'body'))
+        # 基准快照只有几百字节，第一条命令后按原间隔拍检查点；之后的快照超过SCALE_BYTES，间隔加倍
+        assert sorted(processor.checkpoints.checkpoints) == [0, 1]
+        processor.execute(AppendCommand(model, 'p', 'third', 'body'))
+        assert sorted(processor.checkpoints.checkpoints) == [0, 1, 3]
+
+    def test_consecutive_redos(self, model):
+        """连续多次重做（不依赖检查点）"""
+        processor = CommandProcessor()
+        processor.execute(AppendCommand(model, 'p', 'a', 'body'))
+        processor.execute(AppendCommand(model, 'p', 'b', 'body'))
+        assert processor.undo() and processor.undo()
+        assert processor.redo() and processor.redo()
+        assert [child.id for child in model.find_by_id('body').children] == ['a', 'b']
@@ -0,0 +1,103 @@
+import os
+import pytest
+
+from src.commands.spellcheck.checker import PySpellChecker, SpellChecker
+from src.commands.spellcheck.compiled import (CompiledDictionary, CompiledSpeller, cache_directory,
+                                              compile_dictionary, load_dictionary, source_signature)
+
+@pytest.mark.unit
+class TestCompiledDictionary:
+    """测试预编译的内存映射词典"""
+
+    def test_lookup(self, temp_dir):
+        path = os.path.join(temp_dir, 'words.dict')
+        compile_dictionary(path, {'apple': 3, 'banana': 5, 'café': 1}, {'source': 1})
+        compiled = CompiledDictionary(path)
+        try:
+            assert len(compiled) == 3
+            assert 'banana' in compiled and 'cherry' not in compiled
+            assert compiled.frequency('café') == 1
+            assert compiled.frequency('cherry') == 0
+            assert list(compiled.words()) == ['apple', 'banana', 'café']
+            assert compiled.signature == {'source': 1}
+            assert compiled.total_words == 9 and compiled.longest_word_length == 6
+            assert 'é' in compiled.letters
+        finally:
+            compiled.close()
+
+    def test_invalid_file(self, temp_dir):
+        path = os.path.join(temp_dir, 'broken.dict')
+        with open(path, 'wb') as f:
+            f.write(b'not a dictionary file at all')
+        with pytest.raises(ValueError):
+            CompiledDictionary(path)
+
+    def test_rebuild_when_source_changes(self, temp_dir):
+        source = os.path.join(temp_dir, 'dictionary.txt')
+        path = os.path.join(temp_dir, 'en.dict')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('zorblax\n')
+        assert 'zorblax' in load_dictionary('en', source, path)
+        # 修改字典文件后签名改变，重新编译
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('zorblax\nwidgt\n')
+        os.utime(source, ns=(1, 1))
+        compiled = load_dictionary('en', source, path)
+        assert 'widgt' in compiled and 'zorblax' in compiled
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason="需要POSIX权限")
+    def test_cache_directory_is_private(self, temp_dir, monkeypatch):
+        monkeypatch.setenv('XDG_CACHE_HOME', temp_dir)
+        directory = cache_directory()
+        assert directory == os.path.join(temp_dir, 'html-editor')
+        assert os.stat(directory).st_mode & 0o077 == 0
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason="需要POSIX权限")
+    def test_writable_by_others_is_rebuilt(self, temp_dir):
+        """他人可写的文件可能被替换过，不使用而是重新编译"""
+        source = os.path.join(temp_dir, 'dictionary.txt')
+        path = os.path.join(temp_dir, 'planted.dict')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('zorblax\n')
+        compile_dictionary(path, {'qzvplanted': 1}, source_signature('en', source))
+        os.chmod(path, 0o666)
+
+        compiled = load_dictionary('en', source, path)
+        assert 'qzvplanted' not in compiled and 'zorblax' in compiled
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+@pytest.fixture(scope='module')
+def spellers():
+    return CompiledSpeller(load_dictionary('en', None)), PySpellChecker()
+
+@pytest.mark.unit
+class TestCompiledSpeller:
+    """测试编译词典的拼写判断与 pyspellchecker 一致"""
+
+    @pytest.mark.parametrize('word', ['recieved', 'widgt', 'teh', 'acommodate', 'hello'])
+    def test_same_results(self, spellers, word):
+        compiled, reference = spellers
+        assert compiled.candidates(word) == reference.candidates(word)
+        assert compiled.correction(word) == reference.correction(word)
+        assert compiled[word] == reference.word_frequency[word]
+
+    def test_unknown_and_known(self, spellers):
+        compiled, reference = spellers
+        words = ['The', 'quick', 'brwn', 'fox', '42', 'zorblax']
+        assert compiled.unknown(words) == reference.unknown(words)
+        assert compiled.known(words) == reference.known(words)
+
+    def test_added_words_stay_private(self):
+        dictionary = load_dictionary('en', None)
+        first, second = CompiledSpeller(dictionary), CompiledSpeller(dictionary)
+        first.word_frequency.load_words(['Zorblax'])
+        assert 'zorblax' in first and 'zorblax' not in second
+        assert first.unknown(['zorblax']) == set()
+
+    def test_spell_checker_uses_compiled_dictionary(self):
+        checker = SpellChecker()
+        assert isinstance(checker.checker, CompiledSpeller)
+        assert [error.wrong_word for error in checker.check_text('the zorblax')] == ['zorblax']
+        checker.add_word('zorblax')
+        assert checker.check_text('the zorblax') == []
+        assert isinstance(SpellChecker(compiled=False).checker, PySpellChecker)
@@ -148,4 +148,40 @@ class TestDeleteCommand:
         assert model.find_by_id('test-p') is not None
         
         processor.undo()  # 撤销删除test-div
-        assert model.find_by_id('test-div') is not None
\ No newline at end of file
+        assert model.find_by_id('test-div') is not None
+        
+    def test_undo_restores_subtree_in_place(self, model, processor, setup_elements):
+        """撤销删除后子树完整，并回到原来的位置"""
+        body = model.find_by_id('body')
+        before = [child.id for child in body.children]
+        processor.execute(DeleteCommand(model, 'test-div'))
+        processor.undo()
+
+        assert [child.id for child in body.children] == before
+        div = model.find_by_id('test-div')
+        assert [child.id for child in div.children] == ['test-span']
+        assert model.find_by_id('test-span').parent is div
+
+    def test_deleted_id_can_be_reused(self, model, processor, setup_elements):
+        """已删除子树中的ID可以重新使用，撤销后恢复原元素"""
+        span = model.find_by_id('test-span')
+        processor.execute(DeleteCommand(model, 'test-div'))
+        assert not model.has_id('test-span')
+        processor.execute(AppendCommand(model, 'span', 'test-span', 'body'))
+        assert model.find_by_id('test-span') is not span
+
+        processor.undo()
+        processor.undo()
+        assert model.find_by_id('test-span') is span
+
+    def test_abandoned_subtree_ids_swept(self, model, setup_elements):
+        """删除命令被丢弃后，残留的ID被清理"""
+        processor = CommandProcessor()
+        processor.execute(DeleteCommand(model, 'test-div'))
+        assert 'test-span' in model._id_map
+        processor.clear_history()
+
+        assert model.sweep_tombstones() == 2
+        assert 'test-span' not in model._id_map
+        assert 'test-div' not in model._id_map
+        assert model.find_by_id('test-p') is not None
@@ -0,0 +1,127 @@
+import threading
+import time
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.dispatch import EventDispatcher, BATCH, ASYNC, DROP_OLDEST, DROP_NEWEST
+from src.commands.edit.append_command import AppendCommand
+from src.commands.observer import Observer
+from src.core.html_model import HtmlModel
+
+class RecordingObserver(Observer):
+    def __init__(self, delay=0.0):
+        self.events = []
+        self.batches = 0
+        self.delay = delay
+        self.threads = set()
+
+    def update(self, event_type, data=None):
+        self.events.append(event_type)
+
+    def update_batch(self, events):
+        self.batches += 1
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        super().update_batch(events)
+
+class PlainObserver:
+    """只实现update的观察者"""
+    def __init__(self):
+        self.events = []
+
+    def update(self, event_type, data=None):
+        self.events.append(event_type)
+
+@pytest.mark.unit
+class TestEventDispatch:
+    """测试观察者事件的批量与异步分发"""
+
+    @pytest.fixture
+    def model(self):
+        return HtmlModel()
+
+    def _append(self, processor, model, count):
+        for i in range(count):
+            processor.execute(AppendCommand(model, 'p', f'p{i}', 'body'))
+
+    def test_batch_mode_delivers_on_flush(self, model):
+        """批量模式下事件在flush时合并为一批投递"""
+        processor = CommandProcessor()
+        observer = RecordingObserver()
+        processor.add_observer(observer)
+        processor.set_dispatch_mode(BATCH)
+
+        self._append(processor, model, 5)
+        assert observer.events == []
+        assert processor.flush_events() == 5
+        assert observer.events == ['add_command'] * 5
+        assert observer.batches == 1
+
+    def test_batch_mode_delivers_at_commit(self, model):
+        """批量模式下顶层事务提交时投递"""
+        processor = CommandProcessor()
+        observer = PlainObserver()
+        processor.add_observer(observer)
+        processor.set_dispatch_mode(BATCH)
+
+        with processor.transaction():
+            self._append(processor, model, 3)
+        assert observer.events == ['add_command']
+
+    def test_batch_size_triggers_delivery(self, model):
+        processor = CommandProcessor()
+        observer = PlainObserver()
+        processor.add_observer(observer)
+        processor.set_dispatch_mode(BATCH, batch_size=4)
+
+        self._append(processor, model, 5)
+        assert len(observer.events) == 4
+        processor.flush_events()
+        assert len(observer.events) == 5
+
+    def test_async_mode_keeps_slow_observer_off_command_path(self, model):
+        """异步模式下慢观察者不增加命令延迟，事件按顺序送达"""
+        processor = CommandProcessor()
+        observer = RecordingObserver(delay=0.05)
+        processor.add_observer(observer)
+        dispatcher = processor.set_dispatch_mode(ASYNC, interval=0.01)
+
+        start = time.perf_counter()
+        self._append(processor, model, 20)
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.05
+
+        assert dispatcher.drain(timeout=5)
+        assert observer.events == ['add_command'] * 20
+        assert threading.get_ident() not in observer.threads
+        dispatcher.close()
+
+    @pytest.mark.parametrize('overflow, expected', [
+        (DROP_OLDEST, ['e2', 'e3', 'e4']),
+        (DROP_NEWEST, ['e0', 'e1', 'e2']),
+    ])
+    def test_overflow_policies(self, overflow, expected):
+        """队列满时按背压策略丢弃事件"""
+        observer = PlainObserver()
+        dispatcher = EventDispatcher(BATCH, max_pending=3, overflow=overflow, batch_size=100)
+        for i in range(5):
+            dispatcher.dispatch([observer], f'e{i}')
+        dispatcher.flush()
+        assert observer.events == expected
+        assert dispatcher.dropped == 2
+
+    def test_observer_errors_do_not_stop_delivery(self):
+        class Failing:
+            def update(self, event_type, data=None):
+                raise RuntimeError("boom")
+
+        observer = PlainObserver()
+        dispatcher = EventDispatcher(BATCH)
+        dispatcher.dispatch([Failing(), observer], 'x')
+        assert dispatcher.flush() == 2
+        assert observer.events == ['x']
+
+    def test_invalid_options_rejected(self):
+        with pytest.raises(ValueError):
+            EventDispatcher('later')
+        with pytest.raises(ValueError):
+            EventDispatcher(BATCH, overflow='explode')
@@ -0,0 +1,98 @@
+import os
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_id_command import EditIdCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.core.exceptions import ElementNotFoundError
+from src.core.html_model import HtmlModel
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestHistoryCoalescing:
+    """测试连续编辑合并为一条历史记录"""
+
+    @pytest.fixture
+    def model(self):
+        return HtmlModel()
+
+    @pytest.fixture
+    def processor(self, model):
+        processor = CommandProcessor()
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body', 'start'))
+        processor.execute(AppendCommand(model, 'p', 'p2', 'body', 'other'))
+        processor.history.coalesce_window = 60
+        return processor
+
+    def test_text_edits_merge_into_one_entry(self, model, processor):
+        """同一元素的连续文本编辑只占一条记录，撤销回到编辑前"""
+        for text in ('s', 'st', 'sta', 'star'):
+            processor.execute(EditTextCommand(model, 'p1', text))
+
+        assert len(processor.history) == 3
+        assert processor.history.stats()['coalesced'] == 3
+        assert processor.undo()
+        assert model.find_by_id('p1').text == 'start'
+        assert processor.redo()
+        assert model.find_by_id('p1').text == 'star'
+
+    def test_different_elements_not_merged(self, model, processor):
+        """不同元素或不同类型的命令不合并"""
+        processor.execute(EditTextCommand(model, 'p1', 'a'))
+        processor.execute(EditTextCommand(model, 'p2', 'b'))
+        processor.execute(EditIdCommand(model, 'p2', 'q2'))
+        assert len(processor.history) == 5
+
+    def test_id_chain_merges(self, model, processor):
+        """a->b, b->c 合并为 a->c"""
+        processor.execute(EditIdCommand(model, 'p1', 'x'))
+        processor.execute(EditIdCommand(model, 'x', 'y'))
+        assert len(processor.history) == 3
+
+        assert processor.undo()
+        assert model.find_by_id('p1').text == 'start'
+        with pytest.raises(ElementNotFoundError):
+            model.find_by_id('x')
+
+    def test_window_expired_not_merged(self, model, processor):
+        """超过时间窗口的编辑单独记录"""
+        processor.history.coalesce_window = 0.01
+        processor.execute(EditTextCommand(model, 'p1', 'a'))
+        processor.history._last_added_at -= 1
+        processor.execute(EditTextCommand(model, 'p1', 'b'))
+        assert len(processor.history) == 4
+
+    def test_no_merge_across_undo(self, model, processor):
+        """撤销之后的新编辑不会合并进更早的记录"""
+        processor.execute(EditTextCommand(model, 'p1', 'a'))
+        processor.execute(EditTextCommand(model, 'p2', 'b'))
+        processor.undo()
+        processor.execute(EditTextCommand(model, 'p1', 'c'))
+
+        assert len(processor.history) == 4
+        assert processor.undo()
+        assert model.find_by_id('p1').text == 'a'
+
+    def test_journal_replay_keeps_merge_boundaries(self, temp_dir):
+        """日志重放后撤销粒度与原会话一致"""
+        path = os.path.join(temp_dir, 'doc.html')
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(path)
+        session.set_coalesce(True)
+        model = session.get_active_model()
+        session.execute_command(AppendCommand(model, 'p', 'p1', 'body', 'x'))
+        session.save()
+        session.set_journal_mode(True)
+
+        session.execute_command(EditTextCommand(model, 'p1', 'a'))
+        session.active_editor.processor.history._last_added_at -= 10
+        session.execute_command(EditTextCommand(model, 'p1', 'b'))
+        session.execute_command(EditTextCommand(model, 'p1', 'c'))
+        session.active_editor.journal_mode = False
+
+        reopened = SessionManager(SessionState(os.path.join(temp_dir, 'other.json')))
+        reopened.load(path)
+        assert len(reopened.active_editor.processor.history) == 2
+        reopened.undo()
+        assert reopened.get_active_model().find_by_id('p1').text == 'a'
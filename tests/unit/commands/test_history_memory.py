@@ -0,0 +1,101 @@
+import os
+import pytest
+from src.commands.base import Command, CommandProcessor
+from src.commands.do.history import CommandHistory
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.core.element import HtmlElement
+from src.core.html_model import HtmlModel
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+class SizedCommand(Command):
+    """估算大小固定的模拟命令"""
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def execute(self):
+        return True
+
+    def undo(self):
+        return True
+
+    def size_hint(self):
+        return self.size
+
+@pytest.mark.unit
+class TestHistoryMemoryBudget:
+    """测试按内存限制淘汰历史记录"""
+
+    def test_tracks_memory_usage(self):
+        """添加和弹出命令时更新内存统计"""
+        history = CommandHistory()
+        history.add_command(SizedCommand(100))
+        history.add_command(SizedCommand(50))
+        assert history.memory_usage == 150
+
+        history.pop_last_command()
+        assert history.memory_usage == 100
+        history.clear()
+        assert history.memory_usage == 0
+
+    def test_evicts_oldest_over_budget(self):
+        """超过内存上限时淘汰最旧的命令"""
+        history = CommandHistory(max_memory=250)
+        commands = [SizedCommand(100) for _ in range(4)]
+        for command in commands:
+            history.add_command(command)
+
+        assert list(history.history) == commands[2:]
+        assert history.memory_usage == 200
+        assert history.stats()['evicted'] == 2
+
+    def test_keeps_newest_command_even_if_too_large(self):
+        """单条命令超过上限时仍保留，保证刚执行的操作可以撤销"""
+        history = CommandHistory(max_memory=100)
+        history.add_command(SizedCommand(10))
+        big = SizedCommand(1000)
+        history.add_command(big)
+
+        assert list(history.history) == [big]
+
+    def test_delete_hint_includes_deleted_element(self):
+        """删除命令的估算大小包含为撤销而保留的元素"""
+        model = HtmlModel()
+        body = model.find_by_id('body')
+        for element_id, size in (('small', 1), ('large', 100000)):
+            element = HtmlElement('div', element_id)
+            element.text = 'x' * size
+            body.add_child(element)
+            model._register_id(element)
+
+        delete_small = DeleteCommand(model, 'small')
+        delete_large = DeleteCommand(model, 'large')
+        delete_small.execute()
+        delete_large.execute()
+        assert delete_large.size_hint() - delete_small.size_hint() >= 99999
+
+    def test_edit_text_hint_counts_strings(self):
+        """文本编辑命令的估算大小随文本长度增长"""
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body', 'x'))
+        short = EditTextCommand(model, 'p1', 'y')
+        long = EditTextCommand(model, 'p1', 'z' * 10000)
+        assert long.size_hint() - short.size_hint() >= 9999
+
+    def test_history_stats_command(self, temp_dir, capsys):
+        """history-stats 显示当前历史的内存占用"""
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(os.path.join(temp_dir, 'doc.html'))
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body', 'Hi'))
+
+        stats = session.history_stats()
+        assert stats['commands'] == 1
+        assert stats['memory'] > 0
+
+        capsys.readouterr()
+        session.show_history_stats()
+        assert '估算内存' in capsys.readouterr().out
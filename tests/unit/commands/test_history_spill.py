@@ -0,0 +1,163 @@
+import os
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.do.checkpoints import CheckpointHistory
+from src.commands.do.history import CommandHistory
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.core.html_model import HtmlModel
+from src.io.spill import SpillFile
+from src.io.writer import HtmlWriter
+from src.session.session_manager import Editor, SessionManager
+from src.session.state.session_state import SessionState
+
+def render(model):
+    return HtmlWriter(use_cache=False).generate_html(model)
+
+@pytest.mark.unit
+class TestHistorySpill:
+    """测试撤销历史换出到磁盘"""
+
+    def test_spill_file_roundtrip(self, temp_dir):
+        """写入的数据可以按引用读回，重置后重新开始"""
+        spill = SpillFile(temp_dir)
+        first = spill.put(b'hello')
+        second = spill.put(b'world!')
+        assert spill.get(second) == b'world!'
+        assert spill.get(first) == b'hello'
+        assert spill.size == 11
+
+        spill.reset()
+        assert spill.size == 0
+        assert spill.get(spill.put(b'again')) == b'again'
+        spill.close()
+
+    def test_spill_file_compacts_discarded_space(self, temp_dir):
+        """丢弃的字节超过使用中的字节时压缩文件，引用保持有效"""
+        spill = SpillFile(temp_dir, compact_bytes=10)
+        refs = [spill.put(bytes([i]) * 10) for i in range(6)]
+        for ref in refs[:3]:
+            spill.discard(ref)
+        assert spill.compactions == 0  # 丢弃的字节还没有超过使用中的字节
+        spill.discard(refs[4])
+        assert spill.compactions == 1
+        assert spill.size == spill.live == 20
+        assert spill.get(refs[3]) == bytes([3]) * 10
+        assert spill.get(refs[5]) == bytes([5]) * 10
+        assert spill.get(spill.put(b'after')) == b'after'
+        spill.close()
+
+    @pytest.fixture
+    def model(self):
+        return HtmlModel()
+
+    @pytest.fixture
+    def processor(self, model, temp_dir):
+        processor = CommandProcessor()
+        processor.history = CommandHistory(max_history=3)
+        processor.attach_checkpoints(CheckpointHistory(
+            model, interval=5, spill=SpillFile(temp_dir),
+            memory_records=10, memory_checkpoints=1))
+        yield processor
+        processor.checkpoints.close()
+
+    def _run_edits(self, model, processor, count):
+        states = [render(model)]
+        for i in range(count):
+            if i % 3 == 0:
+                command = AppendCommand(model, 'div', f'd{i}', 'body', f'text {i}')
+            elif i % 3 == 1:
+                command = EditTextCommand(model, f'd{i - 1}', 'x' * i)
+            else:
+                command = DeleteCommand(model, f'd{i - 2}')
+            processor.execute(command)
+            states.append(render(model))
+        return states
+
+    def test_old_entries_are_spilled(self, model, processor):
+        """内存中只保留最近的记录和检查点"""
+        self._run_edits(model, processor, 60)
+        stats = processor.checkpoints.stats()
+
+        assert stats['spilled_records'] == 50
+        assert stats['checkpoints'] - stats['spilled_checkpoints'] == 1
+        assert stats['spill_bytes'] > 0
+        in_memory = [r for r in processor.checkpoints.records if isinstance(r, list)]
+        assert len(in_memory) == 10
+
+    def test_deep_undo_pages_entries_back(self, model, processor):
+        """深度撤销从换出文件读回记录和检查点，每一步状态正确"""
+        states = self._run_edits(model, processor, 60)
+        for expected in reversed(states[:-1]):
+            assert processor.undo()
+            assert render(model) == expected
+
+        for expected in states[1:]:
+            assert processor.redo()
+            assert render(model) == expected
+
+    def test_dropped_entries_are_reclaimed(self, model, temp_dir):
+        """稀疏化和截断丢弃的检查点从换出文件中回收，深度撤销仍然正确"""
+        processor = CommandProcessor()
+        processor.history = CommandHistory(max_history=3)
+        spill = SpillFile(temp_dir, compact_bytes=1)
+        processor.attach_checkpoints(CheckpointHistory(
+            model, interval=2, max_checkpoints=4, spill=spill,
+            memory_records=5, memory_checkpoints=1))
+        states = self._run_edits(model, processor, 90)
+
+        assert spill.compactions > 0
+        assert spill.size <= 2 * spill.live
+        for expected in reversed(states[:-1]):
+            assert processor.undo()
+            assert render(model) == expected
+
+        # 撤销后执行新命令截断时间线，被截断的条目同样回收
+        processor.execute(AppendCommand(model, 'p', 'fresh', 'body'))
+        assert processor.checkpoints.stats()['records'] == 1
+        assert spill.size <= 2 * spill.live
+        processor.checkpoints.close()
+
+    def test_editor_uses_bounded_live_history(self, temp_dir):
+        """编辑器只在内存中保留最近的活动命令"""
+        editor = Editor(os.path.join(temp_dir, 'doc.html'))
+        editor.load()
+        editor.checkpoints = True
+        for i in range(Editor.LIVE_HISTORY + 20):
+            editor.execute_command(AppendCommand(editor.model, 'p', f'p{i}', 'body'))
+
+        assert len(editor.processor.history) == Editor.LIVE_HISTORY
+        for _ in range(Editor.LIVE_HISTORY + 20):
+            assert editor.undo()
+        assert editor.model.find_by_id('body').children == []
+        editor.close()
+
+    def test_checkpoints_and_coalescing_are_file_settings(self, temp_dir):
+        """检查点历史、连续修改合并和事件分发方式按文件保存在会话状态中，前两者默认关闭"""
+        state_file = os.path.join(temp_dir, 'state.json')
+        session = SessionManager(SessionState(state_file))
+        session.load(os.path.join(temp_dir, 'doc.html'))
+        editor = session.active_editor
+        assert not editor.checkpoints and not editor.coalesce
+        assert editor.processor.checkpoints is None
+        assert editor.processor.history.max_history is None
+
+        session.set_checkpoints(True)
+        session.set_coalesce(True)
+        session.set_dispatch_mode('batch')
+        assert session.save()
+        session.save_session()
+        editor.close()
+
+        restored = SessionManager(SessionState(state_file))
+        assert restored.restore_session()
+        editor = restored.active_editor
+        assert editor.checkpoints and editor.coalesce
+        assert editor.processor.history.max_history == Editor.LIVE_HISTORY
+        assert editor.dispatch_mode == 'batch'
+
+        editor.checkpoints = False
+        assert editor.processor.checkpoints is None
+        assert editor.processor.history.max_history is None
+        editor.close()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import pytest
+from src.commands.edit.append_command import AppendCommand
+from src.commands.registry import COMMANDS, CommandRegistry
+from src.core.html_model import HtmlModel
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+@pytest.mark.unit
+class TestCommandRegistry:
+    """测试延迟导入的命令注册表"""
+
+    def test_resolve_imports_on_first_use(self):
+        registry = CommandRegistry({'append': 'src.commands.edit.append_command:AppendCommand'})
+        assert not registry.is_loaded('append')
+        assert registry.resolve('append') is AppendCommand
+        assert registry.is_loaded('append')
+
+    def test_create_builds_command(self):
+        model = HtmlModel()
+        command = COMMANDS.create('append', model, 'p', 'p1', 'body')
+        assert isinstance(command, AppendCommand)
+        assert command.execute()
+        assert model.find_by_id('p1').tag == 'p'
+
+    def test_register_class_and_unknown_name(self):
+        registry = CommandRegistry()
+        registry.register('append', AppendCommand)
+        assert 'append' in registry and registry.is_loaded('append')
+        with pytest.raises(KeyError):
+            registry.resolve('missing')
+        with pytest.raises(ValueError):
+            registry.register('bad', 'no.colon')
+
+    def test_every_builtin_command_resolves(self):
+        for name in COMMANDS.names():
+            assert callable(COMMANDS.resolve(name))
+
+    def test_script_mode_skips_heavy_dependencies(self, temp_dir):
+        """不使用拼写检查、不读取已有文件的脚本不导入 pyspellchecker 和 bs4"""
+        code = (
+            "import io, sys\n"
+            "from src.application.script_runner import run_from_args\n"
+            f"script = io.StringIO('load {os.path.join(temp_dir, 'doc.html')}\\n"
+            "append p p1 body hi\\ntree\\nsave\\n')\n"
+            "assert run_from_args(['--script', '-'], stdin=script) == 0\n"
+            "print(sorted(m for m in ('bs4', 'spellchecker') if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == '[]'
@@ -4,6 +4,8 @@ from src.core.html_model import HtmlModel  # 修正模块路径
 from src.commands.base import CommandProcessor
 from src.commands.io import SaveCommand, ReadCommand, InitCommand
 from src.commands.edit import AppendCommand
+from src.commands.command_exceptions import CommandExecutionError
+from src.core.output import BufferedSink
 
 class TestSaveCommand:
     @pytest.fixture
@@ -80,6 +82,22 @@ class TestSaveCommand:
             # If it raises an exception, that's also acceptable
             pass
         
+    def test_save_errors_reported_through_output(self, model, tmp_path):
+        """保存失败时通过命令的输出目标报告错误"""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("not a directory")
+        sink = BufferedSink()
+        cmd = SaveCommand(model, str(blocker / "sub" / "out.html"))
+        cmd.output = sink
+        assert cmd.execute() is False
+        assert sink.messages == [f"无法创建目录: {blocker / 'sub'}"]
+
+        cmd = SaveCommand(model, str(tmp_path))
+        cmd.output = sink
+        with pytest.raises(CommandExecutionError):
+            cmd.execute()
+        assert sink.messages[-1].startswith("保存文件失败: ")
+        
     def test_save_clears_history(self, model, processor, tmp_path):
         """测试保存后清空命令历史"""
         # 执行编辑命令
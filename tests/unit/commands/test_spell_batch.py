@@ -0,0 +1,73 @@
+import contextlib
+import io
+import pytest
+from unittest.mock import patch
+
+from src.commands.display.spell_check import SpellCheckCommand
+from src.commands.spellcheck.cache import WordCache
+from src.commands.spellcheck.checker import SpellChecker
+from src.core.html_model import HtmlModel
+from tests.mocks.spell_reporters import CollectingReporter
+
+class OverridingChecker(SpellChecker):
+    """替换了单文本检查的检查器，批量检查同样使用替换后的实现"""
+
+    def check_text(self, text):
+        return super().check_text(text.replace('widgt', 'widget'))
+
+    def check_texts(self, texts):
+        return [self.check_text(text) for text in texts]
+
+@pytest.mark.unit
+class TestBatchSpellCheck:
+    """测试整个文档一次切分和判断单词的批量拼写检查"""
+
+    TEXTS = ['teh widgt', '', 'widgt', 'a mistak at the end mistak',
+             'so ' * 15 + 'recieved' + ' so' * 15, 'numbers 123abc and under_score teh', 'teh']
+
+    def test_same_as_check_text(self):
+        checker = SpellChecker(cache=WordCache())
+        batched = checker.check_texts(self.TEXTS)
+        single = [checker.check_text(text) for text in self.TEXTS]
+        key = lambda errors: [(e.wrong_word, e.start, e.end, e.context, e.suggestions) for e in errors]
+        assert list(map(key, batched)) == list(map(key, single))
+        assert [len(errors) for errors in batched] == [2, 0, 1, 2, 1, 1, 1]
+
+    def test_vocabulary_resolved_once(self):
+        model = HtmlModel()
+        model.append_child('body', 'ul', 'list')
+        for i in range(20):
+            model.append_child('list', 'li', f'li{i}', 'teh item' if i % 2 else 'an item')
+        checker = SpellChecker(cache=WordCache())
+        reporter = CollectingReporter('wrong_word', 'start', 'end', 'context', 'suggestions')
+        with patch.object(SpellChecker, '_lookup', autospec=True, side_effect=SpellChecker._lookup) as lookup:
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert SpellCheckCommand(model, spell_checker=checker, reporter=reporter).execute()
+        assert lookup.call_count == 1
+        assert [error[0] for error in reporter.errors] == ['teh'] * 10
+
+    def test_overriding_checker_used_for_batch(self):
+        """命令总是通过检查器的 check_texts() 批量检查"""
+        checker = OverridingChecker(cache=WordCache())
+        model = HtmlModel()
+        model.append_child('body', 'p', 'p1', 'a widgt')
+        reporter = CollectingReporter('wrong_word', 'start', 'end', 'context', 'suggestions')
+        with patch.object(OverridingChecker, 'check_element') as check_element:
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert SpellCheckCommand(model, spell_checker=checker, reporter=reporter).execute()
+        check_element.assert_not_called()
+        assert reporter.errors == []
+
+    def test_checker_without_batch_checked_per_element(self):
+        """没有 check_texts() 的检查器逐个元素调用 check_element()"""
+        class ElementChecker:
+            def check_element(self, element):
+                return SpellChecker(cache=WordCache()).check_text(element.text)
+
+        model = HtmlModel()
+        model.append_child('body', 'p', 'p1', 'teh')
+        model.append_child('body', 'p', 'p2', 'fine')
+        reporter = CollectingReporter('wrong_word', 'start', 'end', 'context', 'suggestions')
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert SpellCheckCommand(model, spell_checker=ElementChecker(), reporter=reporter).execute()
+        assert [error[0] for error in reporter.errors] == ['teh']
@@ -0,0 +1,154 @@
+import contextlib
+import io
+import pytest
+from unittest.mock import patch
+
+from src.commands.base import CommandProcessor
+from src.commands.display.spell_check import SPELL_CACHE_KEY, SpellCheckCommand
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.spellcheck.cache import KNOWN, WordCache
+from src.commands.spellcheck.checker import SpellChecker, shared_cache
+from src.commands.spellcheck.compiled import CompiledSpeller
+from src.core.html_model import HtmlModel
+from tests.mocks.spell_reporters import CollectingReporter
+
+@pytest.mark.unit
+class TestWordCache:
+    """测试拼写判定的LRU缓存"""
+
+    def test_lru_eviction(self):
+        cache = WordCache(capacity=2)
+        cache.put('a', KNOWN)
+        cache.put('b', ('x',))
+        assert cache.get('a') is KNOWN  # a 成为最近使用
+        cache.put('c', KNOWN)
+        assert cache.get('b') is None
+        assert cache.get('a') is KNOWN and cache.get('c') is KNOWN
+        assert cache.stats()['evicted'] == 1
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            WordCache(capacity=0)
+
+@pytest.mark.unit
+class TestSpellCheckerCache:
+    """测试拼写检查器使用缓存"""
+
+    def test_repeated_word_resolved_once(self):
+        checker = SpellChecker(cache=WordCache())
+        with patch.object(CompiledSpeller, 'candidates', autospec=True,
+                          side_effect=CompiledSpeller.candidates) as candidates:
+            errors = checker.check_text("teh cat and teh dog")
+            first_calls = candidates.call_count
+            errors += checker.check_text("teh end")
+        assert [error.wrong_word for error in errors] == ['teh'] * 3
+        assert errors[0].suggestions[0] == 'the'
+        # 建议只为第一次出现生成，之后的出现和命令都命中缓存
+        assert first_calls == candidates.call_count <= 2
+        # 每个错误得到独立的建议列表
+        errors[0].suggestions.append('changed')
+        assert 'changed' not in errors[1].suggestions
+
+    def test_cache_shared_between_checkers(self):
+        first = SpellChecker()
+        second = SpellChecker()
+        assert first.cache is second.cache is shared_cache()
+        first.check_text("qwertyuiop zzzxq")
+        with patch.object(CompiledSpeller, 'unknown') as unknown:
+            errors = second.check_text("qwertyuiop")
+        unknown.assert_not_called()
+        assert errors[0].wrong_word == 'qwertyuiop'
+
+    def test_add_word_invalidates_cached_verdicts(self):
+        cache = WordCache()
+        checker = SpellChecker(cache=cache)
+        other = SpellChecker(cache=cache)
+        assert checker.check_text("frobnicate")
+        checker.add_word("frobnicate")
+        assert checker.check_text("frobnicate") == []
+        # 其他检查器的词典没有变化，仍报告错误
+        assert other.check_text("frobnicate")
+        checker.add_words(["blorptastic"])
+        assert checker.check_text("blorptastic frobnicate") == []
+
+@pytest.mark.unit
+class TestIncrementalSpellCheck:
+    """测试只重新检查修改过的元素"""
+
+    @pytest.fixture
+    def model(self):
+        model = HtmlModel()
+        for i in range(5):
+            model.append_child('body', 'p', f'p{i}', f'paragraph {i} has a mistak')
+        return model
+
+    def _run(self, model, checker):
+        reporter = CollectingReporter()
+        command = SpellCheckCommand(model, spell_checker=checker, reporter=reporter)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert command.execute()
+        return command, reporter.errors
+
+    def test_only_edited_elements_rechecked(self, model):
+        checker = SpellChecker(cache=WordCache())
+        first, errors = self._run(model, checker)
+        assert first.checked == 5
+        assert errors == ['mistak'] * 5
+
+        processor = CommandProcessor()
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.execute(EditTextCommand(model, 'p2', 'now it has a tyypo'))
+            processor.execute(AppendCommand(model, 'p', 'p5', 'body', 'anothr one'))
+        second, errors = self._run(model, SpellChecker(cache=checker.cache))
+        assert second.checked == 2
+        assert errors == ['mistak', 'mistak', 'tyypo', 'mistak', 'mistak', 'anothr']
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.undo()
+            processor.undo()
+        third, errors = self._run(model, checker)
+        assert third.checked == 1
+        assert errors == ['mistak'] * 5
+
+    def test_dictionary_change_rechecks(self, model):
+        checker = SpellChecker(cache=WordCache())
+        self._run(model, checker)
+        checker.add_word('mistak')
+        command, errors = self._run(model, checker)
+        assert command.checked == 5
+        assert errors == []
+
+    def test_cache_holds_own_and_subtree_errors(self, model):
+        checker = SpellChecker(cache=WordCache())
+        self._run(model, checker)
+        body = model.find_by_id('body')
+        p0 = model.find_by_id('p0')
+        token, errors = p0.get_fragment(SPELL_CACHE_KEY, own=True)
+        assert token == checker.dictionary_token
+        assert [error.wrong_word for error in errors] == ['mistak']
+        token, errors = body.get_fragment(SPELL_CACHE_KEY)
+        assert [error.wrong_word for error in errors] == ['mistak'] * 5
+
+        # 修改后代只使祖先的子树结果失效，自身文本的结果保留
+        with contextlib.redirect_stdout(io.StringIO()):
+            CommandProcessor().execute(EditTextCommand(model, 'p3', 'fine'))
+        assert body.get_fragment(SPELL_CACHE_KEY) is None
+        assert p0.get_fragment(SPELL_CACHE_KEY) is not None
+        command, errors = self._run(model, checker)
+        assert command.checked == 1
+        # 只合并body和html下未修改子元素的缓存结果，不进入它们的子树
+        assert command.reused == len(body.children) - 1 + len(model.root.children) - 1
+        assert errors == ['mistak'] * 4
+
+        checker.add_word('mistak')
+        self._run(model, checker)
+        assert p0.get_fragment(SPELL_CACHE_KEY, own=True) == (checker.dictionary_token, ())
+        assert body.get_fragment(SPELL_CACHE_KEY) == (checker.dictionary_token, ())
+
+    def test_second_run_reuses_root_result(self, model):
+        checker = SpellChecker(cache=WordCache())
+        self._run(model, checker)
+        command, errors = self._run(model, checker)
+        assert (command.checked, command.reused) == (0, 1)
+        assert errors == ['mistak'] * 5
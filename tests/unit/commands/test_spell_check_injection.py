@@ -32,6 +32,10 @@ class MockSpellChecker(SpellChecker):
         if element.text:
             self.checked_texts.append(element.text)
         return self.errors_to_return
+        
+    def check_texts(self, texts):
+        """批量检查，逐个调用check_text"""
+        return [self.check_text(text) for text in texts]
 
 # 创建一个模拟的错误报告器
 class MockErrorReporter(SpellErrorReporter):
@@ -0,0 +1,44 @@
+import contextlib
+import io
+import pytest
+
+from src.commands.display.spell_check import SpellCheckCommand
+from src.commands.spellcheck.cache import KNOWN, WordCache
+from src.commands.spellcheck.checker import SpellChecker
+from src.commands.spellcheck.parallel import resolve_words
+from src.core.html_model import HtmlModel
+from tests.mocks.spell_reporters import CollectingReporter
+
+@pytest.mark.unit
+class TestParallelSpellCheck:
+    """测试多进程拼写检查"""
+
+    @pytest.fixture
+    def model(self):
+        model = HtmlModel()
+        for i in range(6):
+            model.append_child('body', 'p', f'p{i}', f'teh quick brwn fox {i} jumpd ovr the lazzy dog')
+        model.append_child('p0', 'span', 's0', 'an exampel inside')
+        return model
+
+    def _run(self, model, checker, workers):
+        reporter = CollectingReporter('wrong_word', 'start', 'suggestions')
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert SpellCheckCommand(model, spell_checker=checker, reporter=reporter, workers=workers).execute()
+        return reporter.errors
+
+    def test_parallel_matches_serial(self, model, monkeypatch):
+        serial = self._run(model, SpellChecker(cache=WordCache()), None)
+        monkeypatch.setattr(SpellChecker, 'PARALLEL_THRESHOLD', 1)
+        checker = SpellChecker(cache=WordCache())
+        parallel = self._run(model, checker, 2)
+        assert parallel == serial
+        assert [word for word, _, _ in serial[:5]] == ['teh', 'brwn', 'jumpd', 'ovr', 'lazzy']
+        assert serial[5][0] == 'exampel'
+
+    def test_workers_see_added_words(self):
+        checker = SpellChecker(cache=WordCache())
+        checker.add_words(['brwn'])
+        verdicts = resolve_words(['brwn', 'jumpd', 'the'], 2, extra_words=checker._extra_words)
+        assert verdicts['brwn'] is KNOWN and verdicts['the'] is KNOWN
+        assert 'jumped' in verdicts['jumpd']
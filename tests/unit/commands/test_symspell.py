@@ -0,0 +1,106 @@
+import os
+import pytest
+
+from src.commands.spellcheck.cache import WordCache
+from src.commands.spellcheck.checker import SpellChecker
+from src.commands.spellcheck.compiled import CompiledDictionary, CompiledSpeller, compile_dictionary
+from src.commands.spellcheck.symspell import (DeleteIndex, SymSpellSuggester, deletes, load_index,
+                                              damerau_distance, within_one)
+
+WORDS = {'the': 500, 'ten': 40, 'tea': 30, 'receive': 20, 'received': 25, 'relieved': 5,
+         'widget': 10, 'spelling': 8, 'spewing': 1, 'accommodate': 3}
+
+@pytest.fixture
+def dictionary(temp_dir):
+    path = os.path.join(temp_dir, 'words.dict')
+    compile_dictionary(path, WORDS, {'source': 'test'})
+    compiled = CompiledDictionary(path)
+    yield compiled
+    compiled.close()
+
+@pytest.fixture
+def suggester(dictionary):
+    return SymSpellSuggester(CompiledSpeller(dictionary), load_index(dictionary))
+
+@pytest.mark.unit
+class TestEditDistance:
+    """测试编辑距离计算"""
+
+    @pytest.mark.parametrize('a, b, distance', [
+        ('widget', 'widget', 0), ('widgt', 'widget', 1), ('teh', 'the', 1),
+        ('recieved', 'received', 1), ('acommodate', 'accommodate', 1),
+        ('speling', 'spewing', 1), ('recieve', 'received', 2), ('abc', 'xyz', 3), ('', 'ab', 2), ('ca', 'abc', 2),
+        ('unflvjaored', 'unflavored', 2), ('abcd', 'badc', 2),
+    ])
+    def test_damerau_distance(self, a, b, distance):
+        assert damerau_distance(a, b) == distance
+        assert damerau_distance(b, a) == distance
+        assert within_one(a, b) == (distance <= 1)
+
+    def test_deletes(self):
+        assert deletes('abc', 1) == {'abc', 'ab', 'ac', 'bc'}
+        assert '' in deletes('ab')
+
+@pytest.mark.unit
+class TestSymSpellSuggester:
+    """测试对称删除索引生成的候选词"""
+
+    def test_nearest_candidates_by_frequency(self, suggester):
+        assert suggester.suggest('teh') == ['the', 'ten', 'tea']
+        assert suggester.suggest('recieved') == ['received', 'relieved']
+        assert suggester.correction('widgt') == 'widget'
+        assert suggester.suggest('speling') == ['spelling', 'spewing']
+        # 有距离1的单词时不使用距离2的单词
+        assert suggester.suggest('recieve') == ['receive']
+        assert suggester.suggest('acomodate') == ['accommodate']
+
+    def test_no_candidates(self, suggester):
+        assert suggester.candidates('zorblax') is None
+        assert suggester.correction('zorblax') is None
+        assert suggester.candidates('the') == {'the'}
+
+    def test_added_words(self, suggester):
+        suggester.speller.word_frequency.load_words(['zorblax'])
+        suggester.add_words(['zorblax'])
+        assert suggester.suggest('zorblx') == ['zorblax']
+
+    def test_index_rebuilt_when_stale(self, dictionary, temp_dir):
+        path = os.path.join(temp_dir, 'words.deletes')
+        index = load_index(dictionary, path)
+        assert index.signature['words'] == len(WORDS)
+        with open(path, 'r+b') as f:
+            f.write(b'XXXX')
+        with pytest.raises(ValueError):
+            DeleteIndex(path)
+        # 缓存中的索引仍然有效；关闭后重新加载时重新编译
+        index.close()
+        from src.commands.spellcheck import symspell
+        symspell._opened.pop(path)
+        assert len(load_index(dictionary, path).lookup('teh')) > 0
+
+@pytest.mark.unit
+class TestSymSpellEngine:
+    """测试拼写检查器使用 SymSpell 建议引擎"""
+
+    def test_same_suggestions_as_edits(self):
+        edits = SpellChecker(cache=WordCache())
+        symspell = SpellChecker(cache=WordCache(), engine='symspell')
+        assert symspell.engine == 'symspell'
+        assert symspell.dictionary_token != edits.dictionary_token
+        text = 'The widgt was recieved by teh team'
+        assert ([(e.wrong_word, e.suggestions) for e in symspell.check_text(text)] ==
+                [(e.wrong_word, e.suggestions) for e in edits.check_text(text)])
+
+    def test_add_word(self):
+        checker = SpellChecker(cache=WordCache(), engine='symspell')
+        checker.add_word('zorblax')
+        assert checker.get_correction('zorblx') == 'zorblax'
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            SpellChecker(engine='soundex')
+
+    def test_falls_back_without_compiled_dictionary(self):
+        checker = SpellChecker(cache=WordCache(), compiled=False, engine='symspell')
+        assert checker.engine == 'edits'
+        assert checker.check_text('widgt')[0].suggestions[0] == 'widget'
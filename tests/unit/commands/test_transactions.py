@@ -0,0 +1,132 @@
+import os
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.composite import CompositeCommand
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.records import command_from_record
+from src.core.exceptions import ElementNotFoundError, InvalidOperationError
+from src.core.html_model import HtmlModel
+from src.io.journal import EditJournal
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+class RecordingObserver:
+    def __init__(self):
+        self.events = []
+
+    def update(self, event_type, data=None):
+        self.events.append(event_type)
+
+@pytest.mark.unit
+class TestTransactions:
+    """测试事务与宏命令"""
+
+    @pytest.fixture
+    def model(self):
+        return HtmlModel()
+
+    @pytest.fixture
+    def processor(self):
+        return CommandProcessor()
+
+    def _body_ids(self, model):
+        return [child.id for child in model.find_by_id('body').children]
+
+    def test_commit_records_single_history_entry(self, model, processor):
+        """提交后整个事务只占一条历史记录，观察者只收到一次通知"""
+        observer = RecordingObserver()
+        processor.add_observer(observer)
+
+        processor.begin()
+        for i in range(5):
+            processor.execute(AppendCommand(model, 'p', f'p{i}', 'body'))
+        assert len(processor.history) == 0
+        assert observer.events == []
+        assert processor.commit()
+
+        assert len(processor.history) == 1
+        assert observer.events == ['add_command']
+        assert isinstance(processor.history.get_last_command(), CompositeCommand)
+
+    def test_undo_and_redo_whole_batch(self, model, processor):
+        """一次撤销/重做整个事务"""
+        with processor.transaction():
+            processor.execute(AppendCommand(model, 'p', 'p1', 'body', 'a'))
+            processor.execute(EditTextCommand(model, 'p1', 'b'))
+
+        assert processor.undo()
+        assert self._body_ids(model) == []
+        assert processor.redo()
+        assert model.find_by_id('p1').text == 'b'
+
+    def test_context_manager_rolls_back_on_error(self, model, processor):
+        """上下文中出现异常时回滚已执行的命令"""
+        with pytest.raises(ElementNotFoundError):
+            with processor.transaction():
+                processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+                processor.execute(AppendCommand(model, 'p', 'p2', 'missing'))
+
+        assert self._body_ids(model) == []
+        assert not processor.in_transaction
+        assert len(processor.history) == 0
+
+    def test_explicit_rollback(self, model, processor):
+        """显式回滚撤销事务中的修改"""
+        processor.execute(AppendCommand(model, 'p', 'keep', 'body'))
+        processor.begin()
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+        assert processor.rollback()
+
+        assert self._body_ids(model) == ['keep']
+        assert len(processor.history) == 1
+
+    def test_nested_transaction_merges_into_outer(self, model, processor):
+        """内层事务提交后并入外层事务"""
+        with processor.transaction():
+            processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+            with processor.transaction():
+                processor.execute(AppendCommand(model, 'p', 'p2', 'body'))
+
+        assert len(processor.history) == 1
+        assert processor.undo()
+        assert self._body_ids(model) == []
+
+    def test_undo_blocked_and_commit_without_begin(self, model, processor):
+        """事务中不能撤销，没有事务时不能提交"""
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+        processor.begin()
+        assert not processor.undo()
+        processor.commit()
+        with pytest.raises(InvalidOperationError):
+            processor.commit()
+
+    def test_batch_record_roundtrip(self, model, processor):
+        """事务序列化为一条batch记录并可重放"""
+        with processor.transaction():
+            processor.execute(AppendCommand(model, 'p', 'p1', 'body', 'x'))
+            processor.execute(EditTextCommand(model, 'p1', 'y'))
+        record = processor.history.get_last_command().to_record()
+        assert record == ['batch', ['append', 'p', 'p1', 'body', 'x'], ['edit-text', 'p1', 'y']]
+
+        other = HtmlModel()
+        assert CommandProcessor().execute(command_from_record(other, record))
+        assert other.find_by_id('p1').text == 'y'
+
+    def test_journal_written_on_commit(self, temp_dir):
+        """日志模式下事务在提交时才写入一条记录"""
+        path = os.path.join(temp_dir, 'doc.html')
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(path)
+        session.save()
+        session.set_journal_mode(True)
+        journal_path = path + EditJournal.SUFFIX
+
+        session.begin_transaction()
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body'))
+        with open(journal_path, encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == 1
+        session.commit_transaction()
+        with open(journal_path, encoding='utf-8') as f:
+            assert f.read().splitlines()[1].startswith('["batch"')
+        session.active_editor.journal_mode = False
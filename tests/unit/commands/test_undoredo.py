@@ -1,4 +1,5 @@
 import pytest
+from collections import deque
 import os
 import tempfile
 from unittest.mock import patch, MagicMock
@@ -135,7 +136,7 @@ class TestCommandHistory:
         """测试初始化"""
         # Only check the history attribute exists, not its value
         assert hasattr(command_history, 'history')
-        assert isinstance(command_history.history, list)
+        assert isinstance(command_history.history, deque)
         
     def test_add(self, command_history):
         """测试添加命令"""
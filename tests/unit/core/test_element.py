@@ -1,3 +1,4 @@
+import sys
 import pytest
 from src.core.element import HtmlElement
 from src.core.exceptions import InvalidOperationError
@@ -259,4 +260,55 @@ class TestHtmlElement:
         
         assert len(parent_chain) == 2
         assert parent_chain[0] == parent
-        assert parent_chain[1] == root
\ No newline at end of file
+        assert parent_chain[1] == root
+
+    @staticmethod
+    def _measure(element):
+        """逐个元素重新计算子树的估算内存和元素数"""
+        size, count, stack = 0, 0, [element]
+        while stack:
+            node = stack.pop()
+            size += (HtmlElement.ELEMENT_OVERHEAD + sys.getsizeof(node.text) + sys.getsizeof(node.id)
+                     + HtmlElement.attributes_size(node.attributes))
+            count += 1
+            stack.extend(node.children)
+        return size, count
+
+    def test_subtree_statistics_follow_mutations(self):
+        """子树大小和元素数随修改即时更新，与重新计算的结果一致"""
+        root = HtmlElement('div', 'root')
+        section = HtmlElement('section', 'section')
+        root.add_child(section)
+        for i in range(3):
+            child = HtmlElement('p', f'p{i}')
+            child.text = 'x' * (i * 10)
+            section.add_child(child)
+        section.insert_child(0, HtmlElement('h1', 'title'))
+        section.set_attribute('class', 'wide')
+        section.set_attribute('class', 'narrow and long')
+        section.children[1].id = 'renamed'
+        section.remove_attribute('class')
+        section.set_attribute('data-x', '1')
+        section.remove_child(section.children[2])
+        moved = section.children[-1]
+        root.add_child(moved)
+
+        assert (root.size_hint(), root.subtree_count()) == self._measure(root)
+        assert (section.size_hint(), section.subtree_count()) == self._measure(section)
+        assert root.subtree_count() == 5
+
+    def test_own_fragments_survive_descendant_edits(self):
+        """own=True的缓存只在元素自身修改时失效，普通片段沿祖先路径失效"""
+        root = HtmlElement('div', 'root')
+        child = HtmlElement('p', 'child')
+        root.add_child(child)
+        root.set_fragment('key', 'subtree')
+        root.set_fragment('key', 'own', own=True)
+        assert root.child_fragments('key', 'none') == ['none']
+
+        child.text = 'changed'
+        assert root.get_fragment('key') is None
+        assert root.get_fragment('key', own=True) == 'own'
+
+        root.text = 'changed'
+        assert root.get_fragment('key', own=True) is None
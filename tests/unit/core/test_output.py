@@ -0,0 +1,100 @@
+import io
+import json
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_id_command import EditIdCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.edit.insert_command import InsertCommand
+from src.core.html_model import HtmlModel
+from src.core.output import (DEBUG, INFO, ERROR, BufferedSink, ConsoleSink, JsonSink,
+                             NullSink, get_output, parse_level, use_output)
+
+class Exploding:
+    """转为字符串时失败，用于验证被过滤的消息不会被格式化"""
+    def __str__(self):
+        raise AssertionError("不应格式化被过滤的消息")
+
+@pytest.mark.unit
+class TestOutputSink:
+    """测试输出目标"""
+
+    def test_level_filtering_is_lazy(self):
+        """低于级别的消息不被格式化"""
+        sink = BufferedSink(level=INFO)
+        sink.debug("值: %s", Exploding())
+        sink.info("值: %s", 1)
+        assert sink.messages == ["值: 1"]
+
+    def test_null_sink_discards_everything(self):
+        sink = NullSink()
+        sink.error("值: %s", Exploding())
+        assert not sink.enabled(ERROR)
+
+    def test_console_sink_writes_stream(self):
+        stream = io.StringIO()
+        sink = ConsoleSink(level=DEBUG, stream=stream)
+        sink.debug("a")
+        sink.error("b %d", 2)
+        assert stream.getvalue() == "a\nb 2\n"
+
+    def test_json_sink_writes_one_object_per_line(self):
+        stream = io.StringIO()
+        JsonSink(stream=stream).warning("注意 %s", "x")
+        entry = json.loads(stream.getvalue())
+        assert entry["level"] == "warning"
+        assert entry["message"] == "注意 x"
+
+    def test_buffered_sink_flushes_by_level(self):
+        buffered = BufferedSink()
+        buffered.debug("d")
+        buffered.error("e")
+        target = BufferedSink(level=INFO)
+        buffered.flush_to(target)
+        assert target.messages == ["e"]
+        assert buffered.records == []
+
+    def test_parse_level(self):
+        assert parse_level('debug') == DEBUG
+        assert parse_level(ERROR) == ERROR
+        with pytest.raises(ValueError):
+            parse_level('loud')
+
+    def test_use_output_restores_previous(self):
+        previous = get_output()
+        with use_output(NullSink()) as sink:
+            assert get_output() is sink
+        assert get_output() is previous
+
+@pytest.mark.unit
+class TestCommandOutput:
+    """测试命令和命令处理器使用输出目标"""
+
+    def test_processor_injects_sink(self, capsys):
+        """处理器注入的输出目标接收命令的全部消息"""
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.output = BufferedSink(level=DEBUG)
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+        processor.execute(EditTextCommand(model, 'p1', 'hello'))
+        processor.execute(EditIdCommand(model, 'p1', 'p2'))
+
+        assert capsys.readouterr().out == ''
+        messages = processor.output.messages
+        assert "Appended 'p1' as child of 'body'" in messages
+        assert any(message.startswith("保存原始文本") for message in messages)
+
+    def test_debug_hidden_by_default(self, capsys):
+        """默认的控制台输出只显示INFO及以上的消息"""
+        model = HtmlModel()
+        EditTextCommand(model, 'body', 'x').execute()
+        out = capsys.readouterr().out
+        assert "成功更新元素 body 的文本内容" in out
+        assert "保存原始文本" not in out
+
+    def test_global_null_sink_silences_commands(self, capsys):
+        model = HtmlModel()
+        with use_output(NullSink()):
+            AppendCommand(model, 'p', 'p1', 'body').execute()
+            InsertCommand(model, 'p', 'p0', 'p1').execute()
+        assert capsys.readouterr().out == ''
@@ -0,0 +1,91 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.core.html_model import HtmlModel
+from src.commands.io import SaveCommand
+from src.io.atomic import atomic_write, BACKUP_SUFFIX
+from src.io.writer import HtmlWriter
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestAtomicSave:
+    """测试原子保存"""
+
+    def test_atomic_write_replaces_content(self, temp_dir):
+        """原子写入替换目标文件且不留下临时文件"""
+        path = os.path.join(temp_dir, 'doc.html')
+        atomic_write(path, 'first')
+        atomic_write(path, 'second', fsync=True)
+
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == 'second'
+        assert os.listdir(temp_dir) == ['doc.html']
+
+    def test_atomic_write_keeps_backup(self, temp_dir):
+        """保留上一版本为.bak文件"""
+        path = os.path.join(temp_dir, 'doc.html')
+        atomic_write(path, 'v1')
+        atomic_write(path, 'v2', keep_backup=True)
+
+        with open(path + BACKUP_SUFFIX, encoding='utf-8') as f:
+            assert f.read() == 'v1'
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == 'v2'
+
+    def test_failed_replace_keeps_original(self, temp_dir):
+        """替换失败时原文件保持完整，临时文件被清理"""
+        path = os.path.join(temp_dir, 'doc.html')
+        atomic_write(path, 'original')
+
+        with patch('src.io.atomic.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                atomic_write(path, 'broken')
+
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == 'original'
+        assert os.listdir(temp_dir) == ['doc.html']
+
+    def test_new_file_does_not_touch_umask(self, temp_dir):
+        """新文件按导入时读取的umask设置权限，不修改进程的umask"""
+        path = os.path.join(temp_dir, 'new.html')
+        with patch('src.io.atomic.os.umask') as mock_umask:
+            atomic_write(path, 'content')
+
+        mock_umask.assert_not_called()
+        umask = os.umask(0)
+        os.umask(umask)
+        assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+
+    def test_save_command_atomic(self, temp_dir):
+        """SaveCommand支持原子写入模式"""
+        model = HtmlModel()
+        path = os.path.join(temp_dir, 'out.html')
+        assert SaveCommand(model, path, atomic=True, keep_backup=True).execute()
+        assert SaveCommand(model, path, atomic=True, keep_backup=True).execute()
+        assert os.path.exists(path + BACKUP_SUFFIX)
+
+    def test_writer_atomic(self, temp_dir):
+        """HtmlWriter支持原子写入模式"""
+        path = os.path.join(temp_dir, 'sub', 'out.html')
+        assert HtmlWriter().write_to_file(HtmlModel(), path, atomic=True)
+        with open(path, encoding='utf-8') as f:
+            assert f.read().startswith('<!DOCTYPE html>')
+
+    def test_settings_persist_per_editor(self, temp_dir):
+        """原子保存设置按编辑器保存在会话状态中"""
+        state_file = os.path.join(temp_dir, 'state.json')
+        file_path = os.path.join(temp_dir, 'doc.html')
+
+        session = SessionManager(SessionState(state_file))
+        session.load(file_path)
+        session.set_atomic_save(True, fsync=True, keep_backup=True)
+        assert session.save()
+        session.save_session()
+
+        restored = SessionManager(SessionState(state_file))
+        assert restored.restore_session()
+        editor = restored.active_editor
+        assert editor.atomic_save is True
+        assert editor.fsync_on_save is True
+        assert editor.keep_backup is True
@@ -0,0 +1,84 @@
+import os
+import time
+import pytest
+from src.commands.edit.append_command import AppendCommand
+from src.session.autosave import AutosaveWorker
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestAutosave:
+    """测试后台自动保存"""
+
+    @pytest.fixture
+    def session(self, temp_dir):
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(os.path.join(temp_dir, 'doc.html'))
+        yield session
+        session.disable_autosave(flush=False)
+
+    def _read(self, session):
+        with open(session.active_editor.filename, encoding='utf-8') as f:
+            return f.read()
+
+    def test_waits_for_quiet_period(self, session):
+        """静默期未结束时不写入"""
+        worker = AutosaveWorker(session, quiet_period=60)
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body', 'One'))
+
+        assert worker.flush() == 0
+        assert not os.path.exists(session.active_editor.filename)
+        assert session.active_editor.modified
+
+    def test_coalesces_burst_into_one_write(self, session):
+        """连续编辑合并为一次写入"""
+        worker = AutosaveWorker(session, quiet_period=0)
+        model = session.get_active_model()
+        for i in range(5):
+            session.execute_command(AppendCommand(model, 'p', f'p{i}', 'body', f'Text {i}'))
+
+        assert worker.flush() == 1
+        assert worker.flush() == 0
+        assert worker.save_count == 1
+        assert 'p4' in self._read(session)
+        assert not session.active_editor.modified
+
+    def test_edit_after_snapshot_stays_modified(self, session):
+        """快照之后的新修改不会被标记为已保存"""
+        worker = AutosaveWorker(session, quiet_period=0)
+        editor = session.active_editor
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body'))
+
+        original_snapshot = editor.snapshot
+        def snapshot_then_edit():
+            html_content = original_snapshot()
+            editor.modified = True
+            return html_content
+        editor.snapshot = snapshot_then_edit
+
+        assert worker.flush() == 1
+        assert editor.modified
+
+    def test_background_thread_saves(self, session):
+        """后台线程在静默期后保存并记录延迟"""
+        assert session.enable_autosave(0.05)
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'bg', 'body'))
+
+        deadline = time.monotonic() + 5
+        while session.active_editor.modified and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert not session.active_editor.modified
+        stats = session.autosave_stats()
+        assert stats['saves'] >= 1
+        assert stats['last_latency'] is not None
+        assert 'bg' in self._read(session)
+
+    def test_disable_flushes_pending_changes(self, session):
+        """禁用自动保存时写入尚未保存的修改"""
+        session.enable_autosave(60)
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'late', 'body'))
+
+        session.disable_autosave()
+        assert session.autosave is None
+        assert 'late' in self._read(session)
@@ -0,0 +1,93 @@
+import os
+import pytest
+from src.core.html_model import HtmlModel
+from src.commands.base import CommandProcessor
+from src.commands.io import SaveCommand
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.edit.delete_command import DeleteCommand
+from src.io.writer import HtmlWriter
+
+@pytest.mark.unit
+class TestIncrementalSave:
+    """测试基于缓存片段的增量保存"""
+
+    @pytest.fixture
+    def setup(self):
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.execute(AppendCommand(model, 'div', 'left', 'body'))
+        processor.execute(AppendCommand(model, 'p', 'p1', 'left', 'Hello'))
+        processor.execute(AppendCommand(model, 'div', 'right', 'body'))
+        processor.execute(AppendCommand(model, 'p', 'p2', 'right', 'World'))
+        return model, processor
+
+    def test_edit_invalidates_path_to_root(self, setup, temp_dir):
+        """修改元素后，只有到根节点路径上的片段失效"""
+        model, processor = setup
+        path = os.path.join(temp_dir, 'out.html')
+        processor.execute(SaveCommand(model, path))
+
+        right_fragment = model.find_by_id('right').get_fragment(('save', 2))
+        assert right_fragment is not None
+
+        processor.execute(EditTextCommand(model, 'p1', 'Changed'))
+
+        assert model.find_by_id('p1').get_fragment(('save', 3)) is None
+        assert model.find_by_id('left').get_fragment(('save', 2)) is None
+        assert model.find_by_id('body').get_fragment(('save', 1)) is None
+        assert model.find_by_id('html').get_fragment(('save', 0)) is None
+        # 未修改的兄弟子树保留缓存
+        assert model.find_by_id('right').get_fragment(('save', 2)) is right_fragment
+
+    def test_fragments_hold_only_own_markup(self, setup, temp_dir):
+        """每个元素只缓存自身的标签，不缓存子树内容"""
+        model, processor = setup
+        processor.execute(SaveCommand(model, os.path.join(temp_dir, 'out.html')))
+
+        head, tail = model.find_by_id('body').get_fragment(('save', 1))
+        assert 'Hello' not in head + tail
+        assert 'World' not in head + tail
+
+    def test_cached_save_matches_full_save(self, setup, temp_dir):
+        """使用缓存的保存结果与完整重新生成一致"""
+        model, processor = setup
+        cached_path = os.path.join(temp_dir, 'cached.html')
+        full_path = os.path.join(temp_dir, 'full.html')
+
+        processor.execute(SaveCommand(model, cached_path))
+        processor.execute(EditTextCommand(model, 'p2', 'Again'))
+        processor.execute(DeleteCommand(model, 'left'))
+        processor.execute(SaveCommand(model, cached_path))
+        SaveCommand(model, full_path, use_cache=False).execute()
+
+        with open(cached_path, encoding='utf-8') as f:
+            cached = f.read()
+        with open(full_path, encoding='utf-8') as f:
+            full = f.read()
+        assert cached == full
+        assert 'Again' in cached
+        assert 'left' not in cached
+
+    def test_undo_restores_output(self, setup):
+        """撤销后缓存失效，输出恢复原样"""
+        model, processor = setup
+        writer = HtmlWriter()
+        before = writer.generate_html(model)
+
+        processor.execute(EditTextCommand(model, 'p1', 'Temporary'))
+        assert 'Temporary' in writer.generate_html(model)
+
+        processor.undo()
+        assert writer.generate_html(model) == before
+
+    def test_writer_cache_matches_uncached(self, setup):
+        """写入器缓存输出与不使用缓存的输出一致"""
+        model, processor = setup
+        writer = HtmlWriter()
+        writer.generate_html(model)
+        model.find_by_id('p2').set_attribute('class', 'note')
+
+        for pretty in (True, False):
+            assert writer.generate_html(model, pretty=pretty) == \
+                HtmlWriter(use_cache=False).generate_html(model, pretty=pretty)
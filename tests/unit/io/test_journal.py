@@ -0,0 +1,132 @@
+import json
+import os
+import pytest
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.core.exceptions import ElementNotFoundError
+from src.io.journal import EditJournal
+from src.session.autosave import AutosaveWorker
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestEditJournal:
+    """测试日志模式"""
+
+    @pytest.fixture
+    def path(self, temp_dir):
+        path = os.path.join(temp_dir, 'doc.html')
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'init.json')))
+        session.load(path)
+        session.save()
+        return path
+
+    @pytest.fixture
+    def session(self, path, temp_dir):
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(path)
+        session.set_journal_mode(True)
+        yield session
+        session.active_editor.journal_mode = False
+
+    def _records(self, path):
+        with open(path + EditJournal.SUFFIX, encoding='utf-8') as f:
+            return [json.loads(line) for line in f.read().splitlines()[1:]]
+
+    def _reopen(self, path, temp_dir):
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'other.json')))
+        session.load(path)
+        return session
+
+    def test_edits_append_records_without_rewriting(self, session, path):
+        """编辑只追加日志记录，HTML文件保持不变"""
+        with open(path, encoding='utf-8') as f:
+            original = f.read()
+        model = session.get_active_model()
+        session.execute_command(AppendCommand(model, 'p', 'p1', 'body', 'Hello'))
+        session.execute_command(EditTextCommand(model, 'p1', 'World'))
+        session.undo()
+        session.redo()
+
+        assert self._records(path) == [
+            ['append', 'p', 'p1', 'body', 'Hello'],
+            ['edit-text', 'p1', 'World'],
+            ['undo'],
+            ['redo'],
+        ]
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == original
+
+    def test_reopen_replays_journal(self, session, path, temp_dir):
+        """未保存就重新打开时，日志中的修改被重放"""
+        model = session.get_active_model()
+        session.execute_command(AppendCommand(model, 'p', 'p1', 'body', 'Hello'))
+        session.execute_command(AppendCommand(model, 'p', 'p2', 'body', 'Gone'))
+        session.undo()
+
+        reopened = self._reopen(path, temp_dir)
+        restored = reopened.get_active_model()
+        assert restored.find_by_id('p1').text == 'Hello'
+        with pytest.raises(ElementNotFoundError):
+            restored.find_by_id('p2')
+        assert reopened.active_editor.modified
+        # 重放重建了历史记录，可以继续重做
+        assert reopened.redo()
+        assert restored.find_by_id('p2') is not None
+
+    def test_save_compacts_journal(self, session, path, temp_dir):
+        """保存后日志被清空，重新打开不会重复应用修改"""
+        model = session.get_active_model()
+        session.execute_command(AppendCommand(model, 'p', 'p1', 'body', 'Hello'))
+        session.save()
+
+        assert self._records(path) == []
+        reopened = self._reopen(path, temp_dir)
+        assert not reopened.active_editor.modified
+        assert len(reopened.get_active_model().find_by_id('body').children) == 1
+
+    def test_threshold_triggers_compaction(self, session, path):
+        """日志超过阈值时自动重写HTML"""
+        session.active_editor.journal_threshold = 200
+        model = session.get_active_model()
+        for i in range(10):
+            session.execute_command(AppendCommand(model, 'p', f'p{i}', 'body', 'x' * 20))
+
+        assert os.path.getsize(path + EditJournal.SUFFIX) <= 200
+        with open(path, encoding='utf-8') as f:
+            assert 'p5' in f.read()
+
+    def test_undo_past_compaction_rewrites_html(self, session, path, temp_dir):
+        """撤销合并前的命令无法从日志重放，改为立即合并"""
+        model = session.get_active_model()
+        session.execute_command(AppendCommand(model, 'p', 'p1', 'body'))
+        AutosaveWorker(session, quiet_period=0).flush()
+        assert self._records(path) == []
+
+        assert session.undo()
+        assert self._records(path) == []
+        with pytest.raises(ElementNotFoundError):
+            self._reopen(path, temp_dir).get_active_model().find_by_id('p1')
+
+    def test_stale_journal_is_ignored(self, session, path, temp_dir):
+        """HTML在日志之外被修改后，日志不再重放"""
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body'))
+        session.active_editor.journal_mode = False
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n')
+
+        reopened = self._reopen(path, temp_dir)
+        with pytest.raises(ElementNotFoundError):
+            reopened.get_active_model().find_by_id('p1')
+        assert not reopened.active_editor.modified
+
+    def test_truncated_last_record_is_skipped(self, session, path, temp_dir):
+        """崩溃时写了一半的最后一条记录被忽略"""
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body'))
+        with open(path + EditJournal.SUFFIX, 'a', encoding='utf-8') as f:
+            f.write('["append", "p", "p2"')
+
+        restored = self._reopen(path, temp_dir).get_active_model()
+        assert restored.find_by_id('p1') is not None
+        with pytest.raises(ElementNotFoundError):
+            restored.find_by_id('p2')
@@ -0,0 +1,100 @@
+import gzip
+import os
+import pytest
+from src.core.html_model import HtmlModel
+from src.core.element import HtmlElement
+from src.commands.io import SaveCommand
+from src.io.parser import HtmlParser
+from src.io.writer import HtmlWriter
+
+@pytest.mark.unit
+class TestMinifiedOutput:
+    """测试压缩和gzip输出模式"""
+
+    @pytest.fixture
+    def model(self):
+        model = HtmlModel()
+        body = model.find_by_id('body')
+
+        ul = HtmlElement('ul', 'ul')
+        body.add_child(ul)
+        for i in range(2):
+            li = HtmlElement('li', f'item{i}')
+            li.text = f'Item   {i}\n  text'
+            ul.add_child(li)
+
+        pre = HtmlElement('pre', 'code')
+        pre.text = 'keep   spacing'
+        body.add_child(pre)
+
+        link = HtmlElement('a', 'link')
+        link.set_attribute('href', 'https://example.com')
+        para = HtmlElement('p', 'inside')
+        para.text = 'Anchor'
+        link.add_child(para)
+        body.add_child(link)
+        return model
+
+    def test_minify_collapses_whitespace(self, model):
+        """压缩模式折叠空白，但保留pre中的空白"""
+        output = HtmlWriter().generate_html(model, minify=True)
+        assert 'Item 0 text' in output
+        assert 'keep   spacing' in output
+        assert '\n' not in output
+
+    def test_minify_omits_auto_ids(self, model):
+        """省略与标签名相同的自动生成ID"""
+        output = HtmlWriter().generate_html(model, minify=True)
+        assert output.startswith('<html><head>')
+        assert '<ul>' in output
+        assert 'id="item0"' in output
+
+    def test_minify_drops_optional_end_tags(self, model):
+        """省略可选的结束标签"""
+        output = HtmlWriter().generate_html(model, minify=True)
+        assert '</li>' not in output
+        assert '</ul>' in output
+        assert '</head>' not in output
+        assert '</html>' not in output
+        # <a>中最后一个<p>的结束标签不能省略
+        assert '<p id="inside">Anchor</p></a>' in output
+
+    def test_minify_cache_follows_sibling_changes(self, model):
+        """结束标签由下一个兄弟元素决定，兄弟变化后输出随之更新"""
+        writer = HtmlWriter()
+        writer.generate_html(model, minify=True)
+
+        ul = model.find_by_id('body').children[0]
+        ul.add_child(HtmlElement('span', 'tail'))
+
+        assert writer.generate_html(model, minify=True) == \
+            HtmlWriter(use_cache=False).generate_html(model, minify=True)
+        assert '</li><span id="tail">' in writer.generate_html(model, minify=True)
+
+    def test_parallel_minify_preserves_pre(self, model):
+        """并行生成的body子元素同样保留pre中的空白"""
+        serial = HtmlWriter(use_cache=False).generate_html(model, minify=True)
+        assert HtmlWriter(workers=2).generate_html(model, minify=True) == serial
+        assert 'keep   spacing' in serial
+
+    def test_gzip_output(self, model, temp_dir):
+        """.gz后缀的文件通过gzip写入并报告大小"""
+        path = os.path.join(temp_dir, 'out.html.gz')
+        cmd = SaveCommand(model, path)
+        assert cmd.execute()
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            content = f.read()
+        assert content.startswith('<!DOCTYPE html>')
+        assert cmd.output_size == os.path.getsize(path)
+        assert cmd.elapsed is not None
+
+    def test_minified_output_roundtrips_ids(self, model, temp_dir):
+        """压缩输出省略的ID在重新解析时被还原"""
+        path = os.path.join(temp_dir, 'min.html')
+        assert SaveCommand(model, path, minify=True, atomic=True).execute()
+
+        reloaded = HtmlModel()
+        HtmlParser().parse_file(path, reloaded)
+        assert reloaded.find_by_id('ul').tag == 'ul'
+        assert reloaded.find_by_id('code').text == 'keep   spacing'
@@ -0,0 +1,89 @@
+import os
+import pytest
+from src.commands.base import CommandProcessor
+from src.commands.edit.append_command import AppendCommand
+from src.commands.edit.edit_text_command import EditTextCommand
+from src.commands.display import PrintTreeCommand
+from src.core.html_model import HtmlModel
+from src.io.recording import SessionRecorder, read_recording, recording_snapshot
+from src.session.session_manager import SessionManager
+from src.session.state.session_state import SessionState
+
+@pytest.mark.unit
+class TestSessionRecording:
+    """测试会话录制"""
+
+    @pytest.fixture
+    def recording(self, temp_dir):
+        return os.path.join(temp_dir, 'session' + SessionRecorder.SUFFIX)
+
+    def test_records_commands_and_processor_operations(self, recording):
+        model = HtmlModel()
+        processor = CommandProcessor()
+        recorder = SessionRecorder(recording, model)
+        processor.attach_recorder(recorder)
+
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body', 'a'))
+        processor.begin()
+        processor.execute(EditTextCommand(model, 'p1', 'b'))
+        processor.rollback()
+        processor.undo()
+        processor.redo()
+        processor.execute(PrintTreeCommand(model))
+        recorder.close()
+
+        header, entries = read_recording(recording)
+        assert recording_snapshot(header) is not None
+        assert [entry['op'] for entry in entries] == [
+            'append', 'begin', 'edit-text', 'rollback', 'undo', 'redo', 'PrintTreeCommand']
+        assert entries[0]['record'] == ['append', 'p', 'p1', 'body', 'a']
+        assert entries[-1]['record'] is None
+        assert all(entry['elapsed'] >= 0 and entry['ok'] for entry in entries)
+        assert recorder.count == 7
+
+    def test_coalesced_edit_recorded_under_command_name(self, recording):
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.history.coalesce_window = 10
+        processor.execute(AppendCommand(model, 'p', 'p1', 'body'))
+        processor.attach_recorder(SessionRecorder(recording))
+
+        processor.execute(EditTextCommand(model, 'p1', 'a'))
+        processor.execute(EditTextCommand(model, 'p1', 'ab'))
+        processor.detach_recorder().close()
+
+        header, entries = read_recording(recording)
+        assert recording_snapshot(header) is None
+        assert [entry['op'] for entry in entries] == ['edit-text', 'edit-text']
+        assert entries[1]['record'][0] == 'coalesce'
+
+    def test_failed_command_recorded(self, recording):
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.attach_recorder(SessionRecorder(recording))
+        with pytest.raises(Exception):
+            processor.execute(EditTextCommand(model, 'missing', 'x'))
+        processor.detach_recorder().close()
+
+        _, entries = read_recording(recording)
+        assert entries[0]['op'] == 'edit-text'
+        assert entries[0]['ok'] is False
+
+    def test_invalid_recording_rejected(self, temp_dir):
+        path = os.path.join(temp_dir, 'bad.replay')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"version": 99}\n')
+        with pytest.raises(ValueError):
+            read_recording(path)
+
+    def test_session_record_command(self, temp_dir, recording):
+        session = SessionManager(SessionState(os.path.join(temp_dir, 'state.json')))
+        session.load(os.path.join(temp_dir, 'doc.html'))
+        assert session.set_recording(recording)
+        session.execute_command(AppendCommand(session.get_active_model(), 'p', 'p1', 'body'))
+        assert session.set_recording(None)
+        assert session.active_editor.recorder is None
+        assert session.active_editor.processor.recorder is None
+
+        _, entries = read_recording(recording)
+        assert [entry['op'] for entry in entries] == ['append']
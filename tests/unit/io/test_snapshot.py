@@ -0,0 +1,110 @@
+import os
+import pytest
+from src.core.html_model import HtmlModel
+from src.core.element import HtmlElement
+from src.commands.base import CommandProcessor
+from src.commands.io import ExportSnapshotCommand, ImportSnapshotCommand, ReadCommand
+from src.commands.edit.append_command import AppendCommand
+from src.commands.command_exceptions import CommandExecutionError
+from src.core.output import BufferedSink
+from src.io.parser import HtmlParser
+from src.io.snapshot import encode_snapshot, decode_snapshot, load_snapshot, save_snapshot, SnapshotFormatError
+from src.io.writer import HtmlWriter
+
+@pytest.mark.unit
+class TestSnapshot:
+    """测试二进制快照格式"""
+
+    @pytest.fixture
+    def model(self):
+        model = HtmlModel()
+        processor = CommandProcessor()
+        processor.execute(AppendCommand(model, 'title', 'title', 'head', 'Snapshot'))
+        processor.execute(AppendCommand(model, 'div', 'main', 'body', 'Intro'))
+        processor.execute(AppendCommand(model, 'p', 'p1', 'main', '中文 & <text>'))
+        processor.execute(AppendCommand(model, 'p', 'p2', 'main'))
+        model.find_by_id('main').set_attribute('class', 'container')
+        model.find_by_id('p2').set_attribute('data-empty', '')
+        return model
+
+    def test_roundtrip_preserves_model(self, model, temp_dir):
+        """快照往返后生成的HTML与原模型一致"""
+        path = os.path.join(temp_dir, 'doc.snap')
+        save_snapshot(model, path)
+
+        restored = HtmlModel()
+        load_snapshot(path, restored)
+
+        writer = HtmlWriter(use_cache=False)
+        assert writer.generate_html(restored) == writer.generate_html(model)
+        assert restored.find_by_id('p1').parent is restored.find_by_id('main')
+        assert restored.find_by_id('p2').get_attribute('data-empty') == ''
+        # 直接构建的树同样带有正确的子树统计
+        assert restored.root.size_hint() == model.root.size_hint()
+        assert restored.root.subtree_count() == model.root.subtree_count()
+
+    def test_strings_are_deduplicated(self):
+        """重复的字符串只存储一次"""
+        root = HtmlElement('html', 'html')
+        for i in range(50):
+            child = HtmlElement('p', f'p{i}')
+            child.text = 'same text'
+            root.add_child(child)
+        data = encode_snapshot(root)
+        assert data.count(b'same text') == 1
+
+    def test_invalid_data_rejected(self, temp_dir):
+        """非快照文件抛出SnapshotFormatError"""
+        with pytest.raises(SnapshotFormatError):
+            decode_snapshot(b'<html></html>')
+
+        path = os.path.join(temp_dir, 'bad.snap')
+        with open(path, 'wb') as f:
+            f.write(b'HTMS\x01\x00\x00\x00\xff\xff\xff\xff')
+        with pytest.raises(SnapshotFormatError):
+            load_snapshot(path, HtmlModel())
+
+    def test_matches_parsed_html(self, temp_dir):
+        """快照加载结果与解析同一HTML文件的结果一致"""
+        html_path = os.path.join(os.path.dirname(__file__), '..', '..', 'input', 'sample.html')
+        parsed = HtmlModel()
+        HtmlParser().parse_file(html_path, parsed)
+
+        snap_path = os.path.join(temp_dir, 'sample.snap')
+        save_snapshot(parsed, snap_path)
+        restored = HtmlModel()
+        load_snapshot(snap_path, restored)
+
+        writer = HtmlWriter(use_cache=False)
+        assert writer.generate_html(restored) == writer.generate_html(parsed)
+        assert set(restored._id_map) == set(parsed._id_map)
+        assert restored.root.size_hint() == parsed.root.size_hint()
+        assert restored.root.subtree_count() == parsed.root.subtree_count()
+
+    def test_commands(self, model, temp_dir):
+        """export-snapshot/import-snapshot命令"""
+        path = os.path.join(temp_dir, 'doc.snap')
+        processor = CommandProcessor()
+        assert processor.execute(ExportSnapshotCommand(model, path))
+
+        target = HtmlModel()
+        processor.execute(AppendCommand(target, 'p', 'old', 'body'))
+        assert processor.execute(ImportSnapshotCommand(processor, target, path))
+        assert target.find_by_id('p1').text == '中文 & <text>'
+        assert not processor.history.can_undo()
+
+        with pytest.raises(CommandExecutionError):
+            ImportSnapshotCommand(processor, target, os.path.join(temp_dir, 'missing.snap')).execute()
+
+    def test_commands_report_through_output(self, model, temp_dir):
+        """快照命令通过注入的输出目标报告结果"""
+        path = os.path.join(temp_dir, 'doc.snap')
+        sink = BufferedSink()
+        processor = CommandProcessor()
+        processor.output = sink
+        export = ExportSnapshotCommand(model, path)
+        assert export.recordable is False
+        assert processor.execute(export)
+        assert processor.execute(ImportSnapshotCommand(processor, HtmlModel(), path))
+        assert sink.messages[0].startswith(f"已导出快照: {path}")
+        assert sink.messages[1].startswith(f"成功导入快照: {path}")